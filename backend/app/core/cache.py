@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.logger import logger
+
+# Optional shared tier for TieredCache; unset means in-process only.
+REDIS_URL = os.getenv("REDIS_URL")
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class RedisCacheBackend:
+    """Shared cache tier: JSON values in Redis, plus integer generation counters."""
+
+    def __init__(self, url: str):
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.25)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.client.set(key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+    def get_int(self, key: str) -> int:
+        return int(self.client.get(key) or 0)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(key)
+
+
+def shared_backend() -> Optional[RedisCacheBackend]:
+    if not REDIS_URL:
+        return None
+    try:
+        return RedisCacheBackend(REDIS_URL)
+    except ImportError:
+        logger.warning({"event": "cache_shared_tier_disabled", "reason": "redis package not installed"})
+        return None
+
+
+# Named caches, for the /ops/cache counters.
+caches: dict[str, Any] = {}
+
+
+class TieredCache:
+    """In-process LRU in front of an optional shared tier.
+
+    Values must be JSON-serialisable. Groups of keys (e.g. every feed page) are
+    invalidated together by bumping a generation number that callers fold
+    into their keys; the shared tier makes bumps visible to every worker.
+    Errors from the shared tier are counted and otherwise ignored.
+
+    The shared tier uses the blocking redis client; async callers go through
+    `offload` so its round trips don't stall the event loop.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60, shared: Optional[RedisCacheBackend] = None):
+        self.name = name
+        self.ttl = ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._generations: dict[str, int] = {}
+        self.shared_hits = 0
+        self.misses = 0
+        self.shared_errors = 0
+        self.invalidations = 0
+        caches[name] = self
+
+    def _shared_call(self, method: str, *args):
+        try:
+            return getattr(self.shared, method)(*args)
+        except Exception:
+            self.shared_errors += 1
+            return None
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        if self.shared is not None:
+            value = self._shared_call("get", f"{self.name}:{key}")
+            if value is not None:
+                self.shared_hits += 1
+                self.local.set(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+        if self.shared is not None:
+            self._shared_call("set", f"{self.name}:{key}", value, self.ttl)
+
+    def delete(self, key: str) -> None:
+        self.invalidations += 1
+        self.local.delete(key)
+        if self.shared is not None:
+            self._shared_call("delete", f"{self.name}:{key}")
+
+    def generation(self, namespace: str) -> int:
+        if self.shared is not None:
+            shared = self._shared_call("get_int", f"{self.name}:gen:{namespace}")
+            if shared is not None:
+                return shared
+        return self._generations.get(namespace, 0)
+
+    def bump(self, namespace: str) -> None:
+        self.invalidations += 1
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        if self.shared is not None:
+            self._shared_call("incr", f"{self.name}:gen:{namespace}")
+
+    async def offload(self, fn: Callable, *args) -> Any:
+        """Run `fn`, which may call the shared tier, in a worker thread when there is one."""
+        if self.shared is None:
+            return fn(*args)
+        return await run_in_threadpool(fn, *args)
+
+    def stats(self) -> dict:
+        local_hits = self.local.hits
+        lookups = local_hits + self.shared_hits + self.misses
+        return {
+            "local": self.local.stats(),
+            "shared_enabled": self.shared is not None,
+            "local_hits": local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": round((local_hits + self.shared_hits) / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+            "shared_errors": self.shared_errors,
+        }
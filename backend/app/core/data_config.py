@@ -14,6 +14,18 @@ database_name = os.getenv("db_database")
 driver = "psycopg2"
 
 DATABASE_URL = f"postgresql+{driver}://{user}:{password}@{host}:{port}/{database_name}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{database_name}"
+
+# Connection pool tuning, shared by the backend and handle-llm engines.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# "sync" serves the API from threadpool routes on psycopg2, "async" from
+# native async routes on asyncpg. Both are kept so they can be load-tested.
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
 
 # engine = create_engine(DATABASE_URL)
 # SessionLocal = sessionmaker(bind=engine)
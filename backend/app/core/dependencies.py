@@ -2,14 +2,19 @@ from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+import uuid
+from typing import Optional
 
-
-from app.database.db_connect import SessionLocal
+from app.database.db_connect import SessionLocal, AsyncSessionLocal
 from app.core.security import decode_access_token
 from app.services import user_service
+from app.schemas.auth import Principal
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+# Same scheme for endpoints that also serve anonymous callers: no token -> None.
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 def get_db():
     db = SessionLocal()
@@ -22,7 +27,16 @@ def get_db():
     finally:
         db.close()
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
 
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -31,10 +45,51 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
 
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid token")
-    
 
-    user = user_service.get_user(db, payload.get("sub"))
+    user_id = principal_id(payload)
+
+    # Served from the in-process user cache; only a miss queries the DB.
+    user = user_service.get_principal(db, user_id, token_version(payload))
+    return check_principal(payload, user)
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Principal:
+    payload = decode_access_token(token) if token else None
+
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user = await user_service.get_principal_async(db, principal_id(payload), token_version(payload))
+    return check_principal(payload, user)
+
+def get_optional_user(token: Optional[str] = Depends(optional_oauth2_scheme), db: Session = Depends(get_db)) -> Optional[Principal]:
+    # A token that is present but invalid is still an error, not an anonymous call.
+    return get_current_user(token, db) if token else None
+
+async def get_optional_user_async(token: Optional[str] = Depends(optional_oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Optional[Principal]:
+    return await get_current_user_async(token, db) if token else None
+
+def principal_id(payload: dict) -> uuid.UUID:
+    try:
+        return uuid.UUID(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+def token_version(payload: dict) -> int:
+    version = payload.get("ver", 0)
+    if not isinstance(version, int):
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return version
+
+def check_principal(payload: dict, user: Principal) -> Principal:
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    return user
+
+    # Bumped by password changes and logout-all (user_service.revoke_tokens).
+    if token_version(payload) != user.token_version:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
+    return Principal(
+        id=user.id,
+        username=payload.get("username", user.username),
+        token_version=user.token_version,
+    )
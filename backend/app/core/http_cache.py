@@ -0,0 +1,54 @@
+import hashlib
+import json
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+# Clients may reuse a stored copy but must revalidate it (cheap 304s).
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def weak_etag(parts: Iterable) -> str:
+    digest = hashlib.sha1(json.dumps(list(parts), default=str).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value, usegmt=True)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison: ignore W/ prefixes on both sides.
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: Optional[datetime]) -> bool:
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+def conditional_json(request: Request, body, etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """200 with validators, or 304 when the client's copy is still current."""
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, etag) or (
+        if_none_match is None and not_modified_since(request.headers.get("if-modified-since"), last_modified)
+    ):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(body, headers=headers)
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from app.core.logger import logger
+
+# Derivatives generated for every raster upload: name -> max width/height (px).
+VARIANTS = {"thumb": 320, "card": 800, "full": 1600}
+RASTER_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
+WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _executor
+
+
+def variant_filename(filename: str, variant: str) -> str:
+    return f"{filename.rsplit('.', 1)[0]}_{variant}.webp"
+
+
+def is_raster(filename: str) -> bool:
+    return "." in filename and filename.rsplit(".", 1)[1].lower() in RASTER_EXTENSIONS
+
+
+def manifest_filename(filename: str) -> str:
+    return f"{filename.rsplit('.', 1)[0]}_variants.json"
+
+
+def make_variants(path: str) -> dict[str, dict]:
+    """Write resized WebP variants next to `path`; runs inside the worker process.
+
+    Returns name -> {"file", "width"} with the width actually written, which is
+    smaller than the nominal size for portrait or small originals. The manifest
+    is written last, so its presence means every variant is complete on disk.
+    """
+    from PIL import Image, ImageOps
+
+    source = Path(path)
+    manifest = source.with_name(manifest_filename(source.name))
+    if manifest.exists():
+        # Content-addressed duplicate: its variants were generated on first upload.
+        return json.loads(manifest.read_text())
+
+    variants = {}
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "PA") else "RGB")
+        for name, size in VARIANTS.items():
+            filename = variant_filename(source.name, name)
+            target = source.with_name(filename)
+            if target.exists():
+                with Image.open(target) as existing:
+                    width = existing.width
+            else:
+                resized = img.copy()
+                resized.thumbnail((size, size), Image.LANCZOS)
+                tmp = target.with_name(f".{filename}.part")
+                resized.save(tmp, format="WEBP", quality=WEBP_QUALITY, method=4)
+                os.replace(tmp, target)
+                width = resized.width
+            variants[name] = {"file": filename, "width": width}
+
+    tmp = manifest.with_name(f".{manifest.name}.part")
+    tmp.write_text(json.dumps(variants))
+    os.replace(tmp, manifest)
+    return variants
+
+
+def _variant_entries(variants: dict[str, dict]) -> dict[str, dict]:
+    return {name: {"url": f"/uploads/{v['file']}", "width": v["width"]} for name, v in variants.items()}
+
+
+async def generate_variants(upload_dir: Path, filename: str) -> dict[str, dict]:
+    """Build the variants for an upload in the process pool and return their URLs and widths."""
+    if not is_raster(filename):
+        return {}
+    loop = asyncio.get_running_loop()
+    try:
+        variants = await loop.run_in_executor(get_executor(), make_variants, str(upload_dir / filename))
+    except Exception as e:
+        # Not decodable as an image; keep the original upload, just without variants.
+        logger.warning({"event": "image_variants_failed", "file": filename, "error": str(e)})
+        return {}
+    return _variant_entries(variants)
+
+
+def submit_variants(upload_dir: Path, filename: str) -> None:
+    """Fire-and-forget variant generation for callers that can't await."""
+    if is_raster(filename):
+        get_executor().submit(make_variants, str(upload_dir / filename))
+
+
+def variant_urls(url: Optional[str], upload_dir: Path) -> dict[str, dict]:
+    """Variants of an /uploads/ image whose generation has finished.
+
+    Empty while a background build is still running (or failed), in which case
+    clients fall back to the original image.
+    """
+    if not url or not url.startswith("/uploads/"):
+        return {}
+    manifest = upload_dir / manifest_filename(url[len("/uploads/"):])
+    try:
+        variants = json.loads(manifest.read_text())
+    except (OSError, ValueError):
+        return {}
+    return _variant_entries(variants)
@@ -1,13 +1,186 @@
+import atexit
+import contextvars
+import copy
 import logging
+import os
+import queue
+import random
 import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
 import json_log_formatter
 
-formatter = json_log_formatter.JSONFormatter()
+# Current request's trace id (set by LoggingMiddleware), stamped on every record.
+trace_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("trace_id", default="-")
+
+# Records waiting for the writer thread; when full, new records are dropped
+# (and counted) rather than blocking the caller on a slow stdout.
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Fraction of successful (< 400) access-log lines kept; errors are always logged.
+LOG_ACCESS_SAMPLE_RATE = float(os.getenv("LOG_ACCESS_SAMPLE_RATE", "1.0"))
+# Records per second allowed per level, e.g. "DEBUG=50,INFO=500,WARNING=100".
+# Levels not listed are never rate limited.
+LOG_RATE_LIMITS = os.getenv("LOG_RATE_LIMITS", "DEBUG=50,INFO=1000,WARNING=200")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+
+class StructuredJSONFormatter(json_log_formatter.JSONFormatter):
+    """JSON lines where dict messages become top-level fields.
+
+    `time` is when the record was created, not when the writer thread got
+    to it.
+    """
+
+    def json_record(self, message, extra, record):
+        if isinstance(record.msg, dict):
+            extra.update(record.msg)
+            message = record.msg.get("event", "")
+        extra = super().json_record(message, extra, record)
+        extra["time"] = datetime.fromtimestamp(record.created, timezone.utc)
+        extra["level"] = record.levelname
+        extra["logger"] = record.name
+        if record.exc_text and "exc_info" not in extra:
+            extra["exc_info"] = record.exc_text
+        return extra
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Hands records to the writer thread without ever blocking the caller."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Keep dict messages intact for the JSON formatter (the default
+        # prepare would flatten them to str); only render what can't be
+        # safely handed to another thread.
+        record = copy.copy(record)
+        if record.args and not isinstance(record.msg, dict):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.trace_id = trace_id_var.get()
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LevelRateLimitFilter(logging.Filter):
+    """Token bucket per level; counts what it drops and reports it on the next record through."""
+
+    def __init__(self, limits: dict[int, float]):
+        super().__init__()
+        self.limits = limits
+        self._lock = threading.Lock()
+        self._buckets = {level: (rate, time.monotonic()) for level, rate in limits.items()}
+        self.suppressed = {level: 0 for level in limits}
+        self.suppressed_total = {logging.getLevelName(level): 0 for level in limits}
+
+    def filter(self, record):
+        rate = self.limits.get(record.levelno)
+        if rate is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets[record.levelno]
+            tokens = min(rate, tokens + (now - updated) * rate)
+            if tokens < 1:
+                self._buckets[record.levelno] = (tokens, now)
+                self.suppressed[record.levelno] += 1
+                self.suppressed_total[record.levelname] += 1
+                return False
+            self._buckets[record.levelno] = (tokens - 1, now)
+            if self.suppressed[record.levelno]:
+                record.suppressed_before = self.suppressed[record.levelno]
+                self.suppressed[record.levelno] = 0
+        return True
+
 
-handler = logging.StreamHandler(sys.stdout)
-handler.setFormatter(formatter)
+class AccessSampleFilter(logging.Filter):
+    """Keeps LOG_ACCESS_SAMPLE_RATE of successful requests and every error."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.sampled_out = 0
+
+    def filter(self, record):
+        if self.rate >= 1 or record.levelno >= logging.WARNING:
+            return True
+        if isinstance(record.msg, dict) and record.msg.get("status_code", 0) >= 400:
+            return True
+        if random.random() < self.rate:
+            record.sample_rate = self.rate
+            return True
+        self.sampled_out += 1
+        return False
+
+
+def parse_rate_limits(spec: str) -> dict[int, float]:
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        level, _, rate = item.partition("=")
+        limits[logging.getLevelName(level.strip().upper())] = float(rate)
+    return limits
+
+
+stream_handler = logging.StreamHandler(sys.stdout)
+stream_handler.setFormatter(StructuredJSONFormatter())
+
+log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+queue_handler = DroppingQueueHandler(log_queue)
+rate_limit_filter = LevelRateLimitFilter(parse_rate_limits(LOG_RATE_LIMITS))
+queue_handler.addFilter(rate_limit_filter)
+
+listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
+
+
+def _restart_listener_in_child():
+    # Forked workers (image/sanitizer pools) inherit the queue but not the
+    # writer thread; give them their own so their records aren't stranded.
+    global log_queue, listener
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler.queue = log_queue
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
 
 logger = logging.getLogger("blog_app_logger")
-logger.addHandler(handler)
-logger.setLevel(logging.INFO)
+logger.addHandler(queue_handler)
+logger.setLevel(LOG_LEVEL)
+
+# One line per HTTP request; sampled separately from everything else.
+access_logger = logging.getLogger("blog_app_logger.access")
+access_sample_filter = AccessSampleFilter(LOG_ACCESS_SAMPLE_RATE)
+access_logger.addFilter(access_sample_filter)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Child of blog_app_logger, sharing its queue, filters and format."""
+    return logging.getLogger(f"blog_app_logger.{name}")
+
 
+def log_stats() -> dict:
+    return {
+        "queued": log_queue.qsize(),
+        "queue_size": LOG_QUEUE_SIZE,
+        "dropped": queue_handler.dropped,
+        "rate_limited": dict(rate_limit_filter.suppressed_total),
+        "access_sampled_out": access_sample_filter.sampled_out,
+        "access_sample_rate": access_sample_filter.rate,
+    }
@@ -0,0 +1,126 @@
+import os
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.responses import Response
+
+# Seconds; tuned for API handlers (sub-ms cache hits up to multi-second bulk writes).
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Label for requests no route matched, so 404 scans can't blow up cardinality.
+UNMATCHED_ROUTE = "<unmatched>"
+
+http_request_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+db_query_seconds = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement latency by engine and statement verb.",
+    ["engine", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+db_query_errors = Counter(
+    "db_query_errors_total",
+    "SQL statements that raised, by engine and statement verb.",
+    ["engine", "operation"],
+)
+
+
+def route_template(scope) -> str:
+    """The matched route's path template (`/blogs/{blog_id}`), never the raw path."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "app_root_path" in scope:
+        # Matched a Mount (e.g. /uploads static files).
+        return scope["root_path"][len(scope["app_root_path"]):] + "/{path}"
+    return UNMATCHED_ROUTE
+
+
+def statement_operation(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+class OpsCollector:
+    """Publishes the in-process counters behind /ops/* as Prometheus metrics.
+
+    These live in each worker's memory, so they can't go through the
+    multiprocess files. With `per_process=True` every sample carries a
+    `pid` label: a multiprocess scrape then shows the worker that answered
+    it, instead of the series vanishing or workers overwriting each other.
+    """
+
+    def __init__(self, per_process: bool = False):
+        self.per_process = per_process
+
+    def describe(self):
+        # Keeps register() from calling collect() while those modules are still importing.
+        return []
+
+    def collect(self):
+        # Imported here: these modules import this one for their own metrics.
+        from app.core.cache import caches
+        from app.core.logger import log_stats
+        from app.database.engine_factory import pool_metrics
+
+        extra = [str(os.getpid())] if self.per_process else []
+
+        def family(kind, name, documentation, labels=()):
+            return kind(name, documentation, labels=[*labels, *(["pid"] if self.per_process else [])])
+
+        checked_out = family(GaugeMetricFamily, "db_pool_checked_out", "Connections checked out of the pool.", ["engine"])
+        overflow = family(GaugeMetricFamily, "db_pool_overflow", "Connections open beyond pool_size.", ["engine"])
+        timeouts = family(CounterMetricFamily, "db_pool_checkout_timeouts", "Pool checkouts that timed out.", ["engine"])
+        for name, metrics in pool_metrics.items():
+            if metrics.engine is None:
+                continue
+            snapshot = metrics.snapshot()
+            checked_out.add_metric([name, *extra], snapshot["checked_out"])
+            overflow.add_metric([name, *extra], snapshot["overflow"])
+            timeouts.add_metric([name, *extra], snapshot["checkout_timeouts"])
+        yield from (checked_out, overflow, timeouts)
+
+        hits = family(CounterMetricFamily, "cache_hits", "In-process cache hits.", ["cache"])
+        misses = family(CounterMetricFamily, "cache_misses", "In-process cache misses.", ["cache"])
+        for name, cache in caches.items():
+            stats = cache.stats()
+            # TTLCache reports hits; TieredCache splits them by tier.
+            hits.add_metric([name, *extra], stats.get("hits", stats.get("local_hits", 0) + stats.get("shared_hits", 0)))
+            misses.add_metric([name, *extra], stats.get("misses", 0))
+        yield from (hits, misses)
+
+        stats = log_stats()
+        queued = family(GaugeMetricFamily, "log_queue_depth", "Log records waiting for the writer thread.")
+        queued.add_metric(extra, stats["queued"])
+        dropped = family(CounterMetricFamily, "log_records_dropped", "Log records dropped on a full queue.")
+        dropped.add_metric(extra, stats["dropped"])
+        yield from (queued, dropped)
+
+
+REGISTRY.register(OpsCollector())
+
+
+def metrics_response() -> Response:
+    """Exposition for GET /metrics; aggregates worker processes when PROMETHEUS_MULTIPROC_DIR is set.
+
+    The ops series (pool, cache, log queue) are per-process either way; in
+    multiprocess mode they are the answering worker's, labelled by pid.
+    """
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(OpsCollector(per_process=True))
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
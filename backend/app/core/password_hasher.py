@@ -0,0 +1,127 @@
+import asyncio
+import bisect
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.core import security
+
+# The bcrypt C extension releases the GIL, so a few threads give real
+# parallelism; keeping them separate from the AnyIO pool means a login burst
+# queues here instead of starving every other sync endpoint.
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Jobs allowed to wait or run at once; beyond this requests fail fast with 503.
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", str(BCRYPT_WORKERS * 16)))
+
+# Scheduling niceness for the hasher threads (Linux applies it per thread), so
+# request-serving threads win the CPU when bcrypt saturates it. 0 disables.
+BCRYPT_NICE = int(os.getenv("BCRYPT_NICE", "10"))
+
+# Upper bounds (ms) of the queue-wait histogram buckets; the last is +Inf.
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def _lower_priority():
+    if BCRYPT_NICE and hasattr(os, "setpriority"):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), BCRYPT_NICE)
+        except OSError:
+            pass
+
+
+class PasswordHasher:
+    """Bounded executor for bcrypt work, with queue and latency metrics."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt", initializer=_lower_priority)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_sum_ms = 0.0
+        self.run_sum_ms = 0.0
+
+    def _run(self, queued_at: float, fn, args):
+        started = time.perf_counter()
+        wait_ms = (started - queued_at) * 1000
+        with self._lock:
+            self.running += 1
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            self.wait_sum_ms += wait_ms
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.run_sum_ms += (time.perf_counter() - started) * 1000
+
+    def _done(self, future: Future):
+        # Also runs for jobs cancelled before starting (client went away).
+        with self._lock:
+            self.pending -= 1
+
+    def _reject(self):
+        self.rejected += 1
+        raise HTTPException(status_code=503, detail="Too many concurrent logins, retry shortly",
+                            headers={"Retry-After": "1"})
+
+    def ensure_capacity(self):
+        """Fail fast before doing any other work for a request that would be rejected."""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self._reject()
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self._reject()
+            self.pending += 1
+        future = self._executor.submit(self._run, time.perf_counter(), fn, args)
+        future.add_done_callback(self._done)
+        return future
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(security.hash_password, password))
+
+    async def verify_async(self, password: str, hashed: str) -> tuple[bool, Optional[str]]:
+        valid, new_hash = await asyncio.wrap_future(self.submit(security.verify_and_rehash, password, hashed))
+        if new_hash:
+            with self._lock:
+                self.rehashed += 1
+        return valid, new_hash
+
+    def hash(self, password: str) -> str:
+        """Blocking variant for scripts and other non-async callers."""
+        return self.submit(security.hash_password, password).result()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(WAIT_BUCKETS_MS + ("+Inf",), self.wait_buckets):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "rounds": security.BCRYPT_ROUNDS,
+                "queued": self.pending - self.running,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "queue_wait_ms": {"count": cumulative, "sum": round(self.wait_sum_ms, 3), "buckets": buckets},
+                "run_ms_sum": round(self.run_sum_ms, 3),
+            }
+
+
+password_hasher = PasswordHasher(BCRYPT_WORKERS, BCRYPT_MAX_PENDING)
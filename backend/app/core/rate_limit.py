@@ -0,0 +1,196 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import REDIS_URL
+from app.core.logger import logger
+
+# Every login attempt spends an IP token and reserves a username token; a
+# successful login refunds the username token, so a user who logs in often
+# is never throttled, while a password-guessing run against one account is,
+# even when its guesses run in parallel.
+LOGIN_IP_BURST = int(os.getenv("LOGIN_IP_BURST", "30"))
+LOGIN_IP_PER_MINUTE = float(os.getenv("LOGIN_IP_PER_MINUTE", "30"))
+LOGIN_USER_BURST = int(os.getenv("LOGIN_USER_BURST", "5"))
+LOGIN_USER_PER_MINUTE = float(os.getenv("LOGIN_USER_PER_MINUTE", "1"))
+# Only enable behind a proxy that sets X-Forwarded-For; otherwise clients pick their own IP.
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+
+class Bucket(NamedTuple):
+    capacity: float
+    per_second: float
+
+
+class MemoryTokenBuckets:
+    """Per-process token buckets, LRU-bounded so a spray of IPs can't grow it forever."""
+
+    # take() never waits on I/O, so it is safe to call on the event loop.
+    remote = False
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, bucket: Bucket, cost: int = 1) -> float:
+        """Spend `cost` tokens (0 just checks for one, negative refunds); returns 0, or seconds until allowed."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (bucket.capacity, now))
+            tokens = min(bucket.capacity, tokens + (now - updated) * bucket.per_second)
+            need = max(cost, 1)
+            retry_after = 0.0
+            if cost < 0 or tokens >= need:
+                tokens = min(bucket.capacity, tokens - cost)
+            else:
+                retry_after = (need - tokens) / bucket.per_second
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+
+# Same algorithm as MemoryTokenBuckets, atomic in Redis and timed by the
+# Redis clock so every API node shares one bucket per key.
+TAKE_SCRIPT = """
+local capacity, rate, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens, ts = tonumber(state[1]) or capacity, tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local need = math.max(cost, 1)
+local retry = 0
+if cost < 0 or tokens >= need then tokens = math.min(capacity, tokens - cost) else retry = (need - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry)
+"""
+
+
+class RedisTokenBuckets:
+    # Each take() is a network round trip (up to the socket timeout): keep it off the event loop.
+    remote = True
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis
+
+        self.prefix = prefix
+        self._take = redis.Redis.from_url(url, socket_timeout=0.25).register_script(TAKE_SCRIPT)
+
+    def take(self, key: str, bucket: Bucket, cost: int = 1) -> float:
+        return float(self._take(keys=[self.prefix + key], args=[bucket.capacity, bucket.per_second, cost]))
+
+
+def token_buckets():
+    """Redis-backed buckets when REDIS_URL is set, else per-process ones."""
+    if REDIS_URL:
+        try:
+            return RedisTokenBuckets(REDIS_URL)
+        except ImportError:
+            logger.warning({"event": "rate_limit_shared_backend_disabled", "reason": "redis package not installed"})
+    return MemoryTokenBuckets()
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class LoginRateLimiter:
+    """Checked before the user lookup and bcrypt; the outcome is recorded after.
+
+    The *_async methods are for async routes: they hop to the threadpool
+    when the buckets live in Redis.
+    """
+
+    def __init__(self, backend, ip_bucket: Bucket, user_bucket: Bucket):
+        self.backend = backend
+        self.ip_bucket = ip_bucket
+        self.user_bucket = user_bucket
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.failures = 0
+        self.rejected = {"ip": 0, "username": 0}
+        self.backend_errors = 0
+
+    def _take(self, key: str, bucket: Bucket, cost: int) -> float:
+        try:
+            return self.backend.take(key, bucket, cost)
+        except Exception as e:
+            # Fail open: an unreachable Redis must not lock everyone out.
+            with self._lock:
+                self.backend_errors += 1
+            logger.warning({"event": "rate_limit_backend_error", "error": str(e)})
+            return 0.0
+
+    def _reject(self, scope: str, retry_after: float):
+        with self._lock:
+            self.rejected[scope] += 1
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts, retry later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def check(self, ip: str, username: str) -> None:
+        with self._lock:
+            self.checks += 1
+        retry_after = self._take(f"login:ip:{ip}", self.ip_bucket, 1)
+        if retry_after:
+            self._reject("ip", retry_after)
+        # Reserved now rather than spent on failure, so parallel guesses can't
+        # all pass the check before the first one fails.
+        retry_after = self._take(f"login:user:{username.strip().lower()}", self.user_bucket, 1)
+        if retry_after:
+            self._reject("username", retry_after)
+
+    def record_failure(self, username: str) -> None:
+        # The username token reserved by check() stays spent.
+        with self._lock:
+            self.failures += 1
+
+    def record_success(self, username: str) -> None:
+        self._take(f"login:user:{username.strip().lower()}", self.user_bucket, -1)
+
+    async def check_async(self, ip: str, username: str) -> None:
+        if self.backend.remote:
+            await run_in_threadpool(self.check, ip, username)
+        else:
+            self.check(ip, username)
+
+    async def record_success_async(self, username: str) -> None:
+        if self.backend.remote:
+            await run_in_threadpool(self.record_success, username)
+        else:
+            self.record_success(username)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "checks": self.checks,
+                "failed_logins": self.failures,
+                "rejected": dict(self.rejected),
+                "backend_errors": self.backend_errors,
+                "ip_bucket": self.ip_bucket._asdict(),
+                "user_bucket": self.user_bucket._asdict(),
+            }
+
+
+login_limiter = LoginRateLimiter(
+    token_buckets(),
+    ip_bucket=Bucket(LOGIN_IP_BURST, LOGIN_IP_PER_MINUTE / 60),
+    user_bucket=Bucket(LOGIN_USER_BURST, LOGIN_USER_PER_MINUTE / 60),
+)
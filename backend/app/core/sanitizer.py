@@ -1,7 +1,17 @@
 # import bleach
+import asyncio
+import hashlib
+import html
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
 from bleach.css_sanitizer import CSSSanitizer
 from bleach.sanitizer import Cleaner
 
+from app.core.cache import TTLCache, caches
+
 ALLOWED_TAGS = [
     'b', 'i', 'u', 'em', 'strong', 'a', 'p', 'ul', 'ol', 'li', 'br', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
 ]
@@ -13,12 +23,121 @@ ALLOWED_STYLES = ['color', 'font-weight', 'text-decoration']
 
 css_sanitizer = CSSSanitizer(allowed_css_properties=ALLOWED_STYLES)
 
-cleaner = Cleaner(
-    tags=ALLOWED_TAGS,
-    attributes=ALLOWED_ATTRIBUTES,
-    css_sanitizer=css_sanitizer,
-    strip=True
+# A bleach Cleaner keeps parser state and isn't thread-safe; sync routes run
+# in a thread pool, so each thread gets its own.
+_local = threading.local()
+
+
+def get_cleaner() -> Cleaner:
+    cleaner = getattr(_local, "cleaner", None)
+    if cleaner is None:
+        cleaner = _local.cleaner = Cleaner(
+            tags=ALLOWED_TAGS,
+            attributes=ALLOWED_ATTRIBUTES,
+            css_sanitizer=css_sanitizer,
+            strip=True
+        )
+    return cleaner
+
+
+def clean_html(content: str) -> str:
+    """The uncached cleaner; also what runs inside the worker processes."""
+    return get_cleaner().clean(content)
+
+
+# bleach is pure Python and holds the GIL, so large documents are cleaned in
+# worker processes; the calling thread (or event loop) just waits on the result.
+SANITIZE_WORKERS = int(os.getenv("SANITIZE_WORKERS", str(os.cpu_count() or 1)))
+SANITIZE_OFFLOAD_BYTES = int(os.getenv("SANITIZE_OFFLOAD_BYTES", str(32 * 1024)))
+# Below this many documents the pickling round-trip costs more than it saves.
+PARALLEL_MIN_ITEMS = 32
+
+# Clean output by SHA-256 of the raw input: autosaves and re-saves of
+# unchanged content skip the cleaner entirely.
+SANITIZE_CACHE_MAX_BYTES = 256 * 1024
+sanitize_cache = TTLCache(
+    maxsize=int(os.getenv("SANITIZE_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("SANITIZE_CACHE_TTL", "3600")),
 )
+caches["sanitizer"] = sanitize_cache
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=SANITIZE_WORKERS)
+    return _executor
+
+
+def content_key(content: str) -> bytes:
+    return hashlib.sha256(content.encode("utf-8", "surrogatepass")).digest()
+
+
+def remember(key: bytes, clean: str) -> str:
+    if len(clean) <= SANITIZE_CACHE_MAX_BYTES:
+        sanitize_cache.set(key, clean)
+    return clean
+
+
+def offload(content: str) -> bool:
+    return SANITIZE_WORKERS > 1 and len(content) >= SANITIZE_OFFLOAD_BYTES
+
 
 def sanitize_html(content: str) -> str:
-    return cleaner.clean(content)
+    key = content_key(content)
+    clean = sanitize_cache.get(key)
+    if clean is not None:
+        return clean
+    if offload(content):
+        clean = get_executor().submit(clean_html, content).result()
+    else:
+        clean = clean_html(content)
+    return remember(key, clean)
+
+
+async def sanitize_html_async(content: str) -> str:
+    """sanitize_html for the event loop: large inputs are awaited, not blocked on."""
+    key = content_key(content)
+    clean = sanitize_cache.get(key)
+    if clean is not None:
+        return clean
+    if offload(content):
+        clean = await asyncio.get_running_loop().run_in_executor(get_executor(), clean_html, content)
+    else:
+        clean = clean_html(content)
+    return remember(key, clean)
+
+
+def sanitize_many(contents: list[str]) -> list[str]:
+    """sanitize_html over a batch; cache misses go to the worker pool when there are enough of them."""
+    keys = [content_key(content) for content in contents]
+    results = [sanitize_cache.get(key) for key in keys]
+    misses = [i for i, clean in enumerate(results) if clean is None]
+    pending = [contents[i] for i in misses]
+
+    if len(pending) < PARALLEL_MIN_ITEMS or SANITIZE_WORKERS <= 1:
+        cleaned = [clean_html(content) for content in pending]
+    else:
+        chunksize = max(1, len(pending) // (SANITIZE_WORKERS * 4))
+        cleaned = get_executor().map(clean_html, pending, chunksize=chunksize)
+
+    for i, clean in zip(misses, cleaned):
+        results[i] = remember(keys[i], clean)
+    return results
+
+
+EXCERPT_LENGTH = 200
+
+_tag_re = re.compile(r"<[^>]+>")
+_space_re = re.compile(r"\s+")
+
+def make_excerpt(clean_content: str, length: int = EXCERPT_LENGTH) -> str:
+    # Expects already-sanitized HTML, so a plain tag strip is enough here.
+    plain = html.unescape(_tag_re.sub(" ", clean_content))
+    plain = _space_re.sub(" ", plain).strip()
+    if len(plain) <= length:
+        return plain
+    cut = plain[:length].rsplit(" ", 1)[0] or plain[:length]
+    return cut.rstrip(" ,.;:") + "…"
@@ -3,8 +3,19 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.jwt_config import settings
 from typing import Optional
+import os
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost factor. Pinning min/max to it makes hashes at any other cost
+# "need update", so logins re-hash them after BCRYPT_ROUNDS changes.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -12,6 +23,10 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_rehash(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """(valid, new_hash); new_hash is set when the stored hash used another cost."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -19,6 +34,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def create_user_token(user_id, username: str, token_version: int) -> str:
+    # "ver" ties the token to users.token_version; bumping it revokes the token.
+    return create_access_token(
+        {"sub": str(user_id), "username": username, "ver": token_version},
+        expires_delta=timedelta(minutes=720),
+    )
+
 def decode_access_token(token: str):
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
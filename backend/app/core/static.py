@@ -0,0 +1,48 @@
+import os
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+# Upload filenames are content hashes (or random ids) and are never rewritten.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class UploadStaticFiles(StaticFiles):
+    """StaticFiles for /uploads: strong ETags, immutable caching, optional X-Accel-Redirect.
+
+    Range requests and If-Range are handled by FileResponse, which also uses
+    the ASGI pathsend extension (kernel sendfile) on servers that offer it.
+    Behind nginx, set `accel_redirect_prefix` to an internal location and the
+    file body is handed off via X-Accel-Redirect instead.
+    """
+
+    def __init__(self, *args, accel_redirect_prefix: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.accel_redirect_prefix = accel_redirect_prefix
+
+    def lookup_path(self, path: str):
+        # Hide in-progress temp files (.upload-*.part) and other dotfiles.
+        if os.path.basename(path).startswith("."):
+            return "", None
+        return super().lookup_path(path)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        filename = os.path.basename(full_path)
+        headers = {
+            "cache-control": IMMUTABLE_CACHE_CONTROL,
+            # Name -> bytes never changes, so the name is a strong validator.
+            "etag": f'"{filename.rsplit(".", 1)[0]}"',
+        }
+
+        response = FileResponse(full_path, status_code=status_code, headers=headers, stat_result=stat_result)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        if self.accel_redirect_prefix:
+            headers["x-accel-redirect"] = f"{self.accel_redirect_prefix.rstrip('/')}/{filename}"
+            return Response(status_code=status_code, headers=headers, media_type=response.media_type)
+        return response
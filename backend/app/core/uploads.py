@@ -0,0 +1,136 @@
+import hashlib
+import os
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+# Backend upload directory (served at /uploads); handle-llm passes its own path.
+UPLOAD_DIR = Path("uploads")
+
+# Shared by backend /upload/image and handle-llm /upload.
+ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp", "svg"}
+CHUNK_SIZE = 64 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+
+# Uploads are content-addressed (<sha256>.<ext>); one row per stored object,
+# so a repeat upload of the same bytes costs neither disk nor a new row.
+RECORD_UPLOAD_SQL = text("""
+    INSERT INTO blogapp_schema.upload_object (sha256, filename, size_bytes)
+    VALUES (:sha256, :filename, :size_bytes)
+    ON CONFLICT (filename) DO NOTHING
+    RETURNING filename
+""")
+
+# ref_count counts the live blogs referencing an object. Files stored before
+# upload_object existed have no row and are skipped; the floor at zero keeps
+# such a file from going negative if its bytes are uploaded again later.
+ADJUST_REFS_SQL = text("""
+    UPDATE blogapp_schema.upload_object
+    SET ref_count = GREATEST(ref_count + :delta, 0)
+    WHERE filename = ANY(:filenames)
+""")
+
+
+class StoredUpload(NamedTuple):
+    filename: str
+    sha256: str
+    size: int
+    created: bool
+
+
+def allowed_file(filename: str):
+    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def content_filename(sha256: str, extension: str) -> str:
+    return f"{sha256}.{extension.lower()}"
+
+
+def upload_filenames(urls: Iterable[Optional[str]]) -> set[str]:
+    """Stored objects behind a set of image URLs (only /uploads/ ones are ours)."""
+    return {url[len("/uploads/"):] for url in urls if url and url.startswith("/uploads/")}
+
+
+def ref_count_params(deltas: dict[str, int]) -> list[dict]:
+    """ADJUST_REFS_SQL parameters, one statement per distinct delta."""
+    by_delta = defaultdict(list)
+    for filename, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(filename)
+    return [{"delta": delta, "filenames": sorted(names)} for delta, names in sorted(by_delta.items())]
+
+
+def record_upload(conn, stored: StoredUpload) -> bool:
+    """Register the object on a Connection or Session; False if it was already registered."""
+    return conn.execute(
+        RECORD_UPLOAD_SQL,
+        {"sha256": stored.sha256, "filename": stored.filename, "size_bytes": stored.size},
+    ).first() is not None
+
+
+def store_bytes(data: bytes, extension: str, upload_dir: Path) -> StoredUpload:
+    """Content-address an in-memory file, writing it only if it isn't stored yet."""
+    sha256 = hashlib.sha256(data).hexdigest()
+    filename = content_filename(sha256, extension)
+    target = upload_dir / filename
+    if target.exists():
+        return StoredUpload(filename, sha256, len(data), created=False)
+
+    fd, tmp_path = tempfile.mkstemp(dir=upload_dir, prefix=".upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            buffer.write(data)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return StoredUpload(filename, sha256, len(data), created=True)
+
+
+async def save_upload(file: UploadFile, upload_dir: Path, max_bytes: Optional[int] = None) -> StoredUpload:
+    """Stream `file` into `upload_dir` one chunk at a time, stored under its SHA-256.
+
+    Bytes go to a temp file in the same directory and are renamed into place
+    only once complete, so readers never see a partial image. If an object
+    with the same hash already exists the temp file is dropped instead.
+    Routes also sit behind UploadLimitMiddleware, which turns oversized
+    bodies away before they are received; the checks here are exact.
+    """
+    max_bytes = max_bytes or MAX_UPLOAD_BYTES
+    if not file.filename or not allowed_file(file.filename):
+        raise HTTPException(status_code=400, detail="Invalid file type")
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail="File too large")
+
+    file_extension = file.filename.rsplit(".", 1)[1].lower()
+    fd, tmp_path = tempfile.mkstemp(dir=upload_dir, prefix=".upload-", suffix=".part")
+    try:
+        written = 0
+        digest = hashlib.sha256()
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := await file.read(CHUNK_SIZE):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise HTTPException(status_code=413, detail="File too large")
+                digest.update(chunk)
+                await run_in_threadpool(buffer.write, chunk)
+
+        sha256 = digest.hexdigest()
+        filename = content_filename(sha256, file_extension)
+        target = upload_dir / filename
+        if target.exists():
+            os.unlink(tmp_path)
+            return StoredUpload(filename, sha256, written, created=False)
+        os.replace(tmp_path, target)
+        return StoredUpload(filename, sha256, written, created=True)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
@@ -1,11 +1,15 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from app.core.data_config import DATABASE_URL
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.data_config import DATABASE_URL, ASYNC_DATABASE_URL
+from app.database.engine_factory import build_engine, build_async_engine
 
-engine = create_engine(DATABASE_URL)
+engine = build_engine(DATABASE_URL, name="backend")
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
 
+async_engine = build_async_engine(ASYNC_DATABASE_URL, name="backend_async")
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
 
 
 # from sqlalchemy import create_engine, Column, Integer, String
@@ -0,0 +1,183 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core import data_config
+from app.core.metrics import db_query_errors, db_query_seconds, statement_operation
+
+# Upper bounds (ms) of the checkout-wait histogram buckets; the last is +Inf.
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Seconds spent opening new connections during the current checkout. A ContextVar
+# rather than a thread-local so concurrent async checkouts (greenlets) stay apart.
+_checkout_connect: ContextVar[Optional[list]] = ContextVar("checkout_connect", default=None)
+
+
+class PoolMetrics:
+    """Checkout waits and connection churn for one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine = None
+        self._lock = threading.Lock()
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.timeouts = 0
+        self.checkouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+
+    def observe_wait(self, seconds: float, timed_out: bool = False):
+        ms = seconds * 1000
+        with self._lock:
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, ms)] += 1
+            self.wait_count += 1
+            self.wait_sum_ms += ms
+            if timed_out:
+                self.timeouts += 1
+
+    def incr(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(WAIT_BUCKETS_MS + ("+Inf",), self.wait_buckets):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "checkouts": self.checkouts,
+                "checkout_wait_ms": {
+                    "count": self.wait_count,
+                    "sum": round(self.wait_sum_ms, 3),
+                    "buckets": buckets,
+                },
+                "checkout_timeouts": self.timeouts,
+                "connections_opened": self.connects,
+                "connections_closed": self.closes,
+                "connections_invalidated": self.invalidations,
+            }
+
+
+class _InstrumentedPoolMixin:
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        if self.metrics is None or _checkout_connect.get() is not None:
+            # QueuePool retries by calling _do_get again; only the outermost call is timed.
+            return super()._do_get()
+        connect = [0.0]
+        token = _checkout_connect.set(connect)
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.observe_wait(time.perf_counter() - start - connect[0], timed_out=True)
+            raise
+        finally:
+            _checkout_connect.reset(token)
+        # Time spent connecting isn't time spent waiting for the pool.
+        self.metrics.observe_wait(time.perf_counter() - start - connect[0])
+        return conn
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            connect = _checkout_connect.get()
+            if connect is not None:
+                connect[0] += time.perf_counter() - start
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting to the same metrics.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# Every engine built by this module, by name, for the pool-metrics endpoints.
+pool_metrics: dict[str, PoolMetrics] = {}
+
+
+def pool_options() -> dict:
+    return {
+        "pool_size": data_config.DB_POOL_SIZE,
+        "max_overflow": data_config.DB_MAX_OVERFLOW,
+        "pool_timeout": data_config.DB_POOL_TIMEOUT,
+        "pool_recycle": data_config.DB_POOL_RECYCLE,
+        "pool_pre_ping": data_config.DB_POOL_PRE_PING,
+    }
+
+
+def _instrument(name: str, engine: Engine) -> PoolMetrics:
+    metrics = PoolMetrics(name)
+    metrics.engine = engine
+    engine.pool.metrics = metrics
+
+    event.listen(engine.pool, "checkout", lambda *args: metrics.incr("checkouts"))
+    event.listen(engine.pool, "connect", lambda *args: metrics.incr("connects"))
+    event.listen(engine.pool, "close", lambda *args: metrics.incr("closes"))
+    event.listen(engine.pool, "invalidate", lambda *args: metrics.incr("invalidations"))
+
+    _instrument_queries(name, engine)
+
+    pool_metrics[name] = metrics
+    return metrics
+
+
+def _instrument_queries(name: str, engine: Engine) -> None:
+    """Statement latency and errors into db_query_* (async engines report via sync_engine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        db_query_seconds.labels(name, statement_operation(statement)).observe(elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def on_error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        db_query_errors.labels(name, statement_operation(context.statement or "")).inc()
+
+
+def build_engine(url: str, name: str = "default", **kwargs) -> Engine:
+    options = {**pool_options(), **kwargs}
+    engine = create_engine(url, poolclass=InstrumentedQueuePool, **options)
+    _instrument(name, engine)
+    return engine
+
+
+def build_async_engine(url: str, name: str = "default_async", **kwargs) -> AsyncEngine:
+    options = {**pool_options(), **kwargs}
+    engine = create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, **options)
+    _instrument(name, engine.sync_engine)
+    return engine
@@ -1,16 +1,24 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
-import logging
-import uuid
-from starlette.middleware.base import BaseHTTPMiddleware
 from app.routers import upload_router
-from fastapi.staticfiles import StaticFiles
+import os
+from app.core.static import UploadStaticFiles
 
-from app.routers import user_router, blog_router, auth_router
+from app.routers import user_router, blog_router, auth_router, tag_router
+from app.routers import user_router_async, blog_router_async, auth_router_async, tag_router_async
+from app.routers import ops_router
+from app.core.data_config import DB_MODE
+from app.core.metrics import metrics_response
+from app.database.db_connect import async_engine
 from app.middleware.logging_middleware import LoggingMiddleware
+from app.middleware.upload_limit_middleware import UploadLimitMiddleware
 
 app = FastAPI(title="Blog App API", version="1.0.0")
 
+# Rejects oversized uploads before Starlette spools the multipart body;
+# innermost, so its 413s still get CORS headers.
+app.add_middleware(UploadLimitMiddleware, paths={"/upload/image"})
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],
@@ -19,40 +27,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-logger = logging.getLogger("uvicorn.access")
-logging.basicConfig(level=logging.INFO)
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        logger.info(f"Request: {request.method} {request.url}")
-        response = await call_next(request)
-        logger.info(f"Response Status: {response.status_code}")
-        return response
-
+# Outermost, so its timing and log line cover CORS and everything below.
 app.add_middleware(LoggingMiddleware)
 
-class TraceIdMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        trace_id = str(uuid.uuid4())
-        request.state.trace_id = trace_id
-        response = await call_next(request)
-        response.headers["X-Trace-Id"] = trace_id
-        return response
-
-app.add_middleware(TraceIdMiddleware)
-
-app.include_router(user_router.router)
-app.include_router(blog_router.router)
-app.include_router(auth_router.router)
+if DB_MODE == "async":
+    app.include_router(user_router_async.router)
+    app.include_router(blog_router_async.router)
+    app.include_router(auth_router_async.router)
+    app.include_router(tag_router_async.router)
+else:
+    app.include_router(user_router.router)
+    app.include_router(blog_router.router)
+    app.include_router(auth_router.router)
+    app.include_router(tag_router.router)
 app.include_router(upload_router.router)
+app.include_router(ops_router.router)
 
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.mount(
+    "/uploads",
+    UploadStaticFiles(directory="uploads", accel_redirect_prefix=os.getenv("UPLOADS_ACCEL_REDIRECT")),
+    name="uploads",
+)
 
-app.add_middleware(LoggingMiddleware)
+@app.on_event("shutdown")
+async def shutdown():
+    await async_engine.dispose()
 
 @app.get("/")
 def root():
     return {"message": "Welcome to Blog App API"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
 
 
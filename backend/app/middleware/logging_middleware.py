@@ -1,21 +1,67 @@
+import re
 import time
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from app.core.logger import logger
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-
-        response = await call_next(request)
-
-        process_time = (time.time() - start_time) * 1000
-        log_data = {
-            "method": request.method,
-            "url": str(request.url),
-            "status_code": response.status_code,
-            "process_time_ms": round(process_time, 2)
-        }
-        logger.info(log_data)
-
-        return response
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.logger import access_logger, trace_id_var
+from app.core.metrics import http_request_seconds, http_requests_in_progress, route_template
+
+TRACE_HEADER = b"x-trace-id"
+_valid_trace_id = re.compile(rb"^[A-Za-z0-9._-]{1,64}$")
+
+
+class LoggingMiddleware:
+    """Trace id, timing, request metrics and one access-log line per request, as plain ASGI.
+
+    Replaces a stack of BaseHTTPMiddleware classes: no extra task or body
+    stream per layer, just a wrapped `send` that captures the status and
+    adds the X-Trace-Id header. An incoming X-Trace-Id is reused so a
+    trace can span the proxy, this API and handle-llm.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        trace_id = None
+        for name, value in scope["headers"]:
+            if name == TRACE_HEADER and _valid_trace_id.match(value):
+                trace_id = value.decode()
+                break
+        trace_id = trace_id or uuid.uuid4().hex
+        # Read back by handlers as request.state.trace_id.
+        scope.setdefault("state", {})["trace_id"] = trace_id
+        token = trace_id_var.set(trace_id)
+        status_code = 500
+        in_progress = http_requests_in_progress.labels(scope["method"])
+        in_progress.inc()
+
+        async def send_with_trace_id(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (TRACE_HEADER, trace_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        finally:
+            elapsed = time.perf_counter() - start_time
+            in_progress.dec()
+            # The router has filled in scope["route"] by now.
+            http_request_seconds.labels(scope["method"], route_template(scope), str(status_code)).observe(elapsed)
+            query = scope.get("query_string", b"")
+            access_logger.info({
+                "method": scope["method"],
+                "url": scope["path"] + ("?" + query.decode("latin-1") if query else ""),
+                "status_code": status_code,
+                "process_time_ms": round(elapsed * 1000, 2),
+                "trace_id": trace_id,
+            })
+            trace_id_var.reset(token)
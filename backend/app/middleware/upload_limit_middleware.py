@@ -0,0 +1,50 @@
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import uploads
+
+# Room for the multipart boundary and part headers around the file itself.
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+class UploadLimitMiddleware:
+    """Enforce MAX_UPLOAD_BYTES on upload routes before the body is buffered.
+
+    By the time a route sees an UploadFile, Starlette has already read the
+    whole multipart body and spooled it to a temp file, so a limit checked
+    there still costs the full transfer and a second copy on disk. This
+    answers 413 straight from Content-Length, and counts the bytes of bodies
+    without one (chunked), failing the form parse as soon as they pass it.
+    """
+
+    def __init__(self, app: ASGIApp, paths: set[str]):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Read per request so tests and reloads can change the module setting.
+        limit = uploads.MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                response = JSONResponse({"detail": "File too large"}, status_code=413, headers={"Connection": "close"})
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside the form parse; FastAPI re-raises HTTPException as is.
+                    raise HTTPException(status_code=413, detail="File too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
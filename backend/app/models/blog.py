@@ -1,18 +1,42 @@
-from sqlalchemy import Column, String, Boolean, TIMESTAMP, Text, ForeignKey, text
-from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
+from sqlalchemy import Column, Computed, String, Boolean, TIMESTAMP, Text, ForeignKey, Index, func, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred
 from app.database.db_connect import Base
 
+# Text search configuration and the markup stripped from content before it is
+# indexed; blog_service strips the same way so ts_headline sees the indexed text.
+SEARCH_CONFIG = "english"
+MARKUP_PATTERN = "<[^>]+>"
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', regexp_replace(coalesce(content, ''), '{MARKUP_PATTERN}', ' ', 'g')), 'B')"
+)
+
 class Blog(Base):
     __tablename__ = "blog"
-    __table_args__ = {'schema': 'blogapp_schema'}
+    __table_args__ = (
+        Index("ix_blog_created_at_id", "created_at", "id"),
+        # Feed filters: WHERE NOT is_deleted AND visibility = ... ORDER BY created_at, id.
+        Index("ix_blog_feed", "is_deleted", "visibility", "created_at", "id"),
+        # tags && ARRAY[...] (GET /blogs?tags=...).
+        Index("ix_blog_tags_gin", "tags", postgresql_using="gin"),
+        Index("ix_blog_search_vector", "search_vector", postgresql_using="gin"),
+        {'schema': 'blogapp_schema'},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("uuid_generate_v4()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("blogapp_schema.users.id", ondelete="CASCADE"), nullable=False)
     title = Column(String, nullable=False)
     content = Column(Text, nullable=False)
+    excerpt = Column(Text, nullable=True)
     visibility = Column(String, nullable=False, server_default=text("'public'"))
     is_deleted = Column(Boolean, nullable=False, server_default=text("false"))
     main_image_url = Column(String, nullable=True)
+    image_variants = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
     sub_images = Column(JSONB, nullable=False, server_default=text("'[]'::jsonb"))
-    tags = Column(ARRAY(String), nullable=False, server_default=text("ARRAY[]::text[]"))
+    tags = Column(ARRAY(Text), nullable=False, server_default=text("ARRAY[]::text[]"))
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), onupdate=func.now(), nullable=False)
+    # Maintained by Postgres on every insert/update of title or content; only
+    # queried in SQL, so never loaded onto Blog objects.
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
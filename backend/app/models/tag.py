@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, Text, text
+from app.database.db_connect import Base
+
+class TagCount(Base):
+    # Public, non-deleted posts per tag; kept in step with blog writes by
+    # blog_service so GET /tags never aggregates blog.tags.
+    __tablename__ = "tag_count"
+    __table_args__ = {'schema': 'blogapp_schema'}
+
+    tag = Column(Text, primary_key=True)
+    count = Column(Integer, nullable=False, server_default=text("0"))
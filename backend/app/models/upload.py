@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, Integer, BigInteger, TIMESTAMP, text
+from app.database.db_connect import Base
+
+class UploadObject(Base):
+    __tablename__ = "upload_object"
+    __table_args__ = {'schema': 'blogapp_schema'}
+
+    filename = Column(String, primary_key=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    size_bytes = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, server_default=text("0"))
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
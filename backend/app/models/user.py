@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, TIMESTAMP, text
+from sqlalchemy import Column, Integer, String, TIMESTAMP, text
 from sqlalchemy.dialects.postgresql import UUID
 from app.database.db_connect import Base
 
@@ -9,4 +9,5 @@ class User(Base):
     username = Column(String, unique=True, nullable=False)
     email = Column(String, unique=True, nullable=False)
     password_hash = Column(String, nullable=False)
+    token_version = Column(Integer, nullable=False, server_default=text("0"))
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
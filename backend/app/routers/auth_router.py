@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.database.db_connect import SessionLocal
-from app.schemas.auth import Token
-from app.schemas.user import UserLogin
+from app.schemas.auth import Principal, Token
+from app.schemas.user import PasswordChange, UserLogin
 from app.services import user_service
-from app.core.security import verify_password, create_access_token
-from datetime import timedelta
-from app.core.dependencies import get_db
+from app.core.security import create_user_token
+from app.core.password_hasher import password_hasher
+from app.core.rate_limit import client_ip, login_limiter
+from starlette.concurrency import run_in_threadpool
+from app.core.dependencies import get_current_user, get_db
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -17,11 +19,57 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 #     finally:
 #         db.close()
 
+# async so bcrypt waits on password_hasher's threads rather than pinning an
+# AnyIO worker; the sync Session calls still go through the threadpool.
 @router.post("/login", response_model=Token)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, request: Request, db: Session = Depends(get_db)):
     # user = user_service.get_user_by_email(db, user_data.username)
-    user = user_service.get_user_by_username(db, user_data.username)
-    if not user or not verify_password(user_data.password, user.password_hash):
+    # Cheapest rejections first: nothing below runs for a throttled client.
+    await login_limiter.check_async(client_ip(request), user_data.username)
+    password_hasher.ensure_capacity()
+    user = await run_in_threadpool(user_service.get_user_by_username, db, user_data.username)
+    if not user:
+        login_limiter.record_failure(user_data.username)
         raise HTTPException(status_code=401, detail="Invalid USERNAME or password")
-    access_token = create_access_token({"sub": str(user.id)}, expires_delta=timedelta(minutes=720))
+    valid, new_hash = await password_hasher.verify_async(user_data.password, user.password_hash)
+    if not valid:
+        login_limiter.record_failure(user_data.username)
+        raise HTTPException(status_code=401, detail="Invalid USERNAME or password")
+    if new_hash:
+        await run_in_threadpool(user_service.update_password_hash, db, user, new_hash)
+    await login_limiter.record_success_async(user_data.username)
+    access_token = create_user_token(user.id, user.username, user.token_version)
     return {"access_token": access_token, "token_type": "bearer"}
+
+
+# Changing the password bumps token_version, so every token issued under the
+# old one stops working; the caller gets a fresh token back.
+@router.post("/password", response_model=Token)
+async def change_password(
+    data: PasswordChange,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    # Same throttle as login: this endpoint also confirms a password guess.
+    await login_limiter.check_async(client_ip(request), current_user.username)
+    password_hasher.ensure_capacity()
+    user = await run_in_threadpool(user_service.get_user, db, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    valid, _ = await password_hasher.verify_async(data.current_password, user.password_hash)
+    if not valid:
+        login_limiter.record_failure(current_user.username)
+        raise HTTPException(status_code=401, detail="Invalid password")
+    await login_limiter.record_success_async(current_user.username)
+    password_hash = await password_hasher.hash_async(data.new_password)
+    version = await run_in_threadpool(user_service.change_password, db, current_user.id, password_hash)
+    if version is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"access_token": create_user_token(current_user.id, current_user.username, version), "token_type": "bearer"}
+
+@router.post("/logout-all")
+def logout_all(db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    if user_service.revoke_tokens(db, current_user.id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"message": "All sessions revoked"}
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.auth import Principal, Token
+from app.schemas.user import PasswordChange, UserLogin
+from app.services import user_service
+from app.core.security import create_user_token
+from app.core.password_hasher import password_hasher
+from app.core.rate_limit import client_ip, login_limiter
+from app.core.dependencies import get_async_db, get_current_user_async
+
+# Same routes as auth_router, served on AsyncSession/asyncpg (DB_MODE=async).
+router = APIRouter(prefix="/auth", tags=["Authentication"])
+
+@router.post("/login", response_model=Token)
+async def login(user_data: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Cheapest rejections first: nothing below runs for a throttled client.
+    await login_limiter.check_async(client_ip(request), user_data.username)
+    password_hasher.ensure_capacity()
+    user = await user_service.get_user_by_username_async(db, user_data.username)
+    if not user:
+        login_limiter.record_failure(user_data.username)
+        raise HTTPException(status_code=401, detail="Invalid USERNAME or password")
+    valid, new_hash = await password_hasher.verify_async(user_data.password, user.password_hash)
+    if not valid:
+        login_limiter.record_failure(user_data.username)
+        raise HTTPException(status_code=401, detail="Invalid USERNAME or password")
+    if new_hash:
+        await user_service.update_password_hash_async(db, user, new_hash)
+    await login_limiter.record_success_async(user_data.username)
+    access_token = create_user_token(user.id, user.username, user.token_version)
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post("/password", response_model=Token)
+async def change_password(
+    data: PasswordChange,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    await login_limiter.check_async(client_ip(request), current_user.username)
+    password_hasher.ensure_capacity()
+    user = await user_service.get_user_async(db, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    valid, _ = await password_hasher.verify_async(data.current_password, user.password_hash)
+    if not valid:
+        login_limiter.record_failure(current_user.username)
+        raise HTTPException(status_code=401, detail="Invalid password")
+    await login_limiter.record_success_async(current_user.username)
+    password_hash = await password_hasher.hash_async(data.new_password)
+    version = await user_service.change_password_async(db, current_user.id, password_hash)
+    if version is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"access_token": create_user_token(current_user.id, current_user.username, version), "token_type": "bearer"}
+
+@router.post("/logout-all")
+async def logout_all(db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user_async)):
+    if await user_service.revoke_tokens_async(db, current_user.id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"message": "All sessions revoked"}
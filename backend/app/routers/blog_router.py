@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 from app.database.db_connect import SessionLocal
-from app.schemas.blog import BlogCreate, BlogOut
+from app.schemas.blog import BlogCreate, BlogOut, BlogPage, BlogSearchResult, BlogSummaryOut
+from app.schemas.blog import BlogBulkDelete, BlogBulkResponse, BlogBulkUpdateItem
 from app.services import blog_service
+from app.core.http_cache import conditional_json
 import uuid
 
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_optional_user
 from app.core.dependencies import get_db
 from fastapi import Query
 from app.schemas.blog import BlogUpdate
@@ -24,22 +26,74 @@ router = APIRouter(prefix="/blogs", tags=["Blogs"])
 def create_blog(blog_data: BlogCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     return blog_service.create_blog(db, blog_data, current_user.id)
 
-@router.get("/", response_model=List[BlogOut])
+@router.post("/bulk", response_model=BlogBulkResponse)
+def bulk_create_blogs(
+    items: List[BlogCreate] = Body(..., min_length=1, max_length=blog_service.BULK_MAX_ITEMS),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    return blog_service.bulk_create_blogs(db, items, current_user.id)
+
+@router.put("/bulk", response_model=BlogBulkResponse)
+def bulk_update_blogs(
+    items: List[BlogBulkUpdateItem] = Body(..., min_length=1, max_length=blog_service.BULK_MAX_ITEMS),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    return blog_service.bulk_update_blogs(db, items, current_user.id)
+
+@router.delete("/bulk", response_model=BlogBulkResponse)
+def bulk_delete_blogs(
+    blog_data: BlogBulkDelete,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    return blog_service.bulk_delete_blogs(db, blog_data.ids, current_user.id)
+
+@router.get("/", response_model=Union[BlogPage, List[BlogSummaryOut]])
 def get_blogs(
+    request: Request,
     db: Session = Depends(get_db),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     tags: Optional[List[str]] = Query(None),
-    visibility: Optional[str] = Query("public")
+    visibility: Optional[str] = Query("public"),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor; pass an empty value for the first page"),
 ):
-    return blog_service.get_blogs(db, limit=limit, offset=offset, tags=tags, visibility=visibility)
+    if cursor is not None:
+        try:
+            feed = blog_service.get_blogs_cached(db, limit=limit, tags=tags, visibility=visibility, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        feed = blog_service.get_blogs_cached(db, limit=limit, offset=offset, tags=tags, visibility=visibility)
+    return conditional_json(request, feed, blog_service.feed_etag(feed))
+
+# Declared before /{blog_id} so "search" isn't parsed as a blog id.
+@router.get("/search", response_model=List[BlogSearchResult])
+def search_blogs(
+    q: str = Query(..., min_length=1, max_length=200, description="Keywords; supports \"quoted phrases\", OR and -exclusion"),
+    db: Session = Depends(get_db),
+    limit: int = Query(10, ge=1, le=50),
+    offset: int = Query(0, ge=0),
+    tags: Optional[List[str]] = Query(None),
+    visibility: Optional[str] = Query("public", description="Anything but public searches only the caller's own posts"),
+    current_user=Depends(get_optional_user),
+):
+    user_id = None
+    if visibility != "public":
+        if not current_user:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        user_id = current_user.id
+    return blog_service.search_blogs(db, q, limit=limit, offset=offset, tags=tags, visibility=visibility, user_id=user_id)
 
 @router.get("/{blog_id}", response_model=BlogOut)
-def get_blog(blog_id: uuid.UUID, db: Session = Depends(get_db)):
-    blog = blog_service.get_blog(db, blog_id)
+def get_blog(blog_id: uuid.UUID, request: Request, db: Session = Depends(get_db)):
+    blog = blog_service.get_blog_cached(db, blog_id)
     if not blog:
         raise HTTPException(status_code=404, detail="Blog not found")
-    return blog
+    etag, last_modified = blog_service.blog_validators(blog)
+    return conditional_json(request, blog, etag, last_modified)
 
 @router.delete("/{blog_id}")
 def delete_blog(
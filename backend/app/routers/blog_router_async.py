@@ -0,0 +1,122 @@
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from app.schemas.blog import BlogCreate, BlogOut, BlogPage, BlogSearchResult, BlogSummaryOut
+from app.schemas.blog import BlogBulkDelete, BlogBulkResponse, BlogBulkUpdateItem
+from app.services import blog_service
+from app.core.http_cache import conditional_json
+import uuid
+
+from app.core.dependencies import get_current_user_async, get_optional_user_async
+from app.core.dependencies import get_async_db
+from fastapi import Query
+from app.schemas.blog import BlogUpdate
+
+# Same routes as blog_router, served on AsyncSession/asyncpg (DB_MODE=async).
+router = APIRouter(prefix="/blogs", tags=["Blogs"])
+
+@router.post("/", response_model=BlogOut)
+async def create_blog(blog_data: BlogCreate, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user_async)):
+    return await blog_service.create_blog_async(db, blog_data, current_user.id)
+
+@router.post("/bulk", response_model=BlogBulkResponse)
+async def bulk_create_blogs(
+    items: List[BlogCreate] = Body(..., min_length=1, max_length=blog_service.BULK_MAX_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    return await blog_service.bulk_create_blogs_async(db, items, current_user.id)
+
+@router.put("/bulk", response_model=BlogBulkResponse)
+async def bulk_update_blogs(
+    items: List[BlogBulkUpdateItem] = Body(..., min_length=1, max_length=blog_service.BULK_MAX_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    return await blog_service.bulk_update_blogs_async(db, items, current_user.id)
+
+@router.delete("/bulk", response_model=BlogBulkResponse)
+async def bulk_delete_blogs(
+    blog_data: BlogBulkDelete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    return await blog_service.bulk_delete_blogs_async(db, blog_data.ids, current_user.id)
+
+@router.get("/", response_model=Union[BlogPage, List[BlogSummaryOut]])
+async def get_blogs(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    tags: Optional[List[str]] = Query(None),
+    visibility: Optional[str] = Query("public"),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor; pass an empty value for the first page"),
+):
+    if cursor is not None:
+        try:
+            feed = await blog_service.get_blogs_cached_async(db, limit=limit, tags=tags, visibility=visibility, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        feed = await blog_service.get_blogs_cached_async(db, limit=limit, offset=offset, tags=tags, visibility=visibility)
+    return conditional_json(request, feed, blog_service.feed_etag(feed))
+
+# Declared before /{blog_id} so "search" isn't parsed as a blog id.
+@router.get("/search", response_model=List[BlogSearchResult])
+async def search_blogs(
+    q: str = Query(..., min_length=1, max_length=200, description="Keywords; supports \"quoted phrases\", OR and -exclusion"),
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(10, ge=1, le=50),
+    offset: int = Query(0, ge=0),
+    tags: Optional[List[str]] = Query(None),
+    visibility: Optional[str] = Query("public", description="Anything but public searches only the caller's own posts"),
+    current_user=Depends(get_optional_user_async),
+):
+    user_id = None
+    if visibility != "public":
+        if not current_user:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        user_id = current_user.id
+    return await blog_service.search_blogs_async(db, q, limit=limit, offset=offset, tags=tags, visibility=visibility, user_id=user_id)
+
+@router.get("/{blog_id}", response_model=BlogOut)
+async def get_blog(blog_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    blog = await blog_service.get_blog_cached_async(db, blog_id)
+    if not blog:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    etag, last_modified = blog_service.blog_validators(blog)
+    return conditional_json(request, blog, etag, last_modified)
+
+@router.delete("/{blog_id}")
+async def delete_blog(
+    blog_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    blog = await blog_service.get_blog_async(db, blog_id)
+    if not blog:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    if blog.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to delete this blog")
+    deleted = await blog_service.soft_delete_blog_async(db, blog_id)
+    if not deleted:
+        raise HTTPException(status_code=500, detail="Failed to delete blog")
+    return {"message": "Blog soft deleted successfully"}
+
+@router.put("/{blog_id}", response_model=BlogOut)
+async def update_blog(
+    blog_id: uuid.UUID,
+    blog_data: BlogUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    blog = await blog_service.get_blog_async(db, blog_id)
+    if not blog:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    if blog.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to update this blog")
+    updated_blog = await blog_service.update_blog_async(db, blog_id, blog_data)
+    if not updated_blog:
+        raise HTTPException(status_code=500, detail="Failed to update blog")
+    return updated_blog
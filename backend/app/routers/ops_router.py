@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+
+from app.core.cache import caches
+from app.core.logger import log_stats
+from app.core.password_hasher import password_hasher
+from app.core.rate_limit import login_limiter
+from app.database.engine_factory import pool_metrics
+
+router = APIRouter(prefix="/ops", tags=["Ops"])
+
+@router.get("/pool")
+def get_pool_stats():
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+
+@router.get("/cache")
+def get_cache_stats():
+    return {name: cache.stats() for name, cache in caches.items()}
+
+@router.get("/hasher")
+def get_hasher_stats():
+    return password_hasher.snapshot()
+
+@router.get("/ratelimit")
+def get_rate_limit_stats():
+    return login_limiter.snapshot()
+
+@router.get("/logging")
+def get_logging_stats():
+    return log_stats()
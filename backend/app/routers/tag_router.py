@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List
+from app.schemas.tag import TagCountOut
+from app.services import tag_service
+from app.core.dependencies import get_db
+
+router = APIRouter(prefix="/tags", tags=["Tags"])
+
+@router.get("/", response_model=List[TagCountOut])
+def get_tags(db: Session = Depends(get_db), limit: int = Query(100, ge=1, le=1000)):
+    return tag_service.get_tag_counts(db, limit=limit)
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.schemas.tag import TagCountOut
+from app.services import tag_service
+from app.core.dependencies import get_async_db
+
+# Same routes as tag_router, served on AsyncSession/asyncpg (DB_MODE=async).
+router = APIRouter(prefix="/tags", tags=["Tags"])
+
+@router.get("/", response_model=List[TagCountOut])
+async def get_tags(db: AsyncSession = Depends(get_async_db), limit: int = Query(100, ge=1, le=1000)):
+    return await tag_service.get_tag_counts_async(db, limit=limit)
@@ -1,29 +1,19 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File
 from fastapi.responses import JSONResponse
-from uuid import uuid4
-from pathlib import Path
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.dependencies import get_db
+from app.core.images import generate_variants
+from app.core.uploads import UPLOAD_DIR, save_upload, record_upload
 
 router = APIRouter(prefix="/upload", tags=["Upload"])
 
-UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif","webp", "svg"}
-
-def allowed_file(filename: str):
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
-
 @router.post("/image")
-async def upload_image(file: UploadFile = File(...)):
-    if not allowed_file(file.filename):
-        raise HTTPException(status_code=400, detail="Invalid file type")
-
-    file_extension = file.filename.rsplit(".", 1)[1].lower()
-    unique_filename = f"{uuid4()}.{file_extension}"
-    file_path = UPLOAD_DIR / unique_filename
-
-    with open(file_path, "wb") as buffer:
-        content = await file.read()
-        buffer.write(content)
-
-    return JSONResponse(content={"url": f"/uploads/{unique_filename}"})
+async def upload_image(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    stored = await save_upload(file, UPLOAD_DIR)
+    await run_in_threadpool(record_upload, db, stored)
+    variants = await generate_variants(UPLOAD_DIR, stored.filename)
+    return JSONResponse(content={"url": f"/uploads/{stored.filename}", "variants": variants})
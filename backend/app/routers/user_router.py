@@ -6,6 +6,8 @@ from app.schemas.user import UserCreate, UserOut
 from app.services import user_service
 import uuid
 from app.core.dependencies import get_db
+from app.core.password_hasher import password_hasher
+from starlette.concurrency import run_in_threadpool
 
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -18,8 +20,10 @@ router = APIRouter(prefix="/users", tags=["Users"])
 #         db.close()
 
 @router.post("/", response_model=UserOut)
-def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
-    return user_service.create_user(db, user_data)
+async def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
+    # Hash on password_hasher's threads; only the insert uses the AnyIO pool.
+    password_hash = await password_hasher.hash_async(user_data.password)
+    return await run_in_threadpool(user_service.create_user, db, user_data, password_hash)
 
 @router.get("/", response_model=List[UserOut])
 def get_users(db: Session = Depends(get_db)):
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.schemas.user import UserCreate, UserOut
+from app.services import user_service
+import uuid
+from app.core.dependencies import get_async_db
+
+# Same routes as user_router, served on AsyncSession/asyncpg (DB_MODE=async).
+router = APIRouter(prefix="/users", tags=["Users"])
+
+@router.post("/", response_model=UserOut)
+async def create_user(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    return await user_service.create_user_async(db, user_data)
+
+@router.get("/", response_model=List[UserOut])
+async def get_users(db: AsyncSession = Depends(get_async_db)):
+    return await user_service.get_users_async(db)
+
+@router.get("/{user_id}", response_model=UserOut)
+async def get_user(user_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    user = await user_service.get_user_async(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+@router.delete("/{user_id}")
+async def delete_user(user_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    deleted = await user_service.delete_user_async(db, user_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"message": "User deleted successfully"}
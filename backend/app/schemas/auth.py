@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from uuid import UUID
 
 class Token(BaseModel):
     access_token: str
@@ -6,3 +7,9 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     user_id: str
+
+
+class Principal(BaseModel):
+    id: UUID
+    username: str
+    token_version: int = 0
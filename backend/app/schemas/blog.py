@@ -1,7 +1,15 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from datetime import datetime
 from uuid import UUID
+import os
+
+# Upper bound on items per /blogs/bulk request; larger imports send several.
+BULK_MAX_ITEMS = int(os.getenv("BLOG_BULK_MAX_ITEMS", "1000"))
+
+class ImageVariant(BaseModel):
+    url: str
+    width: int
 
 class BlogCreate(BaseModel):
     title: str
@@ -19,18 +27,62 @@ class BlogOut(BaseModel):
     visibility: str
     is_deleted: bool
     main_image_url: Optional[str]
+    image_variants: Dict[str, ImageVariant] = {}
     sub_images: List[str]
     tags: List[str]
     created_at: datetime
+    updated_at: datetime
 
     class Config:
         from_attributes = True
         # orm_mode = True
 
+class BlogSummaryOut(BaseModel):
+    id: UUID
+    user_id: UUID
+    title: str
+    excerpt: Optional[str]
+    visibility: str
+    main_image_url: Optional[str]
+    image_variants: Dict[str, ImageVariant] = {}
+    tags: List[str]
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class BlogSearchResult(BlogSummaryOut):
+    rank: float
+    # Plain text with matches wrapped in <mark>…</mark>.
+    snippet: str
+
+class BlogPage(BaseModel):
+    items: List[BlogSummaryOut]
+    next_cursor: Optional[str] = None
+
 class BlogUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
     visibility: Optional[str] = "public"
     tags: Optional[List[str]] = None
     main_image_url: Optional[str] = None
-    sub_images: Optional[List[str]] = None
\ No newline at end of file
+    sub_images: Optional[List[str]] = None
+
+class BlogBulkUpdateItem(BlogUpdate):
+    id: UUID
+
+class BlogBulkDelete(BaseModel):
+    ids: List[UUID] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+class BlogBulkResult(BaseModel):
+    # Position of the item in the request array.
+    index: int
+    id: Optional[UUID] = None
+    status: str  # created | updated | deleted | error
+    error: Optional[str] = None
+
+class BlogBulkResponse(BaseModel):
+    results: List[BlogBulkResult]
+    succeeded: int
+    failed: int
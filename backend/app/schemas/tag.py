@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+class TagCountOut(BaseModel):
+    tag: str
+    count: int
+
+    class Config:
+        from_attributes = True
@@ -7,6 +7,11 @@ class UserLogin(BaseModel):
     password: str
 
 
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str
+
+
 class UserCreate(BaseModel):
     username: str
     email: EmailStr
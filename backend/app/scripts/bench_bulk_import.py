@@ -0,0 +1,79 @@
+"""Compare one-post-per-commit creates with /blogs/bulk batches.
+
+Imports --rows generated posts through blog_service.bulk_create_blogs in
+--batch sized chunks, and a sample through create_blog, then prints the
+throughput of each and the projected time for 100k posts.
+
+    python -m app.scripts.bench_bulk_import --rows 20000 --batch 1000
+"""
+import argparse
+import time
+
+from sqlalchemy import text
+
+from app.database.db_connect import SessionLocal
+from app.models import user  # noqa: F401  (blog.user_id FK target)
+from app.schemas.blog import BlogCreate
+from app.services import blog_service
+
+BENCH_USERNAME = "bench_bulk_import_user"
+PARAGRAPH = "<p>Lorem <b>ipsum</b> dolor sit amet, <a href='https://example.com' onclick='x()'>consectetur</a>.</p>"
+
+
+def bench_user(db):
+    user_id = db.execute(
+        text("""
+            INSERT INTO blogapp_schema.users (username, email, password_hash)
+            VALUES (:u, :e, 'x')
+            ON CONFLICT (username) DO UPDATE SET username = EXCLUDED.username
+            RETURNING id
+        """),
+        {"u": BENCH_USERNAME, "e": f"{BENCH_USERNAME}@example.com"},
+    ).scalar_one()
+    db.commit()
+    return user_id
+
+
+def make_posts(count: int, start: int = 0):
+    return [
+        BlogCreate(title=f"Imported post {i}", content=PARAGRAPH * 20, tags=["import", f"batch-{i % 50}"])
+        for i in range(start, start + count)
+    ]
+
+
+def run(rows: int, batch: int, sample: int, keep: bool):
+    db = SessionLocal()
+    try:
+        user_id = bench_user(db)
+
+        start = time.perf_counter()
+        for _ in range(sample):
+            blog_service.create_blog(db, make_posts(1)[0], user_id)
+        single_rate = sample / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for offset in range(0, rows, batch):
+            result = blog_service.bulk_create_blogs(db, make_posts(min(batch, rows - offset), offset), user_id)
+            assert result["failed"] == 0, result
+        bulk_rate = rows / (time.perf_counter() - start)
+
+        print(f"{'mode':>10} {'posts/s':>10} {'100k posts':>12}")
+        for mode, rate in (("single", single_rate), ("bulk", bulk_rate)):
+            print(f"{mode:>10} {rate:>10.0f} {100_000 / rate / 60:>10.1f} m")
+
+        if not keep:
+            # Deleting the user cascades to its posts; tag counts are left for the next run.
+            db.execute(text("DELETE FROM blogapp_schema.users WHERE id = :uid"), {"uid": user_id})
+            db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--batch", type=int, default=blog_service.BULK_MAX_ITEMS)
+    parser.add_argument("--sample", type=int, default=200, help="posts created one at a time")
+    parser.add_argument("--keep", action="store_true", help="keep the imported rows")
+    args = parser.parse_args()
+    run(args.rows, args.batch, args.sample, args.keep)
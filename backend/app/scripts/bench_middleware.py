@@ -0,0 +1,122 @@
+"""Per-request overhead of the old BaseHTTPMiddleware stack vs LoggingMiddleware.
+
+Builds three copies of a trivial FastAPI app (no middleware; the four
+BaseHTTPMiddleware layers main.py used to install; the pure-ASGI
+LoggingMiddleware), drives each with direct ASGI calls and prints the
+median microseconds per request and the overhead over the bare app.
+Log output goes to an in-memory stream so formatting cost is included.
+
+    python -m app.scripts.bench_middleware --requests 5000
+"""
+import argparse
+import asyncio
+import io
+import logging
+import statistics
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.logger import logger as app_logger
+from app.middleware.logging_middleware import LoggingMiddleware
+
+access_logger = logging.getLogger("uvicorn.access")
+
+
+# The stack main.py used to build: its own access logger registered twice,
+# a trace-id layer, and (shadowed by name) the JSON logging middleware.
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        access_logger.info(f"Request: {request.method} {request.url}")
+        response = await call_next(request)
+        access_logger.info(f"Response Status: {response.status_code}")
+        return response
+
+
+class LegacyTraceIdMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        trace_id = str(uuid.uuid4())
+        request.state.trace_id = trace_id
+        response = await call_next(request)
+        response.headers["X-Trace-Id"] = trace_id
+        return response
+
+
+class LegacyJsonLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        app_logger.info({
+            "method": request.method,
+            "url": str(request.url),
+            "status_code": response.status_code,
+            "process_time_ms": round((time.time() - start_time) * 1000, 2),
+        })
+        return response
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    if stack == "legacy":
+        app.add_middleware(LegacyLoggingMiddleware)
+        app.add_middleware(LegacyTraceIdMiddleware)
+        app.add_middleware(LegacyJsonLoggingMiddleware)
+        app.add_middleware(LegacyLoggingMiddleware)
+    elif stack == "asgi":
+        app.add_middleware(LoggingMiddleware)
+    return app
+
+
+async def call(app, scope):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(dict(scope), receive, send)
+
+
+async def time_stack(app, requests: int, rounds: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/ping", "raw_path": b"/ping", "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+    for _ in range(200):  # warm-up
+        await call(app, scope)
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await call(app, scope)
+        samples.append((time.perf_counter() - start) / requests * 1e6)
+    return statistics.median(samples)
+
+
+async def run(requests: int, rounds: int):
+    sink = logging.StreamHandler(io.StringIO())
+    for log in (app_logger, access_logger):
+        log.handlers = [sink]
+        log.setLevel(logging.INFO)
+        log.propagate = False
+
+    results = {stack: await time_stack(build_app(stack), requests, rounds) for stack in ("bare", "legacy", "asgi")}
+    print(f"{'stack':>8} {'us/req':>8} {'overhead us':>12}")
+    for stack, us in results.items():
+        print(f"{stack:>8} {us:>8.1f} {us - results['bare']:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.rounds))
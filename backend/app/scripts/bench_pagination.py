@@ -0,0 +1,98 @@
+"""Compare offset vs keyset (cursor) pagination latency on GET /blogs.
+
+Seeds a bench user and enough public posts to reach page 10,000, then
+times the feed query at increasing depths in both modes.
+
+    python -m app.scripts.bench_pagination --rows 100010 --limit 10
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.database.db_connect import SessionLocal
+from app.services import blog_service
+
+BENCH_USERNAME = "bench_pagination_user"
+PAGES = [1, 10, 100, 1000, 10000]
+
+
+def seed(db, rows: int):
+    user_id = db.execute(
+        text("""
+            INSERT INTO blogapp_schema.users (username, email, password_hash)
+            VALUES (:u, :e, 'x')
+            ON CONFLICT (username) DO UPDATE SET username = EXCLUDED.username
+            RETURNING id
+        """),
+        {"u": BENCH_USERNAME, "e": f"{BENCH_USERNAME}@example.com"},
+    ).scalar_one()
+
+    existing = db.execute(
+        text("SELECT count(*) FROM blogapp_schema.blog WHERE user_id = :uid"), {"uid": user_id}
+    ).scalar_one()
+    if existing < rows:
+        db.execute(
+            text("""
+                INSERT INTO blogapp_schema.blog (user_id, title, content, created_at)
+                SELECT :uid, 'Bench post ' || g, '<p>bench</p>',
+                       now() - (g || ' seconds')::interval
+                FROM generate_series(:start, :stop) AS g
+            """),
+            {"uid": user_id, "start": existing + 1, "stop": rows},
+        )
+    db.execute(text("ANALYZE blogapp_schema.blog"))
+    db.commit()
+    return user_id
+
+
+def cleanup(db, user_id):
+    db.execute(text("DELETE FROM blogapp_schema.users WHERE id = :uid"), {"uid": user_id})
+    db.commit()
+
+
+def time_call(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def cursor_for_page(db, page: int, limit: int) -> str:
+    if page == 1:
+        return ""
+    # Cursor a client would hold after reading the previous page.
+    last = blog_service.get_blogs(db, limit=1, offset=(page - 1) * limit - 1)[0]
+    return blog_service.encode_cursor(last.created_at, last.id)
+
+
+def run(rows: int, limit: int, repeat: int, keep: bool):
+    db = SessionLocal()
+    try:
+        user_id = seed(db, rows)
+        print(f"{'page':>8} {'offset ms':>12} {'cursor ms':>12}")
+        for page in PAGES:
+            if (page - 1) * limit >= rows:
+                break
+            offset = (page - 1) * limit
+            cursor = cursor_for_page(db, page, limit)
+            offset_ms = time_call(lambda: blog_service.get_blogs(db, limit=limit, offset=offset), repeat)
+            cursor_ms = time_call(lambda: blog_service.get_blogs_page(db, limit=limit, cursor=cursor), repeat)
+            print(f"{page:>8} {offset_ms:>12.2f} {cursor_ms:>12.2f}")
+        if not keep:
+            cleanup(db, user_id)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_010)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows for further runs")
+    args = parser.parse_args()
+    run(args.rows, args.limit, args.repeat, args.keep)
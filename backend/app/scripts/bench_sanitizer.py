@@ -0,0 +1,66 @@
+"""Sanitizer throughput across content sizes: inline, offloaded, batched, memoized.
+
+For each size it times the bare bleach cleaner, a single document cleaned
+in the worker pool, a batch through sanitize_many, and a re-save of
+unchanged content (memo hit), and prints MB/s for each.
+
+    python -m app.scripts.bench_sanitizer --sizes 1 8 64 512 --batch 64
+"""
+import argparse
+import statistics
+import time
+
+from app.core import sanitizer
+
+BLOCK = (
+    "<h2 onclick='track()'>Section</h2><p>Some <b>bold</b>, <i>italic</i> and "
+    "<span style='color: red; position: fixed'>styled</span> text with "
+    "<a href='https://example.com' target='_blank'>a link</a>.</p><script>alert(1)</script>"
+)
+
+
+def make_document(kib: int, salt: int = 0) -> str:
+    body = BLOCK * max(1, kib * 1024 // len(BLOCK))
+    # Salt keeps documents distinct so only the memo column hits the cache.
+    return f"<p>doc {salt}</p>{body}"
+
+
+def median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(sizes: list[int], batch: int, repeat: int):
+    sanitizer.get_executor().submit(sanitizer.clean_html, BLOCK).result()  # warm the pool
+    salt = iter(range(10**9))
+    print(f"workers={sanitizer.SANITIZE_WORKERS} offload>={sanitizer.SANITIZE_OFFLOAD_BYTES}B")
+    print(f"{'KiB':>6} {'inline MB/s':>12} {'offload MB/s':>13} {'batch MB/s':>11} {'memo MB/s':>10}")
+    for kib in sizes:
+        doc = make_document(kib)
+        mb = len(doc) / 1e6
+
+        inline = median_ms(lambda: sanitizer.clean_html(make_document(kib, next(salt))), repeat)
+        offloaded = median_ms(
+            lambda: sanitizer.get_executor().submit(sanitizer.clean_html, make_document(kib, next(salt))).result(),
+            repeat,
+        )
+        docs = [make_document(kib, next(salt)) for _ in range(batch)]
+        batched = median_ms(lambda: sanitizer.sanitize_many([d + str(next(salt)) for d in docs]), 1) / batch
+        sanitizer.sanitize_html(doc)
+        memo = median_ms(lambda: sanitizer.sanitize_html(doc), repeat)
+
+        print(f"{kib:>6} {mb / inline * 1000:>12.1f} {mb / offloaded * 1000:>13.1f} "
+              f"{mb / batched * 1000:>11.1f} {mb / memo * 1000:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 8, 64, 512], help="document sizes in KiB")
+    parser.add_argument("--batch", type=int, default=64, help="documents per sanitize_many call")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.batch, args.repeat)
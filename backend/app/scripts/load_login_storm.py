@@ -0,0 +1,92 @@
+"""Feed latency with and without a concurrent login storm.
+
+Measures GET /blogs/ latency on its own, then again while --logins
+concurrent clients hammer POST /auth/login, and prints percentiles for both
+phases plus the password hasher's queue stats. Runs against the app
+in-process by default, or a live server with --base-url.
+
+    python -m app.scripts.load_login_storm --logins 50 --seconds 10
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+import httpx
+
+STORM_USERNAME = "login_storm_user"
+STORM_PASSWORD = "Storm@1234"
+
+
+def percentiles(samples: list[float]) -> str:
+    if len(samples) < 2:
+        return "n/a"
+    q = statistics.quantiles(samples, n=100)
+    return f"p50={q[49]:7.1f}ms p95={q[94]:7.1f}ms p99={q[98]:7.1f}ms n={len(samples)}"
+
+
+async def ensure_user(client: httpx.AsyncClient):
+    login = {"username": STORM_USERNAME, "password": STORM_PASSWORD}
+    if (await client.post("/auth/login", json=login)).status_code != 200:
+        user = {**login, "email": f"{STORM_USERNAME}@example.com"}
+        (await client.post("/users/", json=user)).raise_for_status()
+
+
+async def feed_loop(client: httpx.AsyncClient, stop: asyncio.Event, samples: list[float]):
+    while not stop.is_set():
+        start = time.perf_counter()
+        (await client.get("/blogs/", params={"limit": 10})).raise_for_status()
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def login_loop(client: httpx.AsyncClient, stop: asyncio.Event, counts: dict):
+    login = {"username": STORM_USERNAME, "password": STORM_PASSWORD}
+    while not stop.is_set():
+        response = await client.post("/auth/login", json=login)
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+        if response.status_code in (429, 503):
+            await asyncio.sleep(float(response.headers.get("retry-after", "1")))
+
+
+async def phase(client: httpx.AsyncClient, seconds: float, logins: int):
+    stop, samples, counts = asyncio.Event(), [], {}
+    tasks = [asyncio.create_task(feed_loop(client, stop, samples))]
+    tasks += [asyncio.create_task(login_loop(client, stop, counts)) for _ in range(logins)]
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return samples, counts
+
+
+async def run(base_url: str, logins: int, seconds: float):
+    if base_url:
+        transport = None
+    else:
+        from app.main import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+
+    limits = httpx.Limits(max_connections=logins + 10)
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=60) as client:
+        await ensure_user(client)
+        baseline, _ = await phase(client, seconds, 0)
+        storm, counts = await phase(client, seconds, logins)
+        hasher = (await client.get("/ops/hasher")).json()
+
+    print(f"feed alone        {percentiles(baseline)}")
+    print(f"feed during storm {percentiles(storm)}")
+    print(f"logins by status  {counts} ({sum(counts.values()) / seconds:.1f}/s)")
+    print(f"hasher            workers={hasher['workers']} rounds={hasher['rounds']} "
+          f"rejected={hasher['rejected']} wait_sum={hasher['queue_wait_ms']['sum']}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="", help="live server to target instead of the in-process app")
+    parser.add_argument("--logins", type=int, default=50, help="concurrent login clients")
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(run(args.base_url, args.logins, args.seconds))
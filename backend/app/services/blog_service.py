@@ -1,15 +1,53 @@
 from sqlalchemy.orm import Session
-from app.models.blog import Blog
-from app.schemas.blog import BlogCreate, BlogOut, BlogUpdate
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.blog import Blog, MARKUP_PATTERN, SEARCH_CONFIG
+from app.schemas.blog import BULK_MAX_ITEMS, BlogBulkUpdateItem, BlogCreate, BlogOut, BlogSummaryOut, BlogUpdate
+from typing import Any, List, Optional
 import uuid
+import asyncio
+import base64
+import json
+import os
+from collections import Counter
+from datetime import datetime
 
-from sqlalchemy import cast, String
-from sqlalchemy.dialects.postgresql import array
+from sqlalchemy import cast, String, func, insert, literal_column, select, tuple_
+from sqlalchemy.sql import Select
 
-from app.core.sanitizer import sanitize_html
+from app.core.sanitizer import sanitize_html, sanitize_html_async, sanitize_many, make_excerpt
+from app.core.images import variant_urls
+from app.core.uploads import ADJUST_REFS_SQL, UPLOAD_DIR, ref_count_params, upload_filenames
+from app.core.cache import TieredCache, shared_backend
+from app.core.http_cache import weak_etag
+from app.services.tag_service import apply_tag_deltas, apply_tag_deltas_async, counted_tags, tag_deltas
 
 from sqlalchemy import desc
+from sqlalchemy.engine import Row
+
+
+# Serialized public reads (GET /blogs, GET /blogs/{id}). Both key families
+# fold in the shared "feed" generation, and every write bumps it, so a write
+# on one worker makes every worker's cached pages and posts stale at once.
+blog_cache = TieredCache(
+    "blogs",
+    maxsize=int(os.getenv("BLOG_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("BLOG_CACHE_TTL", "60")),
+    shared=shared_backend(),
+)
+
+# Columns the feed needs; the full `content` column is only loaded by get_blog.
+SUMMARY_COLUMNS = (
+    Blog.id,
+    Blog.user_id,
+    Blog.title,
+    Blog.excerpt,
+    Blog.visibility,
+    Blog.main_image_url,
+    Blog.image_variants,
+    Blog.tags,
+    Blog.created_at,
+    Blog.updated_at,
+)
 
 
 def is_valid_image_url(url: Optional[str]) -> bool:
@@ -18,77 +56,616 @@ def is_valid_image_url(url: Optional[str]) -> bool:
     return url.startswith("/uploads/")
 
 
-def create_blog(db: Session, blog_data: BlogCreate, user_id: uuid.UUID) -> Blog:
+def encode_cursor(created_at: datetime, blog_id: uuid.UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(blog_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, blog_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), uuid.UUID(blog_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
 
-    clean_content = sanitize_html(blog_data.content)
-    # print("SEEEEE HEREEEE")
-    # print(blog_data.main_image_url)
-    # exit()
-    if not is_valid_image_url(blog_data.main_image_url):
+
+def validate_image_urls(main_image_url: Optional[str], sub_images: Optional[list[str]]) -> None:
+    if not is_valid_image_url(main_image_url):
 
         raise ValueError("Invalid main image URL")
 
-    if blog_data.sub_images:
-        for url in blog_data.sub_images:
+    if sub_images:
+        for url in sub_images:
             if not is_valid_image_url(url):
                 raise ValueError("Invalid sub image URL")
-            
 
-    blog = Blog(
+
+def blog_values(blog_data: BlogCreate, user_id: uuid.UUID, clean_content: str) -> dict:
+    return dict(
         user_id=user_id,
         title=blog_data.title,
         content=clean_content,
+        excerpt=make_excerpt(clean_content),
         visibility=blog_data.visibility,
         main_image_url=blog_data.main_image_url,
+        image_variants=variant_urls(blog_data.main_image_url, UPLOAD_DIR),
         sub_images=blog_data.sub_images or [],
         tags=blog_data.tags or []
     )
+
+
+def build_blog(blog_data: BlogCreate, user_id: uuid.UUID, clean_content: Optional[str] = None) -> Blog:
+
+    if clean_content is None:
+        clean_content = sanitize_html(blog_data.content)
+    # print("SEEEEE HEREEEE")
+    # print(blog_data.main_image_url)
+    # exit()
+    validate_image_urls(blog_data.main_image_url, blog_data.sub_images)
+
+    return Blog(**blog_values(blog_data, user_id, clean_content))
+
+# Counts maintained alongside the posts, in the writer's transaction:
+# tag_count (public posts' tags) and upload_object.ref_count (live posts' images).
+NO_COUNTS = (frozenset(), frozenset())
+
+def post_counts(blog: Blog) -> tuple[set[str], set[str]]:
+    """The tags and stored uploads a post contributes to the counts."""
+    uploads = set() if blog.is_deleted else upload_filenames([blog.main_image_url, *(blog.sub_images or [])])
+    return counted_tags(blog), uploads
+
+def count_deltas(before: tuple, after: tuple) -> tuple[Counter, Counter]:
+    return Counter(tag_deltas(before[0], after[0])), Counter(tag_deltas(before[1], after[1]))
+
+def add_count_deltas(total: tuple[Counter, Counter], before: tuple, after: tuple) -> None:
+    tags, uploads = count_deltas(before, after)
+    total[0].update(tags)
+    total[1].update(uploads)
+
+def apply_count_deltas(db: Session, deltas: tuple[Counter, Counter]) -> None:
+    """Write the deltas in the caller's transaction (no commit)."""
+    apply_tag_deltas(db, deltas[0])
+    for params in ref_count_params(deltas[1]):
+        db.execute(ADJUST_REFS_SQL, params)
+
+def create_blog(db: Session, blog_data: BlogCreate, user_id: uuid.UUID) -> Blog:
+    blog = build_blog(blog_data, user_id)
     db.add(blog)
+    apply_count_deltas(db, count_deltas(NO_COUNTS, post_counts(blog)))
     db.commit()
     db.refresh(blog)
+    invalidate_blogs()
     return blog
 
-def get_blogs(
-    db: Session,
+def feed_statement(
     limit: int = 10,
     offset: int = 0,
     tags: Optional[list[str]] = None,
-    visibility: Optional[str] = "public"
-) -> List[Blog]:
-    query = db.query(Blog).filter(Blog.is_deleted == False)
+    visibility: Optional[str] = "public",
+    cursor: Optional[str] = None
+) -> Select:
+    stmt = select(*SUMMARY_COLUMNS).where(Blog.is_deleted == False)
 
     if visibility:
-        query = query.filter(Blog.visibility == visibility)
+        stmt = stmt.where(Blog.visibility == visibility)
+
+    if tags:
+        stmt = stmt.where(Blog.tags.overlap(tags))
+
+    stmt = stmt.order_by(desc(Blog.created_at), desc(Blog.id))
+
+    if cursor is None:
+        return stmt.offset(offset).limit(limit)
+
+    # Keyset mode: seek past the last (created_at, id) seen instead of
+    # scanning and discarding `offset` rows.
+    if cursor:
+        created_at, blog_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Blog.created_at, Blog.id) < tuple_(created_at, blog_id))
+
+    return stmt.limit(limit)
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+def search_statement(
+    q: str,
+    limit: int = 10,
+    offset: int = 0,
+    tags: Optional[list[str]] = None,
+    visibility: Optional[str] = "public",
+    user_id: Optional[uuid.UUID] = None
+) -> Select:
+    config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+    query = func.websearch_to_tsquery(config, q)
+    rank = func.ts_rank_cd(Blog.search_vector, query).label("rank")
 
+    # Rank and page on the GIN index first; ts_headline re-parses the text,
+    # so it only runs for the rows actually returned.
+    matches = select(*SUMMARY_COLUMNS, Blog.content, rank).where(
+        Blog.is_deleted == False,
+        Blog.search_vector.bool_op("@@")(query),
+    )
+    if visibility:
+        matches = matches.where(Blog.visibility == visibility)
+    if user_id:
+        matches = matches.where(Blog.user_id == user_id)
     if tags:
-        query = query.filter(Blog.tags.overlap(array(tags, type_=String)))
+        matches = matches.where(Blog.tags.overlap(tags))
+    matches = matches.order_by(desc(rank), desc(Blog.created_at), desc(Blog.id)).offset(offset).limit(limit).subquery("matches")
+
+    plain_content = func.regexp_replace(matches.c.content, MARKUP_PATTERN, " ", "g")
+    snippet = func.ts_headline(config, plain_content, query, HEADLINE_OPTIONS).label("snippet")
+    return (
+        select(*[c for c in matches.c if c.name != "content"], snippet)
+        .order_by(desc(matches.c.rank), desc(matches.c.created_at), desc(matches.c.id))
+    )
+
+def make_page(blogs: List[Row], limit: int) -> dict:
+    items = blogs[:limit]
+    next_cursor = None
+    if len(blogs) > limit:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return {"items": items, "next_cursor": next_cursor}
+
+def get_blogs(
+    db: Session,
+    limit: int = 10,
+    offset: int = 0,
+    tags: Optional[list[str]] = None,
+    visibility: Optional[str] = "public",
+    cursor: Optional[str] = None
+) -> List[Row]:
+    stmt = feed_statement(limit=limit, offset=offset, tags=tags, visibility=visibility, cursor=cursor)
+    return db.execute(stmt).all()
 
-    query = query.order_by(desc(Blog.created_at))
+def get_blogs_page(
+    db: Session,
+    limit: int = 10,
+    tags: Optional[list[str]] = None,
+    visibility: Optional[str] = "public",
+    cursor: str = ""
+) -> dict:
+    blogs = get_blogs(db, limit=limit + 1, tags=tags, visibility=visibility, cursor=cursor)
+    return make_page(blogs, limit)
 
-    return query.offset(offset).limit(limit).all()
+def search_blogs(
+    db: Session,
+    q: str,
+    limit: int = 10,
+    offset: int = 0,
+    tags: Optional[list[str]] = None,
+    visibility: Optional[str] = "public",
+    user_id: Optional[uuid.UUID] = None
+) -> List[Row]:
+    stmt = search_statement(q, limit=limit, offset=offset, tags=tags, visibility=visibility, user_id=user_id)
+    return db.execute(stmt).all()
 
 def get_blog(db: Session, blog_id: uuid.UUID) -> Blog:
-    return db.query(Blog).filter(Blog.id == blog_id, Blog.is_deleted == False).first()
+    return db.execute(
+        select(Blog).where(Blog.id == blog_id, Blog.is_deleted == False)
+    ).scalars().first()
+
+def locked_blog_statement(blog_id: uuid.UUID) -> Select:
+    # Writes lock the row and reload it (the router may already hold a copy
+    # from its ownership check), so count deltas are taken from the version
+    # being replaced and concurrent writers to one post apply them in turn.
+    return select(Blog).where(Blog.id == blog_id).with_for_update().execution_options(populate_existing=True)
 
 def soft_delete_blog(db: Session, blog_id: uuid.UUID) -> bool:
-    blog = db.query(Blog).filter(Blog.id == blog_id).first()
+    blog = db.scalars(locked_blog_statement(blog_id)).first()
     if not blog:
         return False
+    before = post_counts(blog)
     blog.is_deleted = True
+    apply_count_deltas(db, count_deltas(before, NO_COUNTS))
     db.commit()
+    invalidate_blogs()
     return True
 
+def apply_update(blog: Blog, blog_data: BlogUpdate, clean_content: Optional[str] = None) -> None:
+    changes = blog_data.model_dump(exclude_unset=True)
+    if 'content' in changes:
+        # Bulk and async updates pass content already sanitized.
+        changes['content'] = clean_content if clean_content is not None else sanitize_html(changes['content'])
+        blog.excerpt = make_excerpt(changes['content'])
+
+    for field, value in changes.items():
+        setattr(blog, field, value)
+
+    if 'main_image_url' in blog_data.model_fields_set:
+        blog.image_variants = variant_urls(blog.main_image_url, UPLOAD_DIR)
+
 def update_blog(db: Session, blog_id: uuid.UUID, blog_data: BlogUpdate) -> Blog:
-    blog = db.query(Blog).filter(Blog.id == blog_id, Blog.is_deleted == False).first()
+    blog = db.scalars(locked_blog_statement(blog_id).where(Blog.is_deleted == False)).first()
     if not blog:
         return None
-    
-    if 'content' in blog_data.model_dump(exclude_unset=True):
-        blog_data.content = sanitize_html(blog_data.content)
 
-    for field, value in blog_data.model_dump(exclude_unset=True).items():
-        setattr(blog, field, value)
+    before = post_counts(blog)
+    apply_update(blog, blog_data)
+    apply_count_deltas(db, count_deltas(before, post_counts(blog)))
 
     db.commit()
     db.refresh(blog)
+    invalidate_blogs()
+    return blog
+
+
+def invalidate_blogs() -> None:
+    # Per-post deletes would only reach this worker's LRU (and Redis); the
+    # generation bump is what other workers see.
+    blog_cache.bump("feed")
+
+
+# /blogs/bulk: every item is checked up front and reported on individually;
+# the valid ones are then written in one transaction with a single commit.
+# A database error aborts the whole batch.
+
+# Fields an update may omit but not set to null (NOT NULL columns).
+NOT_NULL_UPDATE_FIELDS = {"title", "content", "visibility", "tags", "sub_images"}
+
+def bulk_error(index: int, error: str, blog_id: Optional[uuid.UUID] = None) -> dict:
+    return {"index": index, "id": blog_id, "status": "error", "error": error}
+
+def bulk_response(results: list[dict]) -> dict:
+    succeeded = sum(1 for r in results if r["status"] != "error")
+    return {"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+
+def check_bulk_creates(items: List[BlogCreate]) -> tuple[list[int], list]:
+    """Indexes of the insertable items, plus a results list holding the rejects."""
+    results, valid = [None] * len(items), []
+    for index, item in enumerate(items):
+        try:
+            if item.visibility is None:
+                raise ValueError("visibility must not be null")
+            validate_image_urls(item.main_image_url, item.sub_images)
+        except ValueError as e:
+            results[index] = bulk_error(index, str(e))
+        else:
+            valid.append(index)
+    return valid, results
+
+def bulk_insert_statement():
+    # Executed with a list of rows: SQLAlchemy batches these into multi-row
+    # INSERT ... VALUES (...), (...) RETURNING, keeping the input order.
+    return insert(Blog).returning(Blog, sort_by_parameter_order=True)
+
+def created_count_deltas(blogs: List[Blog]) -> tuple[Counter, Counter]:
+    deltas = (Counter(), Counter())
+    for blog in blogs:
+        add_count_deltas(deltas, NO_COUNTS, post_counts(blog))
+    return deltas
+
+def finish_bulk_creates(results: list, valid: list[int], blog_ids: list[uuid.UUID]) -> dict:
+    for index, blog_id in zip(valid, blog_ids):
+        results[index] = {"index": index, "id": blog_id, "status": "created", "error": None}
+    return bulk_response(results)
+
+def check_bulk_targets(blog_ids: List[uuid.UUID], blogs_by_id: dict, user_id: uuid.UUID, action: str) -> tuple[list[int], list]:
+    """Ownership/existence checks shared by bulk update and delete."""
+    results, valid, seen = [None] * len(blog_ids), [], set()
+    for index, blog_id in enumerate(blog_ids):
+        blog = blogs_by_id.get(blog_id)
+        if blog is None:
+            results[index] = bulk_error(index, "Blog not found", blog_id)
+        elif blog.user_id != user_id:
+            results[index] = bulk_error(index, f"Not authorized to {action} this blog", blog_id)
+        elif blog_id in seen:
+            results[index] = bulk_error(index, "Duplicate id in batch", blog_id)
+        else:
+            seen.add(blog_id)
+            valid.append(index)
+    return valid, results
+
+def check_bulk_updates(items: List[BlogBulkUpdateItem], blogs_by_id: dict, user_id: uuid.UUID) -> tuple[list[int], list]:
+    valid, results = check_bulk_targets([item.id for item in items], blogs_by_id, user_id, "update")
+    checked = []
+    for index in valid:
+        item = items[index]
+        try:
+            for field in NOT_NULL_UPDATE_FIELDS & item.model_fields_set:
+                if getattr(item, field) is None:
+                    raise ValueError(f"{field} must not be null")
+            validate_image_urls(item.main_image_url, item.sub_images)
+        except ValueError as e:
+            results[index] = bulk_error(index, str(e), item.id)
+        else:
+            checked.append(index)
+    return checked, results
+
+def bulk_update_contents(items: List[BlogBulkUpdateItem], valid: list[int]) -> list[str]:
+    return [items[i].content for i in valid if "content" in items[i].model_fields_set]
+
+def apply_bulk_updates(items: List[BlogBulkUpdateItem], valid: list[int], blogs_by_id: dict, cleaned: list[str], results: list) -> tuple[Counter, Counter]:
+    cleaned = iter(cleaned)
+    deltas = (Counter(), Counter())
+    for index in valid:
+        item = items[index]
+        blog = blogs_by_id[item.id]
+        changes = BlogUpdate(**item.model_dump(exclude_unset=True, exclude={"id"}))
+        clean_content = next(cleaned) if "content" in item.model_fields_set else None
+        before = post_counts(blog)
+        apply_update(blog, changes, clean_content=clean_content)
+        add_count_deltas(deltas, before, post_counts(blog))
+        results[index] = {"index": index, "id": item.id, "status": "updated", "error": None}
+    return deltas
+
+def apply_bulk_deletes(blog_ids: List[uuid.UUID], valid: list[int], blogs_by_id: dict, results: list) -> tuple[Counter, Counter]:
+    deltas = (Counter(), Counter())
+    for index in valid:
+        blog = blogs_by_id[blog_ids[index]]
+        add_count_deltas(deltas, post_counts(blog), NO_COUNTS)
+        blog.is_deleted = True
+        results[index] = {"index": index, "id": blog.id, "status": "deleted", "error": None}
+    return deltas
+
+def bulk_targets_statement(blog_ids: List[uuid.UUID]) -> Select:
+    # Locked in id order so overlapping batches can't deadlock each other.
+    return (
+        select(Blog)
+        .where(Blog.id.in_(set(blog_ids)), Blog.is_deleted == False)
+        .order_by(Blog.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+
+def bulk_create_blogs(db: Session, items: List[BlogCreate], user_id: uuid.UUID) -> dict:
+    valid, results = check_bulk_creates(items)
+    cleaned = sanitize_many([items[i].content for i in valid])
+    rows = [blog_values(items[i], user_id, clean) for i, clean in zip(valid, cleaned)]
+    blog_ids = []
+    if rows:
+        blogs = db.scalars(bulk_insert_statement(), rows).all()
+        blog_ids = [blog.id for blog in blogs]
+        apply_count_deltas(db, created_count_deltas(blogs))
+        db.commit()
+        invalidate_blogs()
+    return finish_bulk_creates(results, valid, blog_ids)
+
+def bulk_update_blogs(db: Session, items: List[BlogBulkUpdateItem], user_id: uuid.UUID) -> dict:
+    blogs_by_id = {b.id: b for b in db.scalars(bulk_targets_statement([item.id for item in items]))}
+    valid, results = check_bulk_updates(items, blogs_by_id, user_id)
+    if valid:
+        cleaned = sanitize_many(bulk_update_contents(items, valid))
+        apply_count_deltas(db, apply_bulk_updates(items, valid, blogs_by_id, cleaned, results))
+        db.commit()
+        invalidate_blogs()
+    return bulk_response(results)
+
+def bulk_delete_blogs(db: Session, blog_ids: List[uuid.UUID], user_id: uuid.UUID) -> dict:
+    blogs_by_id = {b.id: b for b in db.scalars(bulk_targets_statement(blog_ids))}
+    valid, results = check_bulk_targets(blog_ids, blogs_by_id, user_id, "delete")
+    if valid:
+        apply_count_deltas(db, apply_bulk_deletes(blog_ids, valid, blogs_by_id, results))
+        db.commit()
+        invalidate_blogs()
+    return bulk_response(results)
+
+def blog_cache_key(blog_id: uuid.UUID) -> str:
+    return f"blog:{blog_cache.generation('feed')}:{blog_id}"
+
+def user_posts_statement(user_id: uuid.UUID) -> Select:
+    # Deleting a user cascades to their posts in the database, past these counts.
+    return select(Blog).where(Blog.user_id == user_id, Blog.is_deleted == False).with_for_update()
+
+def drop_user_counts(db: Session, user_id: uuid.UUID) -> None:
+    """Take a user's posts out of the counts before the user row is deleted (no commit)."""
+    deltas = (Counter(), Counter())
+    for blog in db.scalars(user_posts_statement(user_id)):
+        add_count_deltas(deltas, post_counts(blog), NO_COUNTS)
+    apply_count_deltas(db, deltas)
+
+def feed_cache_key(limit, offset, tags, visibility, cursor) -> str:
+    params = [limit, offset, sorted(tags) if tags else None, visibility, cursor]
+    return f"feed:{blog_cache.generation('feed')}:{json.dumps(params)}"
+
+def lookup_feed(limit, offset, tags, visibility, cursor) -> tuple[str, Optional[Any]]:
+    """The feed page's cache key and cached value (None on a miss)."""
+    key = feed_cache_key(limit, offset, tags, visibility, cursor)
+    return key, blog_cache.get(key)
+
+def lookup_blog(blog_id: uuid.UUID) -> tuple[str, Optional[dict]]:
+    key = blog_cache_key(blog_id)
+    return key, blog_cache.get(key)
+
+def serialize_feed(blogs: List[Row]) -> list:
+    return [BlogSummaryOut.model_validate(b).model_dump(mode="json") for b in blogs]
+
+def serialize_page(page: dict) -> dict:
+    return {"items": serialize_feed(page["items"]), "next_cursor": page["next_cursor"]}
+
+def get_blogs_cached(
+    db: Session,
+    limit: int = 10,
+    offset: int = 0,
+    tags: Optional[list[str]] = None,
+    visibility: Optional[str] = "public",
+    cursor: Optional[str] = None
+):
+    key, cached = lookup_feed(limit, offset, tags, visibility, cursor)
+    if cached is not None:
+        return cached
+    if cursor is None:
+        value = serialize_feed(get_blogs(db, limit=limit, offset=offset, tags=tags, visibility=visibility))
+    else:
+        value = serialize_page(get_blogs_page(db, limit=limit, tags=tags, visibility=visibility, cursor=cursor))
+    blog_cache.set(key, value)
+    return value
+
+def get_blog_cached(db: Session, blog_id: uuid.UUID) -> Optional[dict]:
+    key, cached = lookup_blog(blog_id)
+    if cached is not None:
+        return cached
+    blog = get_blog(db, blog_id)
+    if not blog:
+        return None
+    value = BlogOut.model_validate(blog).model_dump(mode="json")
+    blog_cache.set(key, value)
+    return value
+
+def blog_validators(blog: dict) -> tuple[str, datetime]:
+    """ETag and Last-Modified for a cached post, derived from its row version."""
+    return weak_etag((blog["id"], blog["updated_at"])), datetime.fromisoformat(blog["updated_at"])
+
+def feed_etag(feed) -> str:
+    """ETag over the page's (id, updated_at) pairs and next cursor.
+
+    No Last-Modified: the newest edit on a page doesn't change when a post
+    is deleted or rows shift into an offset page, so If-Modified-Since
+    alone would answer 304 for a stale page.
+    """
+    items, next_cursor = (feed["items"], feed["next_cursor"]) if isinstance(feed, dict) else (feed, None)
+    versions = [(b["id"], b["updated_at"]) for b in items]
+    return weak_etag(versions + [next_cursor])
+
+
+# Async counterparts used by the AsyncSession routers (DB_MODE=async).
+
+async def apply_count_deltas_async(db: AsyncSession, deltas: tuple[Counter, Counter]) -> None:
+    await apply_tag_deltas_async(db, deltas[0])
+    for params in ref_count_params(deltas[1]):
+        await db.execute(ADJUST_REFS_SQL, params)
+
+async def drop_user_counts_async(db: AsyncSession, user_id: uuid.UUID) -> None:
+    deltas = (Counter(), Counter())
+    for blog in await db.scalars(user_posts_statement(user_id)):
+        add_count_deltas(deltas, post_counts(blog), NO_COUNTS)
+    await apply_count_deltas_async(db, deltas)
+
+async def create_blog_async(db: AsyncSession, blog_data: BlogCreate, user_id: uuid.UUID) -> Blog:
+    blog = build_blog(blog_data, user_id, clean_content=await sanitize_html_async(blog_data.content))
+    db.add(blog)
+    await apply_count_deltas_async(db, count_deltas(NO_COUNTS, post_counts(blog)))
+    await db.commit()
+    await db.refresh(blog)
+    await blog_cache.offload(invalidate_blogs)
+    return blog
+
+async def get_blogs_async(
+    db: AsyncSession,
+    limit: int = 10,
+    offset: int = 0,
+    tags: Optional[list[str]] = None,
+    visibility: Optional[str] = "public",
+    cursor: Optional[str] = None
+) -> List[Row]:
+    stmt = feed_statement(limit=limit, offset=offset, tags=tags, visibility=visibility, cursor=cursor)
+    return (await db.execute(stmt)).all()
+
+async def get_blogs_page_async(
+    db: AsyncSession,
+    limit: int = 10,
+    tags: Optional[list[str]] = None,
+    visibility: Optional[str] = "public",
+    cursor: str = ""
+) -> dict:
+    blogs = await get_blogs_async(db, limit=limit + 1, tags=tags, visibility=visibility, cursor=cursor)
+    return make_page(blogs, limit)
+
+async def search_blogs_async(
+    db: AsyncSession,
+    q: str,
+    limit: int = 10,
+    offset: int = 0,
+    tags: Optional[list[str]] = None,
+    visibility: Optional[str] = "public",
+    user_id: Optional[uuid.UUID] = None
+) -> List[Row]:
+    stmt = search_statement(q, limit=limit, offset=offset, tags=tags, visibility=visibility, user_id=user_id)
+    return (await db.execute(stmt)).all()
+
+async def get_blog_async(db: AsyncSession, blog_id: uuid.UUID) -> Blog:
+    result = await db.execute(
+        select(Blog).where(Blog.id == blog_id, Blog.is_deleted == False)
+    )
+    return result.scalars().first()
+
+async def soft_delete_blog_async(db: AsyncSession, blog_id: uuid.UUID) -> bool:
+    blog = (await db.scalars(locked_blog_statement(blog_id))).first()
+    if not blog:
+        return False
+    before = post_counts(blog)
+    blog.is_deleted = True
+    await apply_count_deltas_async(db, count_deltas(before, NO_COUNTS))
+    await db.commit()
+    await blog_cache.offload(invalidate_blogs)
+    return True
+
+async def bulk_create_blogs_async(db: AsyncSession, items: List[BlogCreate], user_id: uuid.UUID) -> dict:
+    valid, results = check_bulk_creates(items)
+    cleaned = await asyncio.to_thread(sanitize_many, [items[i].content for i in valid])
+    rows = [blog_values(items[i], user_id, clean) for i, clean in zip(valid, cleaned)]
+    blog_ids = []
+    if rows:
+        blogs = (await db.scalars(bulk_insert_statement(), rows)).all()
+        blog_ids = [blog.id for blog in blogs]
+        await apply_count_deltas_async(db, created_count_deltas(blogs))
+        await db.commit()
+        await blog_cache.offload(invalidate_blogs)
+    return finish_bulk_creates(results, valid, blog_ids)
+
+async def bulk_update_blogs_async(db: AsyncSession, items: List[BlogBulkUpdateItem], user_id: uuid.UUID) -> dict:
+    blogs_by_id = {b.id: b for b in await db.scalars(bulk_targets_statement([item.id for item in items]))}
+    valid, results = check_bulk_updates(items, blogs_by_id, user_id)
+    if valid:
+        cleaned = await asyncio.to_thread(sanitize_many, bulk_update_contents(items, valid))
+        await apply_count_deltas_async(db, apply_bulk_updates(items, valid, blogs_by_id, cleaned, results))
+        await db.commit()
+        await blog_cache.offload(invalidate_blogs)
+    return bulk_response(results)
+
+async def bulk_delete_blogs_async(db: AsyncSession, blog_ids: List[uuid.UUID], user_id: uuid.UUID) -> dict:
+    blogs_by_id = {b.id: b for b in await db.scalars(bulk_targets_statement(blog_ids))}
+    valid, results = check_bulk_targets(blog_ids, blogs_by_id, user_id, "delete")
+    if valid:
+        await apply_count_deltas_async(db, apply_bulk_deletes(blog_ids, valid, blogs_by_id, results))
+        await db.commit()
+        await blog_cache.offload(invalidate_blogs)
+    return bulk_response(results)
+
+async def update_blog_async(db: AsyncSession, blog_id: uuid.UUID, blog_data: BlogUpdate) -> Blog:
+    blog = (await db.scalars(locked_blog_statement(blog_id).where(Blog.is_deleted == False))).first()
+    if not blog:
+        return None
+
+    clean_content = None
+    if 'content' in blog_data.model_fields_set:
+        clean_content = await sanitize_html_async(blog_data.content)
+
+    before = post_counts(blog)
+    apply_update(blog, blog_data, clean_content=clean_content)
+    await apply_count_deltas_async(db, count_deltas(before, post_counts(blog)))
+
+    await db.commit()
+    await db.refresh(blog)
+    await blog_cache.offload(invalidate_blogs)
     return blog
+
+async def get_blogs_cached_async(
+    db: AsyncSession,
+    limit: int = 10,
+    offset: int = 0,
+    tags: Optional[list[str]] = None,
+    visibility: Optional[str] = "public",
+    cursor: Optional[str] = None
+):
+    key, cached = await blog_cache.offload(lookup_feed, limit, offset, tags, visibility, cursor)
+    if cached is not None:
+        return cached
+    if cursor is None:
+        value = serialize_feed(await get_blogs_async(db, limit=limit, offset=offset, tags=tags, visibility=visibility))
+    else:
+        value = serialize_page(await get_blogs_page_async(db, limit=limit, tags=tags, visibility=visibility, cursor=cursor))
+    await blog_cache.offload(blog_cache.set, key, value)
+    return value
+
+async def get_blog_cached_async(db: AsyncSession, blog_id: uuid.UUID) -> Optional[dict]:
+    key, cached = await blog_cache.offload(lookup_blog, blog_id)
+    if cached is not None:
+        return cached
+    blog = await get_blog_async(db, blog_id)
+    if not blog:
+        return None
+    value = BlogOut.model_validate(blog).model_dump(mode="json")
+    await blog_cache.offload(blog_cache.set, key, value)
+    return value
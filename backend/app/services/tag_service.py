@@ -0,0 +1,60 @@
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.models.blog import Blog
+from app.models.tag import TagCount
+
+
+def counted_tags(blog: Blog) -> set[str]:
+    """Tags a post contributes to the catalog: only public, non-deleted posts count."""
+    if blog.is_deleted or blog.visibility != "public":
+        return set()
+    return set(blog.tags or [])
+
+def tag_deltas(before: set[str], after: set[str]) -> dict[str, int]:
+    deltas = {tag: -1 for tag in before - after}
+    deltas.update({tag: 1 for tag in after - before})
+    return deltas
+
+def tag_count_statements(deltas: dict[str, int]) -> list:
+    """Upsert the deltas, then drop tags no post uses any more.
+
+    Rows are written in sorted order so concurrent writers lock them in the
+    same order and can't deadlock each other.
+    """
+    deltas = {tag: delta for tag, delta in deltas.items() if delta}
+    if not deltas:
+        return []
+    stmt = insert(TagCount).values([{"tag": tag, "count": deltas[tag]} for tag in sorted(deltas)])
+    statements = [stmt.on_conflict_do_update(
+        index_elements=[TagCount.tag],
+        set_={"count": TagCount.count + stmt.excluded.count},
+    )]
+    removed = [tag for tag, delta in deltas.items() if delta < 0]
+    if removed:
+        statements.append(delete(TagCount).where(TagCount.tag.in_(removed), TagCount.count <= 0))
+    return statements
+
+def tag_counts_statement(limit: int):
+    return select(TagCount).where(TagCount.count > 0).order_by(TagCount.count.desc(), TagCount.tag).limit(limit)
+
+def apply_tag_deltas(db: Session, deltas: dict[str, int]) -> None:
+    """Apply tag-count deltas in the caller's transaction (no commit)."""
+    for stmt in tag_count_statements(deltas):
+        db.execute(stmt)
+
+def get_tag_counts(db: Session, limit: int = 100) -> List[TagCount]:
+    return db.execute(tag_counts_statement(limit)).scalars().all()
+
+
+# Async counterparts used by the AsyncSession routers (DB_MODE=async).
+
+async def apply_tag_deltas_async(db: AsyncSession, deltas: dict[str, int]) -> None:
+    for stmt in tag_count_statements(deltas):
+        await db.execute(stmt)
+
+async def get_tag_counts_async(db: AsyncSession, limit: int = 100) -> List[TagCount]:
+    return (await db.execute(tag_counts_statement(limit))).scalars().all()
@@ -1,16 +1,26 @@
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.schemas.user import UserCreate, UserOut
-from typing import List
+from typing import List, Optional
 import uuid
 
-from app.core.security import hash_password
+from app.core.cache import TTLCache, caches
+from app.core.password_hasher import password_hasher
+from app.schemas.auth import Principal
+from app.services.blog_service import drop_user_counts, drop_user_counts_async
 
-def create_user(db: Session, user_data: UserCreate) -> User:
+# Auth-relevant user fields keyed by user id, so token checks don't hit the DB.
+user_cache = TTLCache(maxsize=4096, ttl=300)
+caches["users"] = user_cache
+
+def create_user(db: Session, user_data: UserCreate, password_hash: Optional[str] = None) -> User:
+    # Async routes hash on password_hasher first and pass the result in.
     user = User(
         username=user_data.username,
         email=user_data.email,
-        password_hash=hash_password(user_data.password)
+        password_hash=password_hash or password_hasher.hash(user_data.password)
     ) 
     db.add(user)
     db.commit()
@@ -23,12 +33,31 @@ def get_users(db: Session) -> List[User]:
 def get_user(db: Session, user_id: uuid.UUID) -> User:
     return db.query(User).filter(User.id == user_id).first()
 
+def get_principal(db: Session, user_id: uuid.UUID, min_version: int = 0) -> Optional[Principal]:
+    # A token newer than the cached principal was issued after a revocation
+    # this process hasn't seen; reload rather than reject it.
+    principal = user_cache.get(user_id)
+    if principal is None or principal.token_version < min_version:
+        user = get_user(db, user_id)
+        if not user:
+            return None
+        principal = cache_principal(user)
+    return principal
+
+def cache_principal(user: User) -> Principal:
+    principal = Principal(id=user.id, username=user.username, token_version=user.token_version)
+    user_cache.set(user.id, principal)
+    return principal
+
 def delete_user(db: Session, user_id: uuid.UUID) -> bool:
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         return False
+    # The FK cascade removes the user's posts without touching their counts.
+    drop_user_counts(db, user_id)
     db.delete(user)
     db.commit()
+    user_cache.delete(user_id)
     return True
 
 def get_user_by_email(db: Session, email: str) -> User:
@@ -36,3 +65,90 @@ def get_user_by_email(db: Session, email: str) -> User:
 
 def get_user_by_username(db: Session, username: str) -> User:
     return db.query(User).filter(User.username == username).first()
+
+def update_password_hash(db: Session, user: User, password_hash: str) -> None:
+    user.password_hash = password_hash
+    db.commit()
+
+def revoke_statement(user_id: uuid.UUID, **values):
+    """Bump token_version (plus any other columns) atomically, returning the new version."""
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1, **values)
+        .returning(User.token_version)
+    )
+
+def revoke_tokens(db: Session, user_id: uuid.UUID, **values) -> Optional[int]:
+    """Invalidate every token issued to the user so far; None if there is no such user.
+
+    Other workers keep their cached principal until its TTL runs out, so a
+    revoked token can still pass there for up to user_cache.ttl seconds.
+    """
+    version = db.execute(revoke_statement(user_id, **values)).scalar_one_or_none()
+    db.commit()
+    user_cache.delete(user_id)
+    return version
+
+def change_password(db: Session, user_id: uuid.UUID, password_hash: str) -> Optional[int]:
+    return revoke_tokens(db, user_id, password_hash=password_hash)
+
+
+# Async counterparts used by the AsyncSession routers (DB_MODE=async).
+
+async def create_user_async(db: AsyncSession, user_data: UserCreate) -> User:
+    # bcrypt is CPU-bound; keep it off the event loop and the AnyIO pool.
+    password_hash = await password_hasher.hash_async(user_data.password)
+    user = User(
+        username=user_data.username,
+        email=user_data.email,
+        password_hash=password_hash
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+async def get_users_async(db: AsyncSession) -> List[User]:
+    return (await db.execute(select(User))).scalars().all()
+
+async def get_user_async(db: AsyncSession, user_id: uuid.UUID) -> User:
+    return await db.get(User, user_id)
+
+async def get_principal_async(db: AsyncSession, user_id: uuid.UUID, min_version: int = 0) -> Optional[Principal]:
+    principal = user_cache.get(user_id)
+    if principal is None or principal.token_version < min_version:
+        user = await get_user_async(db, user_id)
+        if not user:
+            return None
+        principal = cache_principal(user)
+    return principal
+
+async def delete_user_async(db: AsyncSession, user_id: uuid.UUID) -> bool:
+    user = await db.get(User, user_id)
+    if not user:
+        return False
+    await drop_user_counts_async(db, user_id)
+    await db.delete(user)
+    await db.commit()
+    user_cache.delete(user_id)
+    return True
+
+async def get_user_by_email_async(db: AsyncSession, email: str) -> User:
+    return (await db.execute(select(User).where(User.email == email))).scalars().first()
+
+async def get_user_by_username_async(db: AsyncSession, username: str) -> User:
+    return (await db.execute(select(User).where(User.username == username))).scalars().first()
+
+async def update_password_hash_async(db: AsyncSession, user: User, password_hash: str) -> None:
+    user.password_hash = password_hash
+    await db.commit()
+
+async def revoke_tokens_async(db: AsyncSession, user_id: uuid.UUID, **values) -> Optional[int]:
+    version = (await db.execute(revoke_statement(user_id, **values))).scalar_one_or_none()
+    await db.commit()
+    user_cache.delete(user_id)
+    return version
+
+async def change_password_async(db: AsyncSession, user_id: uuid.UUID, password_hash: str) -> Optional[int]:
+    return await revoke_tokens_async(db, user_id, password_hash=password_hash)
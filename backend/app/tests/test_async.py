@@ -0,0 +1,152 @@
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database.db_connect import async_engine
+from app.routers import user_router_async, blog_router_async, auth_router_async, tag_router_async
+
+
+def async_app() -> FastAPI:
+    # Mounts the DB_MODE=async routers on their own app, as main.py would,
+    # including dropping the pool's connections when the client's loop stops.
+    app = FastAPI()
+    app.include_router(user_router_async.router)
+    app.include_router(blog_router_async.router)
+    app.include_router(auth_router_async.router)
+    app.include_router(tag_router_async.router)
+    app.add_event_handler("shutdown", async_engine.dispose)
+    return app
+
+
+def test_async_routes_blog_crud():
+    app = async_app()
+    # Per-run user and tag, so exact results hold on a database earlier runs wrote to.
+    suffix = uuid.uuid4().hex[:8]
+    username, tag = f"asyncuser_{suffix}", f"async{suffix}"
+
+    with TestClient(app) as client:
+        user_data = {
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": "Test@1234"
+        }
+        response = client.post("/users/", json=user_data)
+        assert response.status_code == 200
+
+        login_resp = client.post("/auth/login", json={"username": username, "password": "Test@1234"})
+        assert login_resp.status_code == 200
+        headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+        response = client.post("/blogs/", json={"title": f"Async Blog {tag}", "content": "<p>async</p>", "tags": [tag]}, headers=headers)
+        assert response.status_code == 200
+        blog_id = response.json()["id"]
+
+        response = client.put(f"/blogs/{blog_id}", json={"title": f"Async Blog Updated {tag}"}, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["title"] == f"Async Blog Updated {tag}"
+
+        response = client.get("/blogs/", params={"cursor": "", "tags": [tag]})
+        assert [b["id"] for b in response.json()["items"]] == [blog_id]
+        assert {"tag": tag, "count": 1} in client.get("/tags/", params={"limit": 1000}).json()
+        assert [b["id"] for b in client.get("/blogs/search", params={"q": tag}).json()] == [blog_id]
+        assert client.get("/blogs/search", params={"q": tag, "visibility": "private"}).status_code == 401
+        assert client.get("/blogs/search", params={"q": tag, "visibility": "private"}, headers=headers).json() == []
+
+        response = client.post("/blogs/bulk", json=[{"title": "A1", "content": "a"}, {"title": "A2", "content": "b"}], headers=headers)
+        bulk_ids = [r["id"] for r in response.json()["results"]]
+        response = client.put("/blogs/bulk", json=[{"id": bulk_ids[0], "title": "A1 v2"}], headers=headers)
+        assert response.json()["succeeded"] == 1
+        assert client.get(f"/blogs/{bulk_ids[0]}").json()["title"] == "A1 v2"
+        response = client.request("DELETE", "/blogs/bulk", json={"ids": bulk_ids}, headers=headers)
+        assert response.json()["succeeded"] == 2
+
+        response = client.delete(f"/blogs/{blog_id}", headers=headers)
+        assert response.status_code == 200
+        assert client.get(f"/blogs/{blog_id}").status_code == 404
+        assert tag not in [t["tag"] for t in client.get("/tags/", params={"limit": 1000}).json()]
+
+
+def test_async_cached_reads_keep_shared_tier_off_the_event_loop(monkeypatch):
+    import asyncio
+    from app.core import cache
+    from app.services import blog_service
+
+    class SharedTier:
+        """Fake Redis tier that records any call made on the event loop thread."""
+
+        def __init__(self):
+            self.data, self.on_loop = {}, []
+
+        def _call(self, name):
+            try:
+                asyncio.get_running_loop()
+                self.on_loop.append(name)
+            except RuntimeError:
+                pass
+
+        def get(self, key):
+            self._call("get")
+            return self.data.get(key)
+
+        def set(self, key, value, ttl):
+            self._call("set")
+            self.data[key] = value
+
+        def delete(self, key):
+            self._call("delete")
+            self.data.pop(key, None)
+
+        def get_int(self, key):
+            self._call("get_int")
+            return int(self.data.get(key, 0))
+
+        def incr(self, key):
+            self._call("incr")
+            self.data[key] = int(self.data.get(key, 0)) + 1
+            return self.data[key]
+
+    monkeypatch.setitem(cache.caches, "blogs", cache.caches["blogs"])
+    shared = SharedTier()
+    monkeypatch.setattr(blog_service, "blog_cache", cache.TieredCache("blogs", shared=shared))
+
+    app = async_app()
+    username = f"asyncshared_{uuid.uuid4().hex[:8]}"
+
+    with TestClient(app) as client:
+        client.post("/users/", json={"username": username, "email": f"{username}@example.com", "password": "Test@1234"})
+        login_resp = client.post("/auth/login", json={"username": username, "password": "Test@1234"})
+        headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+        blog_id = client.post("/blogs/", json={"title": "Shared", "content": "<p>s</p>"}, headers=headers).json()["id"]
+
+        for _ in range(2):
+            assert client.get(f"/blogs/{blog_id}").status_code == 200
+            assert client.get("/blogs/", params={"limit": 1}).status_code == 200
+        client.put(f"/blogs/{blog_id}", json={"title": "Shared v2"}, headers=headers)
+        assert client.get(f"/blogs/{blog_id}").json()["title"] == "Shared v2"
+
+    assert shared.data
+    assert shared.on_loop == []
+
+
+def test_async_password_change_revokes_tokens():
+    app = async_app()
+    username = f"asyncrevoke_{uuid.uuid4().hex[:8]}"
+
+    with TestClient(app) as client:
+        user_data = {"username": username, "email": f"{username}@example.com", "password": "Test@1234"}
+        assert client.post("/users/", json=user_data).status_code == 200
+        token = client.post("/auth/login", json={"username": username, "password": "Test@1234"}).json()["access_token"]
+        old_headers = {"Authorization": f"Bearer {token}"}
+
+        change = {"current_password": "Test@1234", "new_password": "Other@5678"}
+        response = client.post("/auth/password", json=change, headers=old_headers)
+        assert response.status_code == 200
+        new_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        blog_data = {"title": "Async revocation", "content": "<p>hi</p>"}
+        assert client.post("/blogs/", json=blog_data, headers=old_headers).status_code == 401
+        assert client.post("/blogs/", json=blog_data, headers=new_headers).status_code == 200
+
+        assert client.post("/auth/logout-all", headers=new_headers).status_code == 200
+        assert client.post("/blogs/", json=blog_data, headers=new_headers).status_code == 401
@@ -22,3 +22,169 @@ def test_user_registration_and_login(client):
     login_data["password"] = "wrongpassword"
     response = client.post("/auth/login", json=login_data)
     assert response.status_code == 401
+
+
+def test_authenticated_write_skips_user_lookup(client):
+    from sqlalchemy import event
+    from app.database.db_connect import engine
+
+    user_data = {
+        "username": "cacheduser",
+        "email": "cacheduser@example.com",
+        "password": "Test@1234"
+    }
+    response = client.post("/users/", json=user_data)
+    assert response.status_code == 200
+    user_id = response.json()["id"]
+
+    login_resp = client.post("/auth/login", json={"username": "cacheduser", "password": "Test@1234"})
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    blog_data = {"title": "Cached principal", "content": "<p>hi</p>"}
+
+    # First request warms the user cache.
+    assert client.post("/blogs/", json=blog_data, headers=headers).status_code == 200
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert client.post("/blogs/", json=blog_data, headers=headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements
+    assert not any("blogapp_schema.users" in s for s in statements)
+
+    # Deleting the user must invalidate the cached principal.
+    assert client.delete(f"/users/{user_id}").status_code == 200
+    response = client.post("/blogs/", json=blog_data, headers=headers)
+    assert response.status_code == 404
+
+
+def test_login_rehashes_when_bcrypt_cost_changes(client):
+    import uuid
+    from passlib.context import CryptContext
+    from sqlalchemy import text
+    from app.core.security import BCRYPT_ROUNDS
+    from app.database.db_connect import engine
+
+    username = f"rehashuser_{uuid.uuid4().hex[:8]}"
+    user_data = {"username": username, "email": f"{username}@example.com", "password": "Test@1234"}
+    assert client.post("/users/", json=user_data).status_code == 200
+
+    # Simulate a hash stored under an older cost factor.
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("Test@1234")
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE blogapp_schema.users SET password_hash = :h WHERE username = :u"), {"h": old_hash, "u": username})
+
+    before = client.get("/ops/hasher").json()
+    response = client.post("/auth/login", json={"username": username, "password": "Test@1234"})
+    assert response.status_code == 200
+
+    with engine.connect() as conn:
+        stored = conn.execute(text("SELECT password_hash FROM blogapp_schema.users WHERE username = :u"), {"u": username}).scalar_one()
+    assert stored.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+    assert client.post("/auth/login", json={"username": username, "password": "Test@1234"}).status_code == 200
+
+    stats = client.get("/ops/hasher").json()
+    assert stats["rehashed"] == before["rehashed"] + 1
+    assert stats["completed"] >= before["completed"] + 2
+    assert stats["queue_wait_ms"]["count"] >= stats["completed"]
+
+
+def test_login_rate_limits(client, monkeypatch):
+    from app.core.rate_limit import Bucket, MemoryTokenBuckets, login_limiter
+
+    monkeypatch.setattr(login_limiter, "backend", MemoryTokenBuckets())
+    monkeypatch.setattr(login_limiter, "user_bucket", Bucket(2, 0.001))
+    monkeypatch.setattr(login_limiter, "ip_bucket", Bucket(6, 0.001))
+    before = client.get("/ops/ratelimit").json()
+
+    # Failed attempts drain the username bucket; then even the right password is refused.
+    wrong = {"username": "testuser", "password": "wrong"}
+    assert client.post("/auth/login", json=wrong).status_code == 401
+    assert client.post("/auth/login", json=wrong).status_code == 401
+    response = client.post("/auth/login", json={"username": "TestUser", "password": "Test@1234"})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+    # Other accounts are unaffected until the IP bucket runs dry.
+    assert client.post("/auth/login", json={"username": "nosuchuser", "password": "x"}).status_code == 401
+    assert client.post("/auth/login", json={"username": "nosuchuser", "password": "x"}).status_code == 401
+    assert client.post("/auth/login", json={"username": "nosuchuser", "password": "x"}).status_code == 429
+    assert client.post("/auth/login", json={"username": "another", "password": "x"}).status_code == 429
+
+    stats = client.get("/ops/ratelimit").json()
+    assert stats["rejected"]["username"] == before["rejected"]["username"] + 2
+    assert stats["rejected"]["ip"] == before["rejected"]["ip"] + 1
+    assert stats["failed_logins"] == before["failed_logins"] + 4
+
+
+def test_login_reserves_username_tokens_and_refunds_on_success(client, monkeypatch):
+    import threading
+    import pytest
+    from fastapi import HTTPException
+    from app.core.rate_limit import Bucket, MemoryTokenBuckets, login_limiter
+
+    threads = set()
+
+    class RemoteBuckets(MemoryTokenBuckets):
+        # Stands in for Redis: must not be called on the event loop.
+        remote = True
+
+        def take(self, key, bucket, cost=1):
+            threads.add(threading.current_thread().name)
+            return super().take(key, bucket, cost)
+
+    monkeypatch.setattr(login_limiter, "backend", RemoteBuckets())
+    monkeypatch.setattr(login_limiter, "user_bucket", Bucket(2, 0.001))
+
+    # Each success gives its reserved token back.
+    for _ in range(4):
+        assert client.post("/auth/login", json={"username": "testuser", "password": "Test@1234"}).status_code == 200
+    assert threads and all(name.startswith("AnyIO worker") for name in threads)
+
+    # Concurrent guesses each reserve a token before any of them has failed.
+    login_limiter.check("198.51.100.1", "testuser")
+    login_limiter.check("198.51.100.2", "testuser")
+    with pytest.raises(HTTPException) as exc:
+        login_limiter.check("198.51.100.3", "testuser")
+    assert exc.value.status_code == 429
+
+
+def test_password_change_and_logout_all_revoke_tokens(client):
+    import uuid
+    from app.schemas.auth import Principal
+    from app.services.user_service import user_cache
+
+    username = f"revokeuser_{uuid.uuid4().hex[:8]}"
+    user_data = {"username": username, "email": f"{username}@example.com", "password": "Test@1234"}
+    user_id = client.post("/users/", json=user_data).json()["id"]
+    old_token = client.post("/auth/login", json={"username": username, "password": "Test@1234"}).json()["access_token"]
+    old_headers = {"Authorization": f"Bearer {old_token}"}
+    blog_data = {"title": "Revocation", "content": "<p>hi</p>"}
+    # Warms the user cache with the pre-change principal.
+    assert client.post("/blogs/", json=blog_data, headers=old_headers).status_code == 200
+
+    change = {"current_password": "wrong", "new_password": "Other@5678"}
+    assert client.post("/auth/password", json=change, headers=old_headers).status_code == 401
+    change["current_password"] = "Test@1234"
+    response = client.post("/auth/password", json=change, headers=old_headers)
+    assert response.status_code == 200
+    new_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = client.post("/blogs/", json=blog_data, headers=old_headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+    assert client.post("/blogs/", json=blog_data, headers=new_headers).status_code == 200
+    assert client.post("/auth/login", json={"username": username, "password": "Test@1234"}).status_code == 401
+    assert client.post("/auth/login", json={"username": username, "password": "Other@5678"}).status_code == 200
+
+    # A worker still caching the old principal reloads it for a newer token.
+    user_cache.set(uuid.UUID(user_id), Principal(id=user_id, username=username, token_version=0))
+    assert client.post("/blogs/", json=blog_data, headers=new_headers).status_code == 200
+
+    assert client.post("/auth/logout-all", headers=new_headers).status_code == 200
+    assert client.post("/blogs/", json=blog_data, headers=new_headers).status_code == 401
+    fresh = client.post("/auth/login", json={"username": username, "password": "Other@5678"}).json()["access_token"]
+    assert client.post("/blogs/", json=blog_data, headers={"Authorization": f"Bearer {fresh}"}).status_code == 200
@@ -40,3 +40,290 @@ def test_blog_crud(client):
 
     response = client.get("/blogs/")
     assert all(b["id"] != blog_id for b in response.json())
+
+
+def test_blog_cursor_pagination(client):
+    import uuid
+
+    login_data = {
+        "username": "testuser",
+        "password": "Test@1234"
+    }
+    login_resp = client.post("/auth/login", json=login_data)
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    # A tag of its own, so the page sizes hold on a database earlier runs wrote to.
+    tag = f"paging-{uuid.uuid4().hex[:8]}"
+
+    created = []
+    for i in range(3):
+        blog_data = {
+            "title": f"Paged Blog {i}",
+            "content": "<p>paging</p>",
+            "tags": [tag]
+        }
+        response = client.post("/blogs/", json=blog_data, headers=headers)
+        assert response.status_code == 200
+        created.append(response.json()["id"])
+
+    response = client.get("/blogs/", params={"cursor": "", "limit": 2, "tags": [tag]})
+    assert response.status_code == 200
+    first_page = response.json()
+    assert len(first_page["items"]) == 2
+    assert first_page["next_cursor"]
+    assert first_page["items"][0]["excerpt"] == "paging"
+    assert "content" not in first_page["items"][0]
+
+    response = client.get("/blogs/", params={"cursor": first_page["next_cursor"], "limit": 2, "tags": [tag]})
+    assert response.status_code == 200
+    second_page = response.json()
+    assert len(second_page["items"]) == 1
+    assert second_page["next_cursor"] is None
+
+    seen = [b["id"] for b in first_page["items"] + second_page["items"]]
+    assert sorted(seen) == sorted(created)
+
+    response = client.get("/blogs/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_blog_reads_are_cached_and_invalidated(client):
+    import uuid
+    from sqlalchemy import event
+    from app.database.db_connect import engine
+
+    login_resp = client.post("/auth/login", json={"username": "testuser", "password": "Test@1234"})
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    # A tag of this run's own, so the tag feed holds just this blog on a reused database.
+    tag = f"cached-{uuid.uuid4().hex[:8]}"
+    blog_id = client.post("/blogs/", json={"title": "Cached", "content": "<p>c</p>", "tags": [tag]}, headers=headers).json()["id"]
+
+    assert client.get(f"/blogs/{blog_id}").status_code == 200
+    assert client.get("/blogs/", params={"tags": [tag]}).status_code == 200
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert client.get(f"/blogs/{blog_id}").json()["title"] == "Cached"
+        assert [b["id"] for b in client.get("/blogs/", params={"tags": [tag]}).json()] == [blog_id]
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements == []
+
+    client.put(f"/blogs/{blog_id}", json={"title": "Cached v2"}, headers=headers)
+    assert client.get(f"/blogs/{blog_id}").json()["title"] == "Cached v2"
+    assert client.get("/blogs/", params={"tags": [tag]}).json()[0]["title"] == "Cached v2"
+
+    stats = client.get("/ops/cache").json()["blogs"]
+    assert stats["local_hits"] >= 2
+    assert stats["misses"] >= 2
+    assert stats["invalidations"] >= 1
+
+
+
+def test_blog_writes_invalidate_other_workers(client, monkeypatch):
+    from app.core import cache
+    from app.services import blog_service
+
+    class SharedTier:
+        """Stands in for Redis: one dict seen by both workers' caches."""
+
+        def __init__(self):
+            self.data = {}
+
+        def get(self, key):
+            return self.data.get(key)
+
+        def set(self, key, value, ttl):
+            self.data[key] = value
+
+        def delete(self, key):
+            self.data.pop(key, None)
+
+        def get_int(self, key):
+            return int(self.data.get(key, 0))
+
+        def incr(self, key):
+            self.data[key] = self.get_int(key) + 1
+            return self.data[key]
+
+    monkeypatch.setitem(cache.caches, "blogs", cache.caches["blogs"])
+    shared = SharedTier()
+    worker_a, worker_b = cache.TieredCache("blogs", shared=shared), cache.TieredCache("blogs", shared=shared)
+
+    login_resp = client.post("/auth/login", json={"username": "testuser", "password": "Test@1234"})
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    blog_id = client.post("/blogs/", json={"title": "Two workers", "content": "<p>w</p>"}, headers=headers).json()["id"]
+
+    monkeypatch.setattr(blog_service, "blog_cache", worker_a)
+    etag = client.get(f"/blogs/{blog_id}").headers["etag"]
+    assert worker_a.local.get(blog_service.blog_cache_key(blog_id))
+
+    # The edit and the delete land on the other worker; worker A's LRU still holds the post.
+    monkeypatch.setattr(blog_service, "blog_cache", worker_b)
+    client.put(f"/blogs/{blog_id}", json={"title": "Two workers v2"}, headers=headers)
+    monkeypatch.setattr(blog_service, "blog_cache", worker_a)
+    response = client.get(f"/blogs/{blog_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json()["title"] == "Two workers v2"
+
+    monkeypatch.setattr(blog_service, "blog_cache", worker_b)
+    client.delete(f"/blogs/{blog_id}", headers=headers)
+    monkeypatch.setattr(blog_service, "blog_cache", worker_a)
+    assert client.get(f"/blogs/{blog_id}").status_code == 404
+
+def test_blog_conditional_get(client):
+    login_resp = client.post("/auth/login", json={"username": "testuser", "password": "Test@1234"})
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    blog_id = client.post("/blogs/", json={"title": "Etag", "content": "<p>e</p>", "tags": ["etag"]}, headers=headers).json()["id"]
+
+    response = client.get(f"/blogs/{blog_id}")
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert "last-modified" in response.headers
+
+    response = client.get(f"/blogs/{blog_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    feed = client.get("/blogs/", params={"tags": ["etag"]})
+    feed_etag = feed.headers["etag"]
+    assert client.get("/blogs/", params={"tags": ["etag"]}, headers={"If-None-Match": feed_etag}).status_code == 304
+    # Lists only validate by ETag: a delete leaves the newest updated_at unchanged.
+    assert "last-modified" not in feed.headers
+    assert client.get(
+        "/blogs/", params={"tags": ["etag"]}, headers={"If-Modified-Since": response.headers["last-modified"]}
+    ).status_code == 200
+
+    client.put(f"/blogs/{blog_id}", json={"title": "Etag v2"}, headers=headers)
+    response = client.get(f"/blogs/{blog_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert client.get("/blogs/", params={"tags": ["etag"]}, headers={"If-None-Match": feed_etag}).status_code == 200
+
+    feed_etag = client.get("/blogs/", params={"tags": ["etag"]}).headers["etag"]
+    client.delete(f"/blogs/{blog_id}", headers=headers)
+    assert client.get("/blogs/", params={"tags": ["etag"]}, headers={"If-None-Match": feed_etag}).status_code == 200
+
+
+def test_blog_search(client):
+    import uuid
+
+    login_resp = client.post("/auth/login", json={"username": "testuser", "password": "Test@1234"})
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    # A word no earlier run has indexed, so exact result lists hold on a reused database.
+    word = f"sourdough{uuid.uuid4().hex[:8]}"
+    in_title = client.post("/blogs/", json={"title": f"{word} starters", "content": "<p>Flour and water.</p>", "tags": ["baking"]}, headers=headers).json()
+    in_body = client.post("/blogs/", json={"title": "Weekend notes", "content": f"<p>Fed my <b>{word}</b> again.</p>", "tags": ["life"]}, headers=headers).json()
+    private = client.post("/blogs/", json={"title": f"Private {word}", "content": "x", "visibility": "private"}, headers=headers).json()
+
+    response = client.get("/blogs/search", params={"q": word})
+    assert response.status_code == 200
+    results = response.json()
+    # Title matches (weight A) outrank body matches (weight B).
+    assert [r["id"] for r in results] == [in_title["id"], in_body["id"]]
+    assert results[0]["rank"] >= results[1]["rank"] > 0
+    assert f"<mark>{word}</mark>" in results[1]["snippet"]
+    assert "<b>" not in results[1]["snippet"]
+
+    assert [r["id"] for r in client.get("/blogs/search", params={"q": word, "tags": ["life"]}).json()] == [in_body["id"]]
+    assert client.get("/blogs/search", params={"q": f"{word} -flour"}).json()[0]["id"] == in_body["id"]
+
+    # Private posts are never visible anonymously, and only to their owner otherwise.
+    for visibility in ("private", ""):
+        assert client.get("/blogs/search", params={"q": word, "visibility": visibility}).status_code == 401
+    own = client.get("/blogs/search", params={"q": word, "visibility": "private"}, headers=headers).json()
+    assert [r["id"] for r in own] == [private["id"]]
+    other = {"username": f"searcher_{uuid.uuid4().hex[:8]}", "password": "Test@1234"}
+    assert client.post("/users/", json={**other, "email": f"{other['username']}@example.com"}).status_code == 200
+    other_headers = {"Authorization": f"Bearer {client.post('/auth/login', json=other).json()['access_token']}"}
+    assert client.get("/blogs/search", params={"q": word, "visibility": "private"}, headers=other_headers).json() == []
+
+    client.put(f"/blogs/{in_body['id']}", json={"content": f"<p>Rye{word} bread today.</p>"}, headers=headers)
+    assert [r["id"] for r in client.get("/blogs/search", params={"q": word}).json()] == [in_title["id"]]
+    assert [r["id"] for r in client.get("/blogs/search", params={"q": f"rye{word}"}).json()] == [in_body["id"]]
+
+    client.delete(f"/blogs/{in_title['id']}", headers=headers)
+    assert client.get("/blogs/search", params={"q": word}).json() == []
+    assert client.get("/blogs/search").status_code == 422
+
+
+def test_blog_bulk_operations(client):
+    import uuid
+
+    login_resp = client.post("/auth/login", json={"username": "testuser", "password": "Test@1234"})
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    # A tag of this run's own, so the exact tag counts hold on a reused database.
+    tag = f"bulk-{uuid.uuid4().hex[:8]}"
+
+    items = [
+        {"title": f"Bulk {i}", "content": f"<p onclick='x()'>bulk {i}</p><script>bad()</script>", "tags": [tag]}
+        for i in range(40)
+    ]
+    items.insert(3, {"title": "Bad image", "content": "x", "main_image_url": "http://evil.example/a.png"})
+    response = client.post("/blogs/bulk", json=items, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (40, 1)
+    results = body["results"]
+    assert [r["index"] for r in results] == list(range(41))
+    assert results[3]["status"] == "error" and "image" in results[3]["error"]
+    created = [r["id"] for r in results if r["status"] == "created"]
+
+    blog = client.get(f"/blogs/{created[0]}").json()
+    assert blog["title"] == "Bulk 0"
+    assert "<script>" not in blog["content"] and "onclick" not in blog["content"]
+    excerpts = {b["id"]: b["excerpt"] for b in client.get("/blogs/", params={"tags": [tag], "limit": 100}).json()}
+    assert excerpts[created[0]].startswith("bulk 0")
+    assert {"tag": tag, "count": 40} in client.get("/tags/", params={"limit": 1000}).json()
+
+    updates = [
+        {"id": created[0], "title": "Bulk 0 v2", "content": "<p>new <i>body</i></p>"},
+        {"id": created[1], "tags": [f"{tag}-moved"]},
+        {"id": created[0], "title": "again"},
+        {"id": "00000000-0000-0000-0000-000000000000", "title": "missing"},
+        {"id": created[2], "content": None},
+        {"id": created[3], "tags": None},
+        {"id": created[4], "title": "fine", "visibility": None},
+    ]
+    response = client.put("/blogs/bulk", json=updates, headers=headers)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["updated", "updated", "error", "error", "error", "error", "error"]
+    assert [r["error"] for r in results[4:]] == ["content must not be null", "tags must not be null", "visibility must not be null"]
+    assert client.get(f"/blogs/{created[4]}").json()["title"] == "Bulk 4"
+    blog = client.get(f"/blogs/{created[0]}").json()
+    assert (blog["title"], blog["content"]) == ("Bulk 0 v2", "<p>new <i>body</i></p>")
+    excerpts = {b["id"]: b["excerpt"] for b in client.get("/blogs/", params={"tags": [tag], "limit": 100}).json()}
+    assert excerpts[created[0]] == "new body"
+    assert {"tag": tag, "count": 39} in client.get("/tags/", params={"limit": 1000}).json()
+
+    response = client.request("DELETE", "/blogs/bulk", json={"ids": created[:5]}, headers=headers)
+    assert response.json()["succeeded"] == 5
+    assert client.get(f"/blogs/{created[0]}").status_code == 404
+    assert {"tag": tag, "count": 35} in client.get("/tags/", params={"limit": 1000}).json()
+
+    assert client.post("/blogs/bulk", json=[], headers=headers).status_code == 422
+    assert client.request("DELETE", "/blogs/bulk", json={"ids": []}, headers=headers).status_code == 422
+    assert client.post("/blogs/bulk", json=items[:1]).status_code == 401
+
+
+def test_blog_content_sanitizer_offload_and_memo(client, monkeypatch):
+    from app.core import sanitizer
+
+    login_resp = client.post("/auth/login", json={"username": "testuser", "password": "Test@1234"})
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    # Force the process-pool path for anything over 1 KiB.
+    monkeypatch.setattr(sanitizer, "SANITIZE_WORKERS", 2)
+    monkeypatch.setattr(sanitizer, "SANITIZE_OFFLOAD_BYTES", 1024)
+    content = "<p onclick='x()'>Long <b>post</b></p><script>bad()</script>" * 100
+
+    blog = client.post("/blogs/", json={"title": "Long", "content": content}, headers=headers).json()
+    assert blog["content"] == sanitizer.clean_html(content)
+    assert "<script>" not in blog["content"]
+
+    hits = client.get("/ops/cache").json()["sanitizer"]["hits"]
+    client.put(f"/blogs/{blog['id']}", json={"content": content}, headers=headers)
+    assert client.get("/ops/cache").json()["sanitizer"]["hits"] == hits + 1
@@ -0,0 +1,87 @@
+import json
+import logging
+import queue
+
+from app.core.logger import (
+    AccessSampleFilter, DroppingQueueHandler, LevelRateLimitFilter, StructuredJSONFormatter,
+    parse_rate_limits, trace_id_var,
+)
+
+
+def test_trace_id_and_single_access_log(client, caplog):
+    with caplog.at_level(logging.INFO, logger="blog_app_logger"):
+        response = client.get("/blogs/", params={"limit": 1})
+    assert response.status_code == 200
+    trace_id = response.headers["x-trace-id"]
+    assert len(trace_id) == 32
+
+    access_logs = [r.msg for r in caplog.records if isinstance(r.msg, dict) and "status_code" in r.msg]
+    assert len(access_logs) == 1
+    assert access_logs[0]["trace_id"] == trace_id
+    assert access_logs[0]["url"] == "/blogs/?limit=1"
+    assert access_logs[0]["status_code"] == 200
+
+    # A caller-supplied id is propagated; anything malformed is replaced.
+    assert client.get("/", headers={"X-Trace-Id": "edge-1234"}).headers["x-trace-id"] == "edge-1234"
+    assert client.get("/", headers={"X-Trace-Id": "bad id\n"}).headers["x-trace-id"] != "bad id\n"
+    assert client.get("/missing").headers["x-trace-id"]
+
+
+def test_structured_logging_sampling_and_rate_limits():
+    def record(level, msg):
+        return logging.LogRecord("blog_app_logger.test", level, __file__, 1, msg, None, None)
+
+    # Dict messages become top-level JSON fields, with the request's trace id.
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    token = trace_id_var.set("abc")
+    try:
+        handler.handle(record(logging.INFO, {"event": "thing", "n": 1}))
+    finally:
+        trace_id_var.reset(token)
+    line = json.loads(StructuredJSONFormatter().format(handler.queue.get_nowait()))
+    assert (line["event"], line["n"], line["trace_id"], line["level"]) == ("thing", 1, "abc", "INFO")
+
+    # A full queue drops instead of blocking.
+    handler.handle(record(logging.INFO, "one"))
+    handler.handle(record(logging.INFO, "two"))
+    assert handler.dropped == 1
+
+    limiter = LevelRateLimitFilter(parse_rate_limits("DEBUG=5"))
+    passed = sum(limiter.filter(record(logging.DEBUG, "d")) for _ in range(50))
+    assert passed == 5 and limiter.suppressed_total["DEBUG"] == 45
+    assert all(limiter.filter(record(logging.ERROR, "e")) for _ in range(50))
+
+    sampler = AccessSampleFilter(0.0)
+    assert not sampler.filter(record(logging.INFO, {"status_code": 200}))
+    assert sampler.filter(record(logging.INFO, {"status_code": 503}))
+    assert sampler.sampled_out == 1
+
+
+def test_metrics_endpoint(client):
+    client.get("/blogs/", params={"limit": 1})
+    client.get("/blogs/00000000-0000-0000-0000-00000000a404")
+    client.get("/no/such/path")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    # Latency is labelled by route template, never by raw path.
+    assert 'http_request_duration_seconds_count{method="GET",route="/blogs/",status="200"}' in body
+    assert 'route="/blogs/{blog_id}",status="404"' in body
+    assert 'route="<unmatched>",status="404"' in body
+    assert "/no/such/path" not in body and "a404" not in body
+    assert 'http_requests_in_progress{method="GET"}' in body
+    assert 'db_query_duration_seconds_count{engine=' in body and 'operation="SELECT"' in body
+    assert "db_pool_checked_out{" in body
+
+
+def test_metrics_multiprocess_keeps_ops_series(client, monkeypatch, tmp_path):
+    import os
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    body = client.get("/metrics").text
+    # In-process series survive the multiprocess registry, labelled by the answering worker.
+    assert f'pid="{os.getpid()}"' in body
+    assert "db_pool_checked_out{" in body
+    assert "log_queue_depth{" in body
@@ -0,0 +1,51 @@
+def test_pool_stats(client):
+
+    client.get("/users/")
+
+    response = client.get("/ops/pool")
+    assert response.status_code == 200
+    stats = response.json()["backend"]
+    assert stats["checkouts"] >= 1
+    assert stats["connections_opened"] >= 1
+    assert stats["checkout_wait_ms"]["count"] >= stats["checkouts"]
+    assert stats["checkout_wait_ms"]["buckets"]["+Inf"] == stats["checkout_wait_ms"]["count"]
+    for key in ("pool_size", "checked_out", "overflow", "checkout_timeouts", "connections_closed"):
+        assert key in stats
+
+
+def test_pool_wait_excludes_connect_time_and_errors():
+    import sqlite3
+    import time
+
+    import pytest
+    from sqlalchemy import exc
+
+    from app.database.engine_factory import build_engine, pool_metrics
+
+    fail = False
+
+    def connect():
+        time.sleep(0.3)
+        if fail:
+            raise sqlite3.OperationalError("unable to connect")
+        return sqlite3.connect(":memory:")
+
+    engine = build_engine("sqlite://", name="test_pool", creator=connect, pool_size=1, max_overflow=0, pool_timeout=0.1)
+    try:
+        metrics = pool_metrics["test_pool"]
+        held = engine.connect()
+        assert metrics.wait_count == 1 and metrics.wait_sum_ms < 250
+
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        assert metrics.timeouts == 1
+
+        held.invalidate()
+        held.close()
+        fail = True
+        with pytest.raises(exc.OperationalError):
+            engine.connect()
+        assert metrics.timeouts == 1
+    finally:
+        engine.dispose()
+        pool_metrics.pop("test_pool", None)
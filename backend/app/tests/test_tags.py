@@ -0,0 +1,117 @@
+import uuid
+
+from sqlalchemy import text
+
+from app.database.db_connect import engine
+from app.services import blog_service
+
+
+def tag_count(client, tag):
+    return {t["tag"]: t["count"] for t in client.get("/tags/", params={"limit": 1000}).json()}.get(tag, 0)
+
+
+def test_tag_counts_follow_blog_writes(client):
+    login_resp = client.post("/auth/login", json={"username": "testuser", "password": "Test@1234"})
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    # Tags of this run's own, so the exact counts hold on a database earlier runs wrote to.
+    suffix = uuid.uuid4().hex[:8]
+    a, b, c = f"tc-a-{suffix}", f"tc-b-{suffix}", f"tc-c-{suffix}"
+
+    first = client.post("/blogs/", json={"title": "T1", "content": "x", "tags": [a, b, a]}, headers=headers).json()
+    client.post("/blogs/", json={"title": "T2", "content": "x", "tags": [a]}, headers=headers)
+    client.post("/blogs/", json={"title": "T3", "content": "x", "tags": [a], "visibility": "private"}, headers=headers)
+    assert tag_count(client, a) == 2
+    assert tag_count(client, b) == 1
+
+    client.put(f"/blogs/{first['id']}", json={"tags": [b, c]}, headers=headers)
+    assert (tag_count(client, a), tag_count(client, b), tag_count(client, c)) == (1, 1, 1)
+
+    client.put(f"/blogs/{first['id']}", json={"visibility": "private"}, headers=headers)
+    assert (tag_count(client, b), tag_count(client, c)) == (0, 0)
+    client.put(f"/blogs/{first['id']}", json={"visibility": "public"}, headers=headers)
+    assert tag_count(client, c) == 1
+
+    client.delete(f"/blogs/{first['id']}", headers=headers)
+    assert c not in [t["tag"] for t in client.get("/tags/", params={"limit": 1000}).json()]
+
+    counts = [t["count"] for t in client.get("/tags/", params={"limit": 5}).json()]
+    assert counts == sorted(counts, reverse=True)
+
+
+
+def test_tag_counts_use_the_locked_row_version(client):
+    from app.database.db_connect import SessionLocal
+    from app.schemas.blog import BlogUpdate
+
+    login_resp = client.post("/auth/login", json={"username": "testuser", "password": "Test@1234"})
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    suffix = uuid.uuid4().hex[:8]
+    a, b, c = f"lk-a-{suffix}", f"lk-b-{suffix}", f"lk-c-{suffix}"
+    blog_id = uuid.UUID(client.post("/blogs/", json={"title": "L", "content": "x", "tags": [a]}, headers=headers).json()["id"])
+
+    # Two writers both load the post with tags [a], as the routers' ownership
+    # checks do; the second one's copy is stale by the time it writes.
+    with SessionLocal() as first, SessionLocal() as second:
+        loaded = [blog_service.get_blog(first, blog_id), blog_service.get_blog(second, blog_id)]
+        assert [blog.tags for blog in loaded] == [[a], [a]]
+        blog_service.update_blog(first, blog_id, BlogUpdate(tags=[b]))
+        blog_service.update_blog(second, blog_id, BlogUpdate(tags=[c]))
+    assert (tag_count(client, a), tag_count(client, b), tag_count(client, c)) == (0, 0, 1)
+
+    with SessionLocal() as first, SessionLocal() as second:
+        loaded = [blog_service.get_blog(first, blog_id), blog_service.get_blog(second, blog_id)]
+        assert blog_service.soft_delete_blog(first, blog_id)
+        assert blog_service.soft_delete_blog(second, blog_id)
+    keep = client.post("/blogs/", json={"title": "K", "content": "x", "tags": [c]}, headers=headers)
+    assert keep.status_code == 200
+    assert tag_count(client, c) == 1
+
+
+def test_deleting_a_user_drops_their_tag_counts(client):
+    username, tag = f"tagowner_{uuid.uuid4().hex[:8]}", f"owned-{uuid.uuid4().hex[:8]}"
+    user = client.post("/users/", json={"username": username, "email": f"{username}@example.com", "password": "Test@1234"}).json()
+    login_resp = client.post("/auth/login", json={"username": username, "password": "Test@1234"})
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    client.post("/blogs/", json={"title": "O1", "content": "x", "tags": [tag, tag]}, headers=headers)
+    client.post("/blogs/", json={"title": "O2", "content": "x", "tags": [tag]}, headers=headers)
+    client.post("/blogs/", json={"title": "O3", "content": "x", "tags": [tag], "visibility": "private"}, headers=headers)
+    assert tag_count(client, tag) == 2
+
+    assert client.delete(f"/users/{user['id']}").status_code == 200
+    assert tag not in [t["tag"] for t in client.get("/tags/", params={"limit": 1000}).json()]
+
+def explain(conn, stmt) -> str:
+    compiled = stmt.compile(engine)
+    return "\n".join(row[0] for row in conn.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params))
+
+
+def test_feed_queries_use_indexes(client):
+    # Seed a realistically sized table inside a transaction that is rolled back
+    # (ANALYZE's statistics included): mostly private posts, one tag in 1000 rare.
+    # Vacuum first: an earlier run's rolled-back seed leaves dead rows and GIN
+    # pending-list entries behind that would skew the plans.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM blogapp_schema.blog"))
+    with engine.connect() as conn:
+        user_id = conn.execute(text("SELECT id FROM blogapp_schema.users LIMIT 1")).scalar_one()
+        conn.execute(text("""
+            INSERT INTO blogapp_schema.blog (user_id, title, content, visibility, tags, created_at)
+            SELECT :uid, 'Plan ' || g, 'x',
+                   CASE WHEN g % 10 = 0 THEN 'public' ELSE 'private' END,
+                   CASE WHEN g % 1000 = 0 THEN ARRAY['plan-rare'] ELSE ARRAY['plan-common'] END,
+                   now() - g * interval '1 second'
+            FROM generate_series(1, 20000) AS g
+        """), {"uid": user_id})
+        conn.execute(text("ANALYZE blogapp_schema.blog"))
+        try:
+            plan = explain(conn, blog_service.feed_statement(limit=10, visibility="public", cursor=""))
+            assert "ix_blog_feed" in plan
+
+            plan = explain(conn, blog_service.feed_statement(limit=10, tags=["plan-rare"], visibility="public", cursor=""))
+            assert "ix_blog_tags_gin" in plan
+            assert "Seq Scan" not in plan
+
+            plan = explain(conn, blog_service.search_statement("sourdough", limit=10))
+            assert "ix_blog_search_vector" in plan
+        finally:
+            conn.rollback()
@@ -4,3 +4,189 @@ def test_image_upload(client):
         response = client.post("/upload/image", files={"file": ("test_image.png", f, "image/png")})
     assert response.status_code == 200
     assert "url" in response.json()
+
+
+def test_image_upload_streams_to_disk(client):
+    from pathlib import Path
+
+    content = b"\x89PNG\r\n\x1a\n" + b"\x00" * (200 * 1024)
+    response = client.post("/upload/image", files={"file": ("streamed.png", content, "image/png")})
+    assert response.status_code == 200
+    url = response.json()["url"]
+    assert url.startswith("/uploads/") and url.endswith(".png")
+    assert (Path("uploads") / url.rsplit("/", 1)[1]).read_bytes() == content
+
+
+def test_image_upload_rejects_oversized_and_bad_type(client, monkeypatch):
+    from pathlib import Path
+    from app.core import uploads
+
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 1024)
+    response = client.post("/upload/image", files={"file": ("big.png", b"\x00" * 4096, "image/png")})
+    assert response.status_code == 413
+    assert not list(Path("uploads").glob(".upload-*"))
+
+    response = client.post("/upload/image", files={"file": ("script.exe", b"MZ", "application/octet-stream")})
+    assert response.status_code == 400
+
+
+
+def test_oversized_upload_is_rejected_before_the_body_is_read(client, monkeypatch):
+    from app.core import uploads
+    from app.routers import upload_router
+
+    async def never(*args, **kwargs):
+        raise AssertionError("route ran for an oversized upload")
+
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 1024)
+    monkeypatch.setattr(upload_router, "save_upload", never)
+    response = client.post("/upload/image", files={"file": ("big.png", b"\x00" * (64 * 1024), "image/png")})
+    assert response.status_code == 413
+
+    # No Content-Length (chunked): the running count stops the form parse.
+    boundary = "limit-test"
+    head = f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="big.png"\r\nContent-Type: image/png\r\n\r\n'.encode()
+
+    def body():
+        yield head
+        for _ in range(64):
+            yield b"\x00" * 1024
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        "/upload/image", content=body(), headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    assert response.status_code == 413
+
+def test_image_upload_generates_variants(client):
+    import io
+    from pathlib import Path
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (1000, 2000), "red").save(buffer, format="PNG")
+    response = client.post("/upload/image", files={"file": ("photo.png", buffer.getvalue(), "image/png")})
+    assert response.status_code == 200
+    body = response.json()
+    # thumbnail() bounds the longest side, so a portrait original is narrower than the nominal size.
+    assert {name: v["width"] for name, v in body["variants"].items()} == {"thumb": 160, "card": 400, "full": 800}
+    with Image.open(Path("uploads") / body["variants"]["thumb"]["url"].rsplit("/", 1)[1]) as thumb:
+        assert thumb.format == "WEBP"
+        assert thumb.size == (160, 320)
+
+    login_resp = client.post("/auth/login", json={"username": "testuser", "password": "Test@1234"})
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    blog_data = {"title": "With image", "content": "<p>img</p>", "main_image_url": body["url"]}
+    response = client.post("/blogs/", json=blog_data, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["image_variants"] == body["variants"]
+
+
+def test_duplicate_upload_is_deduplicated(client):
+    import hashlib
+    from pathlib import Path
+    from sqlalchemy import text
+    from app.database.db_connect import SessionLocal
+
+    content = b"GIF89a" + b"duplicate-bytes" * 100
+    urls = []
+    for name in ("first.gif", "second.gif"):
+        response = client.post("/upload/image", files={"file": (name, content, "image/gif")})
+        assert response.status_code == 200
+        urls.append(response.json()["url"])
+
+    sha256 = hashlib.sha256(content).hexdigest()
+    assert urls == [f"/uploads/{sha256}.gif"] * 2
+    assert len(list(Path("uploads").glob(f"{sha256}.gif"))) == 1
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            text("SELECT count(*) FROM blogapp_schema.upload_object WHERE sha256 = :sha256"),
+            {"sha256": sha256},
+        ).scalar_one()
+    finally:
+        db.close()
+    assert rows == 1
+
+
+
+def test_upload_ref_count_follows_blog_references(client):
+    import uuid
+    from sqlalchemy import text
+    from app.database.db_connect import engine
+
+    def upload(tag):
+        content = b"GIF89a" + f"refs-{tag}-{uuid.uuid4().hex}".encode()
+        return client.post("/upload/image", files={"file": ("r.gif", content, "image/gif")}).json()["url"]
+
+    def ref_count(url):
+        with engine.connect() as conn:
+            return conn.execute(
+                text("SELECT ref_count FROM blogapp_schema.upload_object WHERE filename = :f"),
+                {"f": url.rsplit("/", 1)[1]},
+            ).scalar_one()
+
+    main, sub = upload("main"), upload("sub")
+    assert (ref_count(main), ref_count(sub)) == (0, 0)
+
+    login_resp = client.post("/auth/login", json={"username": "testuser", "password": "Test@1234"})
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    # The same image as main and sub image is one reference from the post.
+    first = client.post("/blogs/", json={"title": "R1", "content": "x", "main_image_url": main, "sub_images": [main, sub]}, headers=headers).json()
+    response = client.post("/blogs/bulk", json=[{"title": "R2", "content": "x", "main_image_url": main}], headers=headers)
+    second = response.json()["results"][0]["id"]
+    assert (ref_count(main), ref_count(sub)) == (2, 1)
+
+    client.put(f"/blogs/{first['id']}", json={"main_image_url": None, "sub_images": [sub]}, headers=headers)
+    assert (ref_count(main), ref_count(sub)) == (1, 1)
+    client.put("/blogs/bulk", json=[{"id": second, "main_image_url": sub}], headers=headers)
+    assert (ref_count(main), ref_count(sub)) == (0, 2)
+
+    client.delete(f"/blogs/{first['id']}", headers=headers)
+    client.request("DELETE", "/blogs/bulk", json={"ids": [second]}, headers=headers)
+    assert (ref_count(main), ref_count(sub)) == (0, 0)
+
+    username = f"refowner_{uuid.uuid4().hex[:8]}"
+    user = client.post("/users/", json={"username": username, "email": f"{username}@example.com", "password": "Test@1234"}).json()
+    login_resp = client.post("/auth/login", json={"username": username, "password": "Test@1234"})
+    owner = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    client.post("/blogs/", json={"title": "R3", "content": "x", "main_image_url": main, "visibility": "private"}, headers=owner)
+    assert ref_count(main) == 1
+    client.delete(f"/users/{user['id']}")
+    assert ref_count(main) == 0
+
+def test_uploads_are_served_with_immutable_caching(client):
+    content = b"\x89PNG\r\n\x1a\n" + b"cache-me" * 64
+    url = client.post("/upload/image", files={"file": ("cached.png", content, "image/png")}).json()["url"]
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.content == content
+    assert "immutable" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+    assert etag == f'"{url.rsplit("/", 1)[1].rsplit(".", 1)[0]}"'
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.get(url, headers={"Range": "bytes=0-7"})
+    assert response.status_code == 206
+    assert response.content == content[:8]
+
+
+def test_variant_urls_wait_for_generation_to_finish(tmp_path):
+    from PIL import Image
+    from app.core.images import make_variants, manifest_filename, variant_filename, variant_urls
+
+    Image.new("RGB", (200, 100), "blue").save(tmp_path / "small.png")
+    # A variant on disk from a build that is still running isn't listed yet.
+    Image.new("RGB", (200, 100), "blue").save(tmp_path / variant_filename("small.png", "thumb"), format="WEBP")
+    assert variant_urls("/uploads/small.png", tmp_path) == {}
+
+    make_variants(str(tmp_path / "small.png"))
+    assert (tmp_path / manifest_filename("small.png")).exists()
+    # Originals are never upscaled.
+    assert variant_urls("/uploads/small.png", tmp_path) == {
+        name: {"url": f"/uploads/{variant_filename('small.png', name)}", "width": 200} for name in ("thumb", "card", "full")
+    }
@@ -0,0 +1,4 @@
+-- Supports keyset pagination on GET /blogs?cursor=...
+-- (ORDER BY created_at DESC, id DESC with a (created_at, id) < (...) seek).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_blog_created_at_id
+    ON blogapp_schema.blog (created_at, id);
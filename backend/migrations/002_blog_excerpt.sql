@@ -0,0 +1,10 @@
+-- Precomputed plain-text excerpt served by the GET /blogs feed instead of the
+-- full HTML body. New rows get it from blog_service; this backfills old rows.
+ALTER TABLE blogapp_schema.blog ADD COLUMN IF NOT EXISTS excerpt TEXT;
+
+UPDATE blogapp_schema.blog
+SET excerpt = left(
+    btrim(regexp_replace(regexp_replace(content, '<[^>]+>', ' ', 'g'), '\s+', ' ', 'g')),
+    200
+)
+WHERE excerpt IS NULL;
@@ -0,0 +1,4 @@
+-- Embedded in access tokens as the `ver` claim; bumping it revokes every
+-- token issued for the user.
+ALTER TABLE blogapp_schema.users
+    ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
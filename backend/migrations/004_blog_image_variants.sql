@@ -0,0 +1,4 @@
+-- Resized WebP derivatives of main_image_url (thumb/card/full -> URL),
+-- produced by app.core.images after upload.
+ALTER TABLE blogapp_schema.blog
+    ADD COLUMN IF NOT EXISTS image_variants JSONB NOT NULL DEFAULT '{}'::jsonb;
@@ -0,0 +1,12 @@
+-- One row per content-addressed file under /uploads (<sha256>.<ext>).
+-- ref_count is the number of live blogs whose main or sub images point at
+-- the file; blog_service maintains it on every create, update and delete.
+CREATE TABLE IF NOT EXISTS blogapp_schema.upload_object (
+    filename    VARCHAR PRIMARY KEY,
+    sha256      VARCHAR(64) NOT NULL,
+    size_bytes  BIGINT NOT NULL,
+    ref_count   INTEGER NOT NULL DEFAULT 0,
+    created_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_blogapp_schema_upload_object_sha256
+    ON blogapp_schema.upload_object (sha256);
@@ -0,0 +1,8 @@
+-- Row version for ETag / Last-Modified on GET /blogs and GET /blogs/{id}.
+-- The ORM bumps it on every UPDATE (onupdate=now()).
+ALTER TABLE blogapp_schema.blog
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ;
+UPDATE blogapp_schema.blog SET updated_at = created_at WHERE updated_at IS NULL;
+ALTER TABLE blogapp_schema.blog
+    ALTER COLUMN updated_at SET DEFAULT now(),
+    ALTER COLUMN updated_at SET NOT NULL;
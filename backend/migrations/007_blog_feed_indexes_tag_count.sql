@@ -0,0 +1,20 @@
+-- Indexes behind the GET /blogs filters, and the per-tag counts behind GET /tags.
+CREATE INDEX IF NOT EXISTS ix_blog_feed
+    ON blogapp_schema.blog (is_deleted, visibility, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_blog_tags_gin
+    ON blogapp_schema.blog USING gin (tags);
+
+CREATE TABLE IF NOT EXISTS blogapp_schema.tag_count (
+    tag    TEXT PRIMARY KEY,
+    count  INTEGER NOT NULL DEFAULT 0
+);
+
+-- Backfill from existing public posts; blog_service maintains it from here on.
+INSERT INTO blogapp_schema.tag_count (tag, count)
+SELECT t.tag, count(DISTINCT b.id)
+FROM blogapp_schema.blog b, unnest(b.tags) AS t(tag)
+WHERE NOT b.is_deleted AND b.visibility = 'public'
+GROUP BY t.tag
+ON CONFLICT (tag) DO UPDATE SET count = EXCLUDED.count;
+
+ANALYZE blogapp_schema.blog;
@@ -0,0 +1,9 @@
+-- Full-text search for GET /blogs/search. Must match SEARCH_VECTOR_SQL in
+-- app/models/blog.py: title weighted A, tag-stripped content weighted B.
+ALTER TABLE blogapp_schema.blog
+    ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', regexp_replace(coalesce(content, ''), '<[^>]+>', ' ', 'g')), 'B')
+    ) STORED;
+CREATE INDEX IF NOT EXISTS ix_blog_search_vector
+    ON blogapp_schema.blog USING gin (search_vector);
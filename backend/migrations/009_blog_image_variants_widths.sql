@@ -0,0 +1,9 @@
+-- image_variants values are now {"url", "width"} with the width actually
+-- written. Drop the old name -> URL maps; they carry no widths, and the
+-- clients fall back to main_image_url until the blog's image is saved again.
+UPDATE blogapp_schema.blog
+SET image_variants = '{}'::jsonb
+WHERE EXISTS (
+    SELECT 1 FROM jsonb_each(image_variants) AS v
+    WHERE jsonb_typeof(v.value) = 'string'
+);
@@ -0,0 +1,90 @@
+"""Recall and latency of the local vector store: IVF at several nprobe values vs exact search.
+
+Fills a throwaway LocalVectorStore with clustered unit vectors (blog-like:
+many chunks near a few topics), then for a set of held-out queries compares
+the IVF top-k against the exact top-k and prints recall@k with p50/p95
+query latency. A filtered (blog_id) query is timed too.
+
+    python bench_vector_store.py --vectors 100000 --queries 200 --nprobe 4 8 16 32
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from vector_store import LocalVectorStore
+
+
+def clustered_vectors(n: int, dimension: int, topics: int, noise: float, rng) -> np.ndarray:
+    centers = rng.standard_normal((topics, dimension)).astype(np.float32)
+    vectors = centers[rng.integers(topics, size=n)] + noise * rng.standard_normal((n, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def percentile_ms(samples: list[float], pct: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * pct))] * 1000
+
+
+def run(n: int, dimension: int, queries: int, top_k: int, nprobes: list[int], topics: int, noise: float):
+    rng = np.random.default_rng(7)
+    vectors = clustered_vectors(n + queries, dimension, topics, noise, rng)
+    with tempfile.TemporaryDirectory() as directory:
+        store = LocalVectorStore(Path(directory), dimension=dimension, ivf_min_vectors=0)
+        start = time.perf_counter()
+        for i in range(0, n, 1000):
+            store.upsert([
+                {"id": f"v{j}", "values": vectors[j], "metadata": {"blog_id": str(j // 20), "text": ""}}
+                for j in range(i, min(n, i + 1000))
+            ])
+        print(f"loaded {n} x {dimension} in {time.perf_counter() - start:.1f}s")
+
+        probes = vectors[n:]
+        exact, exact_times = [], []
+        for q in probes:
+            t = time.perf_counter()
+            exact.append({m["id"] for m in store.query(q, top_k, exact=True)})
+            exact_times.append(time.perf_counter() - t)
+
+        # Background builds ran while loading; time a fresh one over the full store.
+        store.wait_for_index()
+        store._centroids = None
+        start = time.perf_counter()
+        store.wait_for_index()
+        print(f"IVF build {time.perf_counter() - start:.1f}s, {len(store._centroids)} lists")
+
+        print(f"{'search':>10} {'recall@' + str(top_k):>10} {'p50 ms':>8} {'p95 ms':>8}")
+        print(f"{'exact':>10} {1.0:>10.3f} {statistics.median(exact_times) * 1000:>8.2f} {percentile_ms(exact_times, 0.95):>8.2f}")
+        for nprobe in nprobes:
+            store.nprobe = nprobe
+            hits, times = 0, []
+            for q, truth in zip(probes, exact):
+                t = time.perf_counter()
+                found = {m["id"] for m in store.query(q, top_k)}
+                times.append(time.perf_counter() - t)
+                hits += len(found & truth)
+            print(f"{'ivf/' + str(nprobe):>10} {hits / (len(probes) * top_k):>10.3f} "
+                  f"{statistics.median(times) * 1000:>8.2f} {percentile_ms(times, 0.95):>8.2f}")
+
+        times = []
+        for i, q in enumerate(probes):
+            t = time.perf_counter()
+            store.query(q, top_k, blog_id=str(i % (n // 20)))
+            times.append(time.perf_counter() - t)
+        print(f"{'blog_id':>10} {'-':>10} {statistics.median(times) * 1000:>8.2f} {percentile_ms(times, 0.95):>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--topics", type=int, default=500)
+    # Spread around each topic; higher makes neighbours cross list boundaries more often.
+    parser.add_argument("--noise", type=float, default=1.5)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    args = parser.parse_args()
+    run(args.vectors, args.dimension, args.queries, args.top_k, args.nprobe, args.topics, args.noise)
@@ -1,20 +1,29 @@
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 import google.generativeai as genai
 
 load_dotenv()
 
+# Shared infrastructure (engine factory, etc.) lives in the backend package.
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+from app.core.logger import get_logger
+
+# Same queue-backed JSON logging as the backend, under blog_app_logger.handle_llm.
+logger = get_logger("handle_llm")
+
 UPLOAD_DIR = Path("../backend/uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
-ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp", "svg"}
 
 try:
     genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
     gemini_model = genai.GenerativeModel("gemini-1.5-flash")
-    print("✅ Gemini configured for image generation")
+    logger.info({"event": "gemini_image_configured"})
 except Exception as e:
-    print(f"⚠️ Gemini image generation setup failed: {e}")
+    logger.warning({"event": "gemini_image_config_failed", "error": str(e)})
     gemini_model = None
 
 MODELS = ["turbo", "flux", "kontext"]
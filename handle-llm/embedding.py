@@ -0,0 +1,166 @@
+import hashlib
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from config import logger
+from embedding_cache import EMBED_CACHE_CAPACITY, EmbeddingCache, cache_key
+from metrics import embed_batch_size, llm_call_errors, llm_retries, timed_call
+
+EMBEDDING_MODEL = "text-embedding-004"
+EMBEDDING_DIMENSION = 768
+# embed_content accepts up to 100 inputs per request.
+EMBED_BATCH_SIZE = min(int(os.getenv("EMBED_BATCH_SIZE", "50")), 100)
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "4"))
+EMBED_BACKOFF_SECONDS = float(os.getenv("EMBED_BACKOFF_SECONDS", "0.5"))
+# "gemini" in production; "fake" gives deterministic offline vectors.
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "gemini")
+MAX_EMBED_CHARS = 8000
+
+
+class GeminiEmbeddingBackend:
+    """Multi-input embed_content calls against the Gemini API."""
+
+    def __init__(self, client, model: str = EMBEDDING_MODEL):
+        self.client = client
+        self.model = model
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        response = self.client.models.embed_content(model=self.model, contents=texts)
+        return [embedding.values for embedding in response.embeddings]
+
+
+class FakeEmbeddingBackend:
+    """Deterministic unit vectors derived from the text hash, for tests and offline runs.
+
+    `latency` simulates the per-request round trip; `fail_every` makes every
+    Nth call raise so retry paths can be exercised.
+    """
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION, latency: float = 0.0, fail_every: int = 0):
+        self.model = "fake"
+        self.dimension = dimension
+        self.latency = latency
+        self.fail_every = fail_every
+        self.calls = 0
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_every and self.calls % self.fail_every == 0:
+            raise RuntimeError("fake embedding failure")
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+            vectors.append((vector / np.linalg.norm(vector)).tolist())
+        return vectors
+
+
+def make_backend(gemini_client):
+    if EMBED_BACKEND == "fake":
+        return FakeEmbeddingBackend()
+    return GeminiEmbeddingBackend(gemini_client)
+
+
+def make_cache() -> Optional[EmbeddingCache]:
+    return EmbeddingCache(dimension=EMBEDDING_DIMENSION) if EMBED_CACHE_CAPACITY > 0 else None
+
+
+class BatchEmbedder:
+    """Groups texts into multi-input embedding calls and keeps a bounded number in flight.
+
+    Each batch is retried with exponential backoff and jitter; a batch that
+    still fails after `max_retries` is reported back as failed instead of
+    stopping the whole run. With a `cache`, only texts it hasn't seen for
+    this model reach the backend.
+    """
+
+    def __init__(self, backend, batch_size: int = EMBED_BATCH_SIZE, concurrency: int = EMBED_CONCURRENCY,
+                 max_retries: int = EMBED_MAX_RETRIES, backoff: float = EMBED_BACKOFF_SECONDS,
+                 cache: Optional[EmbeddingCache] = None):
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embed")
+
+    def embed_batch(self, texts: list[str], kind: str = "chunk") -> list[list[float]]:
+        texts = [text.strip()[:MAX_EMBED_CHARS] for text in texts]
+        if not self.cache:
+            return self.call_backend(texts)
+        keys = [cache_key(self.backend.model, text) for text in texts]
+        found = self.cache.get_many(keys, kind)
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        if missing:
+            vectors = self.call_backend([texts[i] for i in missing])
+            self.cache.put_many([keys[i] for i in missing], vectors)
+            found.update(zip((keys[i] for i in missing), vectors))
+        return [found[key] for key in keys]
+
+    def call_backend(self, texts: list[str]) -> list[list[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                with timed_call("embed", self.backend.model):
+                    vectors = self.backend.embed(texts)
+                embed_batch_size.observe(len(texts))
+                return vectors
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                llm_retries.labels("embed", self.backend.model).inc()
+                logger.warning({"event": "embed_batch_retry", "attempt": attempt + 1, "size": len(texts),
+                                "delay_s": round(delay, 2), "error": str(e)})
+                time.sleep(delay)
+
+    def embed_one(self, text: str) -> list[float]:
+        return self.embed_batch([text], kind="query")[0]
+
+    def embed_batches(self, items: Iterable[dict], key: str = "text") -> Iterator[tuple[list[dict], Optional[list]]]:
+        """Yield (batch, vectors) as batches finish; vectors is None for a batch that failed.
+
+        `items` is consumed lazily, so callers can stream chunks in while
+        earlier batches are still embedding.
+        """
+        pending = {}
+
+        def drain(return_when):
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                batch = pending.pop(future)
+                try:
+                    yield batch, future.result()
+                except Exception as e:
+                    llm_call_errors.labels("embed_batch", self.backend.model).inc()
+                    logger.error({"event": "embed_batch_failed", "size": len(batch), "error": str(e)})
+                    yield batch, None
+
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == self.batch_size:
+                if len(pending) >= self.concurrency:
+                    yield from drain(FIRST_COMPLETED)
+                pending[self._executor.submit(self.embed_batch, [i[key] for i in batch])] = batch
+                batch = []
+        if batch:
+            pending[self._executor.submit(self.embed_batch, [i[key] for i in batch])] = batch
+        while pending:
+            yield from drain(FIRST_COMPLETED)
+
+    def flush(self):
+        if self.cache:
+            self.cache.flush()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.flush()
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from metrics import embedding_cache_hits, embedding_cache_misses, embedding_cache_size
+
+EMBED_CACHE_DIR = Path(os.getenv("EMBED_CACHE_DIR", Path(__file__).resolve().parent / "embedding_cache"))
+# Vectors kept on disk (768 float32 = 3 KiB each); 0 disables the cache.
+EMBED_CACHE_CAPACITY = int(os.getenv("EMBED_CACHE_CAPACITY", "50000"))
+# cache_key() is 32 hex digits; each row stores the raw 16 bytes it was written for.
+KEY_BYTES = 16
+# Stored while a row's vector is being replaced, so a half-written row never matches.
+NO_KEY = bytes(KEY_BYTES)
+
+
+def cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()[:32]
+
+
+class EmbeddingCache:
+    """Embeddings keyed by (model, text hash) in a memory-mapped float32 matrix.
+
+    `vectors.f32` holds `capacity` rows and `keys.bin` the key each row
+    was written for; `index.json` maps keys to rows in LRU order and is
+    rewritten on flush(). When full, the least recently used row is
+    overwritten. A read only counts as a hit if the row's stored key
+    matches, so an index persisted before a row was reused (a crash
+    between eviction and flush) can't serve another text's vector.
+    Losing or mismatching the index just empties the cache.
+    """
+
+    def __init__(self, directory: Path = EMBED_CACHE_DIR, dimension: int = 768, capacity: int = EMBED_CACHE_CAPACITY):
+        self.directory = directory
+        self.dimension = dimension
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._free = []
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+        directory.mkdir(parents=True, exist_ok=True)
+        vectors_path = directory / "vectors.f32"
+        keys_path = directory / "keys.bin"
+        index = self._load_index()
+        fresh = index is None or not vectors_path.exists() or not keys_path.exists()
+        mode = "w+" if fresh else "r+"
+        self._vectors = np.memmap(vectors_path, dtype=np.float32, mode=mode, shape=(capacity, dimension))
+        self._keys = np.memmap(keys_path, dtype=np.uint8, mode=mode, shape=(capacity, KEY_BYTES))
+        if not fresh:
+            self._slots.update((key, slot) for key, slot in index["slots"])
+        used = set(self._slots.values())
+        self._free = [slot for slot in range(capacity - 1, -1, -1) if slot not in used]
+        embedding_cache_size.set(len(self._slots))
+
+    def _load_index(self) -> Optional[dict]:
+        try:
+            index = json.loads((self.directory / "index.json").read_text())
+        except (OSError, ValueError):
+            return None
+        if index.get("dimension") != self.dimension or index.get("capacity") != self.capacity:
+            return None
+        return index
+
+    def get_many(self, keys: list[str], kind: str = "chunk") -> dict[str, list[float]]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                slot = self._slots.get(key)
+                if slot is None:
+                    continue
+                if self._keys[slot].tobytes() != bytes.fromhex(key):
+                    # The row was reused after the loaded index was written.
+                    del self._slots[key]
+                    self._free.append(slot)
+                    self._dirty = True
+                    continue
+                self._slots.move_to_end(key)
+                found[key] = self._vectors[slot].tolist()
+            self._dirty = self._dirty or bool(found)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        embedding_cache_hits.labels(kind).inc(len(found))
+        embedding_cache_misses.labels(kind).inc(len(keys) - len(found))
+        return found
+
+    def put_many(self, keys: list[str], vectors: list[list[float]]):
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                slot = self._slots.get(key)
+                if slot is None:
+                    if self._free:
+                        slot = self._free.pop()
+                    else:
+                        _, slot = self._slots.popitem(last=False)
+                self._slots[key] = slot
+                self._slots.move_to_end(key)
+                self._keys[slot] = np.frombuffer(NO_KEY, dtype=np.uint8)
+                self._vectors[slot] = vector
+                self._keys[slot] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+            self._dirty = True
+            size = len(self._slots)
+        embedding_cache_size.set(size)
+
+    def flush(self):
+        """Persist vectors and the LRU index; the index is replaced atomically."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._vectors.flush()
+            self._keys.flush()
+            index = {"dimension": self.dimension, "capacity": self.capacity, "slots": list(self._slots.items())}
+            self._dirty = False
+        tmp = self.directory / "index.json.part"
+        tmp.write_text(json.dumps(index))
+        os.replace(tmp, self.directory / "index.json")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._slots),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
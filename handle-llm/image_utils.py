@@ -3,9 +3,11 @@ import urllib.parse
 import requests
 import json
 import re
-from uuid import uuid4
 from fastapi import HTTPException
-from config import gemini_model, UPLOAD_DIR, MODELS
+from config import gemini_model, logger, UPLOAD_DIR, MODELS
+from metrics import llm_call_errors, llm_retries, timed_call
+from app.core.images import submit_variants
+from app.core.uploads import StoredUpload, store_bytes
 
 def make_pollinations_prompt(user_input: str) -> tuple[str, str]:
     if not gemini_model:
@@ -24,11 +26,12 @@ def make_pollinations_prompt(user_input: str) -> tuple[str, str]:
     """
 
     try:
-        response = gemini_model.generate_content(
-            system_instruction + f"\nUser description: {user_input}"
-        )
+        with timed_call("prompt", "gemini-1.5-flash"):
+            response = gemini_model.generate_content(
+                system_instruction + f"\nUser description: {user_input}"
+            )
         raw_text = response.text.strip()
-        print("🔎 Gemini raw output:", raw_text)
+        logger.debug({"event": "gemini_prompt_output", "raw": raw_text})
 
         try:
             result = json.loads(raw_text)
@@ -41,35 +44,38 @@ def make_pollinations_prompt(user_input: str) -> tuple[str, str]:
                 if "summary" in result and "prompt" in result:
                     return result["summary"], result["prompt"]
 
-        print("Gemini failed to produce JSON, falling back to raw input.")
+        logger.warning({"event": "gemini_prompt_fallback", "reason": "no_json"})
         return user_input[:50], user_input
 
     except Exception as e:
-        print(f"Gemini error: {e}, falling back to raw input.")
+        logger.warning({"event": "gemini_prompt_fallback", "reason": "error", "error": str(e)})
         return user_input[:50], user_input
 
-def generate_image(prompt: str, width: int, height: int, seed: int, retries: int = 5) -> str:
+def generate_image(prompt: str, width: int, height: int, seed: int, retries: int = 5) -> StoredUpload:
     """Try Pollinations models in order, retrying each if needed."""
     encoded_prompt = urllib.parse.quote(prompt)
 
     for model in MODELS:
         url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?model={model}&width={width}&height={height}&seed={seed}"
-        print(f"🔄 Trying model: {model} -> {url}")
+        logger.info({"event": "image_model_try", "model": model})
 
         for attempt in range(retries):
+            if attempt:
+                llm_retries.labels("image", model).inc()
             try:
-                resp = requests.get(url, timeout=30)
+                with timed_call("image", model):
+                    resp = requests.get(url, timeout=30)
                 if resp.status_code == 200 and resp.headers.get("content-type", "").startswith("image"):
-                    filename = f"{uuid4().hex}_{model}.webp"
-                    filepath = UPLOAD_DIR / filename
-                    with open(filepath, "wb") as f:
-                        f.write(resp.content)
-                    print(f"✅ Success with {model}, saved {filepath}")
-                    return f"/uploads/{filename}"
+                    # Same prompt + seed yields the same bytes; store_bytes skips the rewrite.
+                    stored = store_bytes(resp.content, "webp", UPLOAD_DIR)
+                    logger.info({"event": "image_generated", "model": model, "file": stored.filename, "created": stored.created})
+                    submit_variants(UPLOAD_DIR, stored.filename)
+                    return stored
                 else:
-                    print(f"⚠️ {model} returned non-image, retrying ({attempt+1}/{retries})...")
+                    llm_call_errors.labels("image", model).inc()
+                    logger.warning({"event": "image_model_retry", "model": model, "attempt": attempt + 1, "retries": retries, "status_code": resp.status_code})
             except Exception as e:
-                print(f"❌ {model} error: {e}, retrying ({attempt+1}/{retries})...")
+                logger.warning({"event": "image_model_retry", "model": model, "attempt": attempt + 1, "retries": retries, "error": str(e)})
             time.sleep(2)
 
     raise HTTPException(status_code=500, detail="All Pollinations models failed.")
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+# What has been embedded into the vector index, so indexing runs only touch
+# what changed. Losing this file just means the next sync re-embeds everything.
+INDEX_STATE_PATH = Path(os.getenv("INDEX_STATE_PATH", Path(__file__).resolve().parent / "index_state.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS blog_state (
+    blog_id TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS chunk_state (
+    vector_id TEXT PRIMARY KEY,
+    blog_id TEXT NOT NULL,
+    chunk_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_chunk_state_blog ON chunk_state (blog_id);
+"""
+
+
+def text_hash(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IndexState:
+    """Content hashes per blog and per chunk, plus the sync high-water mark, in SQLite."""
+
+    def __init__(self, path: Path = INDEX_STATE_PATH, index_name: str = ""):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        if index_name and self.get_meta("index_name") not in (None, index_name):
+            # State describes a different vector index; start over.
+            self.reset()
+        if index_name:
+            self.set_meta("index_name", index_name)
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def high_water_mark(self) -> tuple[Optional[str], str]:
+        """(updated_at, blog_id) of the last blog a sync finished, or (None, "") before the first."""
+        return self.get_meta("hwm_updated_at"), self.get_meta("hwm_blog_id") or ""
+
+    def set_high_water_mark(self, updated_at: str, blog_id: str):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [("hwm_updated_at", updated_at), ("hwm_blog_id", blog_id)],
+            )
+
+    def blog_hash(self, blog_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT content_hash FROM blog_state WHERE blog_id = ?", (blog_id,)).fetchone()
+        return row[0] if row else None
+
+    def chunk_hashes(self, blog_id: str) -> dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT vector_id, chunk_hash FROM chunk_state WHERE blog_id = ?", (blog_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def pending_blogs(self) -> list[str]:
+        """Blogs saved with an empty hash because some of their chunks failed to index."""
+        with self._lock:
+            rows = self._conn.execute("SELECT blog_id FROM blog_state WHERE content_hash = ''").fetchall()
+        return [row[0] for row in rows]
+
+    def save_blog(self, blog_id: str, content_hash: str, updated_at: Optional[str], chunks: dict[str, str]):
+        """Replace a blog's recorded chunks with `chunks` (vector id -> chunk hash)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunk_state WHERE blog_id = ?", (blog_id,))
+            self._conn.executemany(
+                "INSERT INTO chunk_state (vector_id, blog_id, chunk_hash) VALUES (?, ?, ?)",
+                [(vector_id, blog_id, chunk_hash) for vector_id, chunk_hash in chunks.items()],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blog_state (blog_id, content_hash, updated_at) VALUES (?, ?, ?)",
+                (blog_id, content_hash, updated_at),
+            )
+
+    def forget_blog(self, blog_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunk_state WHERE blog_id = ?", (blog_id,))
+            self._conn.execute("DELETE FROM blog_state WHERE blog_id = ?", (blog_id,))
+
+    def reset(self):
+        with self._lock, self._conn:
+            for table in ("chunk_state", "blog_state", "meta"):
+                self._conn.execute(f"DELETE FROM {table}")
+
+    def counts(self) -> dict:
+        with self._lock:
+            blogs = self._conn.execute("SELECT count(*) FROM blog_state").fetchone()[0]
+            chunks = self._conn.execute("SELECT count(*) FROM chunk_state").fetchone()[0]
+        return {"blogs": blogs, "chunks": chunks}
+
+    def close(self):
+        self._conn.close()
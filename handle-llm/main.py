@@ -1,6 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from config import logger
+from app.core.metrics import metrics_response
+from app.middleware.logging_middleware import LoggingMiddleware
+from app.middleware.upload_limit_middleware import UploadLimitMiddleware
 from services import ServiceManager
 from routes import router, set_service_manager
 
@@ -9,6 +13,9 @@ import uvicorn
 
 app = FastAPI(title="Combined RAG + Image API", version="1.0.0")
 
+# Same upload size guard as the backend, inside CORS.
+app.add_middleware(UploadLimitMiddleware, paths={"/upload"})
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "*"],
@@ -16,26 +23,32 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, like the backend: shared trace ids and sampled access log.
+app.add_middleware(LoggingMiddleware)
 
 service_manager = ServiceManager()
 set_service_manager(service_manager)
 
 app.include_router(router)
 
+# Request/DB metrics from the shared backend modules, plus metrics.py's LLM and vector store series.
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return metrics_response()
+
 
 # Startup and shutdown events
 @app.on_event("startup")
 async def startup():
-    print("🚀 FastAPI server starting...")
+    logger.info({"event": "startup"})
     try:
         success = service_manager.initialize_all()
         if success:
-            print("✅ All services ready!")
+            logger.info({"event": "services_ready"})
         else:
-            print("⚠️ Some services failed to initialize - continuing with limited functionality")
+            logger.warning({"event": "services_degraded"})
     except Exception as e:
-        print(f"⚠️ Service initialization error: {e}")
-        print("Continuing with basic server functionality...")
+        logger.exception({"event": "services_init_error", "error": str(e)})
 
 @app.on_event("shutdown") 
 async def shutdown():
@@ -43,6 +56,6 @@ async def shutdown():
 
 if __name__ == "__main__":
     
-    print("🚀 Starting server on port 8005...")
+    logger.info({"event": "server_start", "port": 8005})
     uvicorn.run("main:app", host="0.0.0.0", port=8005, reload=True)
-    print("Server stopped.")
\ No newline at end of file
+    logger.info({"event": "server_stop"})
\ No newline at end of file
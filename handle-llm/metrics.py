@@ -0,0 +1,90 @@
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Seconds; model calls run from tens of ms (embeddings) to tens of seconds (image generation).
+CALL_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+BATCH_BUCKETS = (1, 5, 10, 25, 50, 100, 200)
+# The local store answers in well under a millisecond; Pinecone is a network hop.
+VECTOR_STORE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+llm_call_seconds = Histogram(
+    "llm_call_duration_seconds",
+    "Latency of embedding, generation and image model calls.",
+    ["kind", "model"],
+    buckets=CALL_BUCKETS,
+)
+llm_call_errors = Counter(
+    "llm_call_errors_total",
+    "Model calls that raised or returned an unusable result.",
+    ["kind", "model"],
+)
+llm_first_token_seconds = Histogram(
+    "llm_first_token_seconds",
+    "Time from a streamed query arriving to its first generated token, retrieval included.",
+    ["model"],
+    buckets=CALL_BUCKETS,
+)
+llm_retries = Counter(
+    "llm_retries_total",
+    "Model calls retried after a failure.",
+    ["kind", "model"],
+)
+embed_batch_size = Histogram(
+    "embed_batch_size",
+    "Texts per embed_content request.",
+    buckets=BATCH_BUCKETS,
+)
+embedding_cache_hits = Counter(
+    "embedding_cache_hits_total",
+    "Embeddings served from the on-disk cache.",
+    ["kind"],
+)
+embedding_cache_misses = Counter(
+    "embedding_cache_misses_total",
+    "Embedding lookups that had to call the model.",
+    ["kind"],
+)
+embedding_cache_size = Gauge(
+    "embedding_cache_entries",
+    "Vectors held in the embedding cache.",
+)
+indexed_chunks = Counter(
+    "indexed_chunks_total",
+    "Chunks embedded and upserted by indexing runs.",
+)
+vector_store_call_seconds = Histogram(
+    "vector_store_call_duration_seconds",
+    "Latency of vector store query/upsert/delete calls (Pinecone or local).",
+    ["backend", "operation"],
+    buckets=VECTOR_STORE_BUCKETS,
+)
+vector_store_upsert_batch_size = Histogram(
+    "vector_store_upsert_batch_size",
+    "Vectors per upsert call.",
+    ["backend"],
+    buckets=BATCH_BUCKETS,
+)
+
+
+@contextmanager
+def timed_call(kind: str, model: str):
+    """Time a model call into llm_call_seconds; count it in llm_call_errors if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        llm_call_errors.labels(kind, model).inc()
+        raise
+    finally:
+        llm_call_seconds.labels(kind, model).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def timed_vector_store(backend: str, operation: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        vector_store_call_seconds.labels(backend, operation).observe(time.perf_counter() - start)
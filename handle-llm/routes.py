@@ -1,11 +1,15 @@
+import json
 import time
-from uuid import uuid4
 from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from models import *
 from image_utils import make_pollinations_prompt, generate_image
-from config import UPLOAD_DIR, ALLOWED_EXTENSIONS
+from config import UPLOAD_DIR
+from app.core.uploads import save_upload
+from app.core.images import generate_variants
+from app.database.engine_factory import pool_metrics
 
 router = APIRouter()
 service_manager = None
@@ -14,6 +18,9 @@ def set_service_manager(sm):
     global service_manager
     service_manager = sm
 
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @router.get("/")
 async def root():
     return {
@@ -24,7 +31,7 @@ async def root():
         "index_populated": service_manager.index_populated if service_manager else False,
         "endpoints": {
             "health": "/health",
-            "rag": ["/index", "/query"],
+            "rag": ["/index", "/query", "/query/stream"],
             "images": ["/generate", "/upload"],
             "docs": "/docs"
         }
@@ -44,13 +51,13 @@ async def health_check():
         return HealthResponse(status="error", database=False, pinecone=False, gemini=False)
     
     db_ok = service_manager.test_database()
-    pinecone_ok = service_manager.test_pinecone()
+    vector_store_ok = service_manager.test_vector_store()
     gemini_ok = service_manager.test_gemini()
     
     return HealthResponse(
-        status="healthy" if all([db_ok, pinecone_ok, gemini_ok]) else "degraded",
+        status="healthy" if all([db_ok, vector_store_ok, gemini_ok]) else "degraded",
         database=db_ok,
-        pinecone=pinecone_ok,
+        pinecone=vector_store_ok,
         gemini=gemini_ok
     )
 
@@ -60,16 +67,24 @@ async def index_status():
         return {"status": "services_not_ready"}
     
     try:
-        index = service_manager.pinecone_client.Index(service_manager.index_name)
-        stats = index.describe_index_stats()
         return {
             "status": "ready",
-            "total_vectors": stats.get('total_vector_count', 0),
+            "backend": service_manager.vector_store.backend,
+            "total_vectors": service_manager.vector_store.count(),
             "index_populated": service_manager.index_populated
         }
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
+@router.get("/pool-status")
+async def pool_status():
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+
+@router.get("/embedding-cache")
+async def embedding_cache_status():
+    cache = service_manager.embedder.cache if service_manager and service_manager.embedder else None
+    return cache.stats() if cache else {"enabled": False}
+
 @router.post("/index")
 async def index_blogs(request: IndexRequest):
     if not service_manager or not service_manager.services_initialized:
@@ -86,7 +101,11 @@ async def index_blogs(request: IndexRequest):
         return {
             "message": "Indexing completed",
             "blogs_processed": result["blogs_count"],
+            "blogs_changed": result["changed_blogs"],
+            "blogs_removed": result["deleted_blogs"],
             "chunks_created": result["chunks_count"],
+            "chunks_unchanged": result["skipped_chunks"],
+            "chunks_per_second": result.get("chunks_per_second", 0.0),
             "processing_time": round(processing_time, 2)
         }
     except Exception as e:
@@ -110,16 +129,44 @@ async def query_rag(request: QueryRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
 
+@router.post("/query/stream")
+async def query_rag_stream(request: QueryRequest):
+    """Server-sent events: `sources` once retrieval is done, `token` per generated chunk, then `done` or `error`."""
+    if not service_manager or not service_manager.services_initialized:
+        raise HTTPException(status_code=503, detail="Services not initialized")
+
+    events = service_manager.stream_query(request.query, request.top_k)
+    try:
+        # Retrieval runs here, so a failure still gets a normal error response.
+        first = await run_in_threadpool(next, events)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
+
+    def body():
+        yield sse_event(*first)
+        for event in events:
+            yield sse_event(*event)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        # Keep proxies (nginx) from buffering the stream.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.post("/generate", response_model=PromptResponse)
 async def generate(req: PromptRequest):
     try:
         summary, pollinations_prompt = make_pollinations_prompt(req.user_input)
-        image_file = generate_image(
+        stored = generate_image(
             prompt=pollinations_prompt,
             width=req.width,
             height=req.height,
             seed=req.seed
         )
+        if service_manager:
+            await run_in_threadpool(service_manager.record_upload, stored)
+        image_file = f"/uploads/{stored.filename}"
         return PromptResponse(
             summary=summary,
             image_file=image_file,
@@ -131,21 +178,13 @@ async def generate(req: PromptRequest):
 @router.post("/upload")
 async def upload_file(file: UploadFile = File(...)):
     try:
-        if not file.filename or "." not in file.filename:
-            raise HTTPException(status_code=400, detail="Invalid file")
-
-        file_extension = file.filename.rsplit(".", 1)[1].lower()
-        if file_extension not in ALLOWED_EXTENSIONS:
-            raise HTTPException(status_code=400, detail="Invalid file type")
-
-        unique_filename = f"{uuid4()}.{file_extension}"
-        file_path = UPLOAD_DIR / unique_filename
-
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-
-        return JSONResponse(content={"url": f"/uploads/{unique_filename}"})
+        stored = await save_upload(file, UPLOAD_DIR)
+        if service_manager:
+            await run_in_threadpool(service_manager.record_upload, stored)
+        variants = await generate_variants(UPLOAD_DIR, stored.filename)
+        return JSONResponse(content={"url": f"/uploads/{stored.filename}", "variants": variants})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
     
@@ -186,26 +225,21 @@ async def delete_blog_from_index(blog_id: str):
 
 @router.post("/refresh-index")
 async def refresh_entire_index():
-    """Refresh the entire RAG index (re-index all blogs)."""
+    """Wipe and rebuild the RAG index. Maintenance only: /index syncs changes incrementally."""
     if not service_manager or not service_manager.services_initialized:
         raise HTTPException(status_code=503, detail="Services not initialized")
     
     try:
         start_time = time.time()
 
-        index = service_manager.pinecone_client.Index(service_manager.index_name)
-        index.delete(delete_all=True)
-        print("🗑️ Cleared entire index")
-
-        time.sleep(5)
-
-        result = service_manager.index_blogs(limit=100, chunk_size=1000)
+        result = service_manager.rebuild_index(limit=100, chunk_size=1000)
         processing_time = time.time() - start_time
         
         return {
             "message": "Index refreshed successfully",
             "blogs_processed": result["blogs_count"],
             "chunks_created": result["chunks_count"],
+            "chunks_per_second": result.get("chunks_per_second", 0.0),
             "processing_time": round(processing_time, 2)
         }
     except Exception as e:
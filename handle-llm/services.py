@@ -1,95 +1,135 @@
 import os
 import time
-import sqlalchemy
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
 from sqlalchemy import text
-from pinecone import Pinecone, ServerlessSpec
 from google import genai as genai_client
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from config import get_database_url
+from config import get_database_url, logger
+from app.database.engine_factory import build_engine
+from app.core.uploads import record_upload
+from embedding import EMBEDDING_DIMENSION, BatchEmbedder, make_backend, make_cache
+from index_state import IndexState, text_hash
+from metrics import indexed_chunks, llm_call_errors, llm_first_token_seconds, timed_call
+from vector_store import make_vector_store
+
+GENERATION_MODEL = "gemini-2.5-flash"
+UPSERT_BATCH_SIZE = int(os.getenv("PINECONE_UPSERT_BATCH_SIZE", "100"))
+# Upsert batches allowed to queue behind the embedder before it waits.
+UPSERT_MAX_PENDING = int(os.getenv("PINECONE_UPSERT_MAX_PENDING", "4"))
+# Pinecone accepts up to 1000 ids per delete; the local store takes the same batches.
+DELETE_BATCH_SIZE = 1000
+MIN_CONTENT_CHARS = 50
+SYNC_PAGE_SIZE = 100
+# Blogs synced at startup; the rest are picked up by later /index calls.
+STARTUP_SYNC_LIMIT = int(os.getenv("INDEX_STARTUP_SYNC_LIMIT", "20"))
+# Each sync re-reads this far behind the high-water mark, so a write whose
+# transaction committed after an earlier sync (with an older updated_at) is
+# still seen. Unchanged blogs in the overlap are skipped by content hash.
+SYNC_OVERLAP_SECONDS = int(os.getenv("INDEX_SYNC_OVERLAP_SECONDS", "60"))
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+GENERATION_CONFIG = {"temperature": 0.2, "max_output_tokens": 2048}
+# Cosine score below which a match is not worth putting in the prompt.
+MIN_MATCH_SCORE = 0.1
+EMPTY_INDEX_ANSWER = """I don't have any blog content indexed yet!
+            Please index some blogs first so I can help you find information."""
+NO_MATCHES_ANSWER = """I couldn't find specific information about "{query}" in our blog database."""
+GENERATION_FAILED_ANSWER = "I'm having trouble generating a response right now. Please try again!!!"
+
+CHANGED_BLOGS_SQL = text("""
+    SELECT id, title, content, is_deleted, updated_at FROM blogapp_schema.blog
+    WHERE (updated_at, id) > (CAST(:since AS timestamptz), CAST(:after_id AS uuid))
+      AND (updated_at, id) <= (CAST(:until AS timestamptz), CAST(:until_id AS uuid))
+    ORDER BY updated_at, id
+    LIMIT :limit
+""")
+BLOGS_BY_ID_SQL = text("""
+    SELECT id, title, content, is_deleted, updated_at FROM blogapp_schema.blog
+    WHERE id = ANY(CAST(:ids AS uuid[]))
+""")
+
+
+def blog_row(row) -> dict:
+    return {
+        "id": str(row[0]),
+        "title": row[1],
+        "content": row[2],
+        "is_deleted": row[3],
+        "updated_at": row[4].isoformat() if row[4] else None,
+    }
+
+
+def is_indexable(blog: dict) -> bool:
+    return not blog["is_deleted"] and bool(blog["content"]) and len(blog["content"].strip()) >= MIN_CONTENT_CHARS
 
 class ServiceManager:
     def __init__(self):
         self.db_engine = None
-        self.pinecone_client = None
+        self.vector_store = None
         self.index_name = "rag-index-v1"
         self.gemini_client = None
+        self.embedder = None
+        self.index_state = None
         self.services_initialized = False
         self.index_populated = False
         
     def initialize_all(self) -> bool:
-        print("🚀 Starting service initialization...")
+        logger.info({"event": "services_init_start"})
         
         try:
             # Database
-            print("🔗 Connecting to database...")
-            self.db_engine = sqlalchemy.create_engine(get_database_url())
+            logger.debug({"event": "connecting", "service": "database"})
+            self.db_engine = build_engine(get_database_url(), name="handle_llm")
             with self.db_engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
-            print("✅ Database connected")
+            logger.info({"event": "connected", "service": "database"})
             
-            # Pinecone
-            print("🔗 Connecting to Pinecone...")
-            pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-            existing_indexes = [index.name for index in pc.list_indexes()]
-
-            index_created = False
-            if self.index_name not in existing_indexes:
-                print(f"Creating new Pinecone index: {self.index_name}")
-                pc.create_index(
-                    name=self.index_name,
-                    dimension=768,
-                    metric="cosine",
-                    spec=ServerlessSpec(cloud="aws", region="us-east-1")
-                )
-                print(f"✅ Created Pinecone index: {self.index_name}")
-                index_created = True
-                time.sleep(10)
-            else:
-                print(f"✅ Pinecone index exists: {self.index_name}")
-                
-            self.pinecone_client = pc
+            # Vector store (Pinecone or local, per VECTOR_STORE)
+            logger.debug({"event": "connecting", "service": "vector_store"})
+            self.vector_store, index_created = make_vector_store(self.index_name, EMBEDDING_DIMENSION)
             
             # Gemini for RAG
-            print("🔗 Connecting to Gemini...")
+            logger.debug({"event": "connecting", "service": "gemini"})
             self.gemini_client = genai_client.Client(api_key=os.getenv("GEMINI_API_KEY"))
             response = self.gemini_client.models.generate_content(
-                model="gemini-2.5-flash", contents="Say 'OK'"
+                model=GENERATION_MODEL, contents="Say 'OK'"
             )
-            print("✅ Gemini connected")
+            logger.info({"event": "connected", "service": "gemini"})
+            self.embedder = BatchEmbedder(make_backend(self.gemini_client), cache=make_cache())
+            self.index_state = IndexState(index_name=self.vector_store.name)
             
             self.services_initialized = True
             
-            # Auto-index blogs
+            # Catch up on blog changes since the last run; only new or edited
+            # content is embedded, so this is cheap on a warm index.
             if index_created or not self.is_index_populated():
-                print("🔄 Auto-indexing blogs during startup...")
-                try:
-                    result = self.index_blogs(limit=20, chunk_size=1000)
-                    print(f"✅ Auto-indexed {result['blogs_count']} blogs with {result['chunks_count']} chunks")
-                    self.index_populated = True
-                except Exception as e:
-                    print(f"⚠️ Auto-indexing failed: {e}")
-            else:
-                print("✅ Index already has data, skipping auto-indexing")
+                # Nothing is in the vector index, whatever the state file says.
+                self.index_state.reset()
+            logger.info({"event": "auto_index_start"})
+            try:
+                result = self.index_blogs(limit=STARTUP_SYNC_LIMIT, chunk_size=1000)
+                logger.info({"event": "auto_index_done", **result})
                 self.index_populated = True
+            except Exception as e:
+                logger.exception({"event": "auto_index_failed", "error": str(e)})
             
-            print("🎉 All services initialized successfully!")
+            logger.info({"event": "services_init_done"})
             return True
             
         except Exception as e:
-            print(f"❌ Service initialization failed: {e}")
+            logger.exception({"event": "services_init_failed", "error": str(e)})
             self.services_initialized = False
             return False
     
     def is_index_populated(self) -> bool:
-        """Check if the Pinecone index has data."""
+        """Check if the vector index has data."""
         try:
-            index = self.pinecone_client.Index(self.index_name)
-            stats = index.describe_index_stats()
-            total_vectors = stats.get('total_vector_count', 0)
-            print(f"📊 Index has {total_vectors} vectors")
+            total_vectors = self.vector_store.count()
+            logger.debug({"event": "index_stats", "total_vectors": total_vectors})
             return total_vectors > 0
         except Exception as e:
-            print(f"⚠️ Could not check index stats: {e}")
+            logger.warning({"event": "index_stats_failed", "error": str(e)})
             return False
     
     def test_database(self) -> bool:
@@ -102,11 +142,11 @@ class ServiceManager:
         except:
             return False
     
-    def test_pinecone(self) -> bool:
-        if not self.pinecone_client:
+    def test_vector_store(self) -> bool:
+        if not self.vector_store:
             return False
         try:
-            self.pinecone_client.Index(self.index_name).describe_index_stats()
+            self.vector_store.count()
             return True
         except:
             return False
@@ -116,40 +156,38 @@ class ServiceManager:
             return False
         try:
             self.gemini_client.models.generate_content(
-                model="gemini-2.5-flash", contents="test"
+                model=GENERATION_MODEL, contents="test"
             )
             return True
         except:
             return False
     
-    def fetch_blogs(self, limit: int = 50):
-        """Fetch blogs from database."""
+    def fetch_changed_blogs(self, since: str, after_id: str, limit: int = SYNC_PAGE_SIZE,
+                            until: tuple = ("infinity", NIL_UUID)):
+        """Blogs (including soft-deleted ones) changed after (since, after_id) and up to `until`, oldest first."""
         if not self.db_engine:
             raise RuntimeError("Database not connected")
             
         with self.db_engine.connect() as conn:
-            result = conn.execute(
-                text("SELECT id, title, content FROM blogapp_schema.blog WHERE content IS NOT NULL AND content != '' LIMIT :limit"),
-                {"limit": limit}
-            )
-            blogs = [
-                {"id": row[0], "title": row[1], "content": row[2]}
-                for row in result.fetchall()
-                if row[2] and len(row[2].strip()) > 50
-            ]
-            print(f"📚 Fetched {len(blogs)} blogs with content")
-            return blogs
+            result = conn.execute(CHANGED_BLOGS_SQL, {"since": since, "after_id": after_id, "limit": limit,
+                                                      "until": until[0], "until_id": until[1]})
+            return [blog_row(row) for row in result.fetchall()]
+    
+    def fetch_blogs_by_id(self, blog_ids: list):
+        if not self.db_engine:
+            raise RuntimeError("Database not connected")
+        if not blog_ids:
+            return []
+        
+        with self.db_engine.connect() as conn:
+            result = conn.execute(BLOGS_BY_ID_SQL, {"ids": [str(blog_id) for blog_id in blog_ids]})
+            return [blog_row(row) for row in result.fetchall()]
     
     def embed_text(self, text: str):
         """Generate embedding for text."""
-        if not self.gemini_client:
+        if not self.embedder:
             raise RuntimeError("Gemini client not connected")
-            
-        clean_text = text.strip()[:8000]
-        response = self.gemini_client.models.embed_content(
-            model="text-embedding-004", contents=clean_text
-        )
-        return response.embeddings[0].values
+        return self.embedder.embed_one(text)
     
     def chunk_text(self, text: str, chunk_size: int = 1000):
         """Split text into chunks."""
@@ -159,103 +197,230 @@ class ServiceManager:
         return splitter.split_text(text)
     
     def index_blogs(self, limit: int = 50, chunk_size: int = 1000):
-        """Index blogs into Pinecone."""
+        """Incrementally sync up to `limit` changed blogs into the vector store.
+        
+        Resumes from the persisted high-water mark (updated_at, id), retries
+        blogs whose chunks failed last time, and removes soft-deleted posts.
+        """
         if not self.services_initialized:
             raise RuntimeError("Services not initialized")
             
-        print(f"🔄 Starting indexing process for {limit} blogs...")
-        blogs = self.fetch_blogs(limit)
+        logger.info({"event": "index_start", "limit": limit})
+        start = time.perf_counter()
+        totals = {}
         
-        if not blogs:
-            print("⚠️ No blogs found with content to index")
-            return {"blogs_count": 0, "chunks_count": 0}
+        def add(stats):
+            for key, value in stats.items():
+                totals[key] = totals.get(key, 0) + value
         
-        vectors = []
-        chunks_count = 0
+        # Blogs left incomplete by an earlier run, then everything past the mark.
+        retry = self.fetch_blogs_by_id(self.index_state.pending_blogs())
+        if retry:
+            add(self.sync_blogs(retry, chunk_size))
         
-        for blog in blogs:
-            if not blog["content"] or len(blog["content"].strip()) < 50:
-                continue
-                
-            print(f"📝 Processing blog {blog['id']}: {blog['title'][:50]}...")
-            full_content = f"Title: {blog['title']}\n\nContent: {blog['content']}"
-            chunks = self.chunk_text(full_content, chunk_size)
-            
-            for i, chunk in enumerate(chunks):
-                try:
-                    embedding = self.embed_text(chunk)
-                    vectors.append({
-                        "id": f"blog_{blog['id']}_chunk_{i}",
-                        "values": embedding,
-                        "metadata": {
-                            "text": chunk,
-                            "blog_id": str(blog['id']),
-                            "blog_title": blog['title'],
-                            "chunk_index": i
-                        }
-                    })
-                    chunks_count += 1
-                    
-                    if len(vectors) % 10 == 0:
-                        print(f"  📊 Processed {len(vectors)} chunks...")
-                        
-                except Exception as e:
-                    print(f"⚠️ Failed to embed chunk {i} from blog {blog['id']}: {e}")
-                    continue
+        mark_ts, mark_id = self.index_state.high_water_mark()
+        if mark_ts:
+            # The overlap window behind the mark is scanned on its own and not
+            # counted toward `limit`: it is mostly rows already synced (skipped
+            # by hash), and counting them could pin every run to the same rows
+            # when more than `limit` blogs share one updated_at.
+            since = (datetime.fromisoformat(mark_ts) - timedelta(seconds=SYNC_OVERLAP_SECONDS)).isoformat()
+            after_id = NIL_UUID
+            while True:
+                page = self.fetch_changed_blogs(since, after_id, SYNC_PAGE_SIZE, until=(mark_ts, mark_id))
+                if page:
+                    add(self.sync_blogs(page, chunk_size))
+                    since, after_id = page[-1]["updated_at"], page[-1]["id"]
+                if len(page) < SYNC_PAGE_SIZE:
+                    break
         
-        # Upsert to Pinecone
-        if vectors:
-            print(f"🚀 Upserting {len(vectors)} vectors to Pinecone...")
-            index = self.pinecone_client.Index(self.index_name)
-            
-            batch_size = 50
-            for i in range(0, len(vectors), batch_size):
-                batch = vectors[i:i + batch_size]
-                try:
-                    index.upsert(vectors=batch)
-                    print(f"  ✅ Upserted batch {i//batch_size + 1}/{(len(vectors) + batch_size - 1)//batch_size}")
-                except Exception as e:
-                    print(f"⚠️ Failed to upsert batch {i//batch_size + 1}: {e}")
-            
-            time.sleep(2)
-            stats = index.describe_index_stats()
-            total_vectors = stats.get('total_vector_count', 0)
-            print(f"📊 Index now has {total_vectors} total vectors")
+        since, after_id = (mark_ts, mark_id) if mark_ts else ("-infinity", NIL_UUID)
+        seen = 0
+        while seen < limit:
+            page = self.fetch_changed_blogs(since, after_id, min(SYNC_PAGE_SIZE, limit - seen))
+            if not page:
+                break
+            add(self.sync_blogs(page, chunk_size))
+            seen += len(page)
+            since, after_id = page[-1]["updated_at"], page[-1]["id"]
+            self.index_state.set_high_water_mark(since, after_id)
         
-        result = {"blogs_count": len(blogs), "chunks_count": chunks_count}
-        print(f"✅ Indexing completed: {result}")
+        if totals.get("chunks_count") or totals.get("deleted_vectors"):
+            self.vector_store.wait_for_consistency(2)
+            total_vectors = self.vector_store.count()
+            logger.info({"event": "index_stats", "total_vectors": total_vectors})
+        
+        self.embedder.flush()
+        self.vector_store.flush()
+        elapsed = time.perf_counter() - start
+        result = {
+            "blogs_count": totals.get("blogs_count", 0),
+            "changed_blogs": totals.get("changed_blogs", 0),
+            "deleted_blogs": totals.get("deleted_blogs", 0),
+            "chunks_count": totals.get("chunks_count", 0),
+            "skipped_chunks": totals.get("skipped_chunks", 0),
+            "deleted_vectors": totals.get("deleted_vectors", 0),
+            "failed_chunks": totals.get("failed_chunks", 0),
+            "seconds": round(elapsed, 2),
+            "chunks_per_second": round(totals.get("chunks_count", 0) / elapsed, 1) if elapsed else 0.0,
+        }
+        logger.info({"event": "index_done", **result})
         return result
     
-    def process_query(self, query: str, top_k: int = 3):
-        """Process a RAG query with friendly system prompt."""
-        if not self.services_initialized:
-            raise RuntimeError("Services not initialized")
+    def sync_blogs(self, blogs: list, chunk_size: int = 1000) -> dict:
+        """Bring the vector index in line with `blogs`, embedding only chunks whose text changed."""
+        stale_ids, to_embed, plans = [], [], []
+        changed = deleted = skipped = 0
+        for blog in blogs:
+            old_chunks = self.index_state.chunk_hashes(blog["id"])
+            if not is_indexable(blog):
+                if old_chunks or self.index_state.blog_hash(blog["id"]) is not None:
+                    stale_ids.extend(old_chunks)
+                    plans.append((blog, None, {}))
+                    deleted += 1
+                continue
+            content_hash = text_hash(blog["title"], blog["content"], str(chunk_size))
+            if content_hash == self.index_state.blog_hash(blog["id"]):
+                continue
+            changed += 1
+            records = list(self.blog_chunks(blog, chunk_size))
+            new_chunks = {record["id"]: record["hash"] for record in records}
+            for record in records:
+                if old_chunks.get(record["id"]) == record["hash"]:
+                    skipped += 1
+                else:
+                    to_embed.append(record)
+            stale_ids.extend(vector_id for vector_id in old_chunks if vector_id not in new_chunks)
+            plans.append((blog, content_hash, new_chunks))
         
-        print(f"🔍 Processing query: '{query}'")
+        failed_ids = set()
+        stats = self.index_chunks(to_embed, failed_ids) if to_embed else {"chunks_count": 0, "failed_chunks": 0}
+        deleted_vectors = self.delete_vectors(stale_ids)
         
-        if not self.is_index_populated():
-            return """I don't have any blog content indexed yet!
-            Please index some blogs first so I can help you find information."""
+        for blog, content_hash, chunks in plans:
+            if content_hash is None:
+                self.index_state.forget_blog(blog["id"])
+                continue
+            if failed_ids & chunks.keys():
+                # Keep what made it; an empty blog hash marks it for retry next sync.
+                chunks = {vector_id: h for vector_id, h in chunks.items() if vector_id not in failed_ids}
+                content_hash = ""
+            self.index_state.save_blog(blog["id"], content_hash, blog["updated_at"], chunks)
         
-        # Get query embedding and search
-        query_embedding = self.embed_text(query)
-        index = self.pinecone_client.Index(self.index_name)
-        results = index.query(
-            vector=query_embedding, top_k=top_k, include_metadata=True
-        )
+        return {
+            "blogs_count": len(blogs),
+            "changed_blogs": changed,
+            "deleted_blogs": deleted,
+            "chunks_count": stats["chunks_count"],
+            "skipped_chunks": skipped,
+            "deleted_vectors": deleted_vectors,
+            "failed_chunks": stats["failed_chunks"],
+        }
+    
+    def delete_vectors(self, vector_ids: list) -> int:
+        if not vector_ids:
+            return 0
+        for i in range(0, len(vector_ids), DELETE_BATCH_SIZE):
+            self.vector_store.delete(ids=vector_ids[i:i + DELETE_BATCH_SIZE])
+        return len(vector_ids)
+    
+    def rebuild_index(self, limit: int = 100, chunk_size: int = 1000):
+        """Maintenance: wipe the vector index and state, then sync from scratch."""
+        self.vector_store.delete(delete_all=True)
+        self.index_state.reset()
+        logger.info({"event": "index_cleared"})
+        self.vector_store.wait_for_consistency(5)
+        return self.index_blogs(limit=limit, chunk_size=chunk_size)
+    
+    def blog_chunks(self, blog: dict, chunk_size: int = 1000):
+        """Chunk records (vector id, text, metadata) for one blog."""
+        full_content = f"Title: {blog['title']}\n\nContent: {blog['content']}"
+        for i, chunk in enumerate(self.chunk_text(full_content, chunk_size)):
+            yield {
+                "id": f"blog_{blog['id']}_chunk_{i}",
+                "text": chunk,
+                "hash": text_hash(blog['title'], chunk),
+                "metadata": {
+                    "text": chunk,
+                    "blog_id": str(blog['id']),
+                    "blog_title": blog['title'],
+                    "chunk_index": i,
+                    "updated_at": blog.get("updated_at") or time.strftime("%Y-%m-%d %H:%M:%S")
+                }
+            }
+    
+    def index_chunks(self, chunks, failed_ids: Optional[set] = None) -> dict:
+        """Embed chunk records in concurrent batches and upsert each batch as it lands.
         
-        print(f"📊 Found {len(results.get('matches', []))} matches")
+        Embedding and upserting overlap: a single upsert thread drains full
+        batches while the embedder keeps working, so vectors are never all
+        buffered in memory at once. Ids of chunks that didn't make it into
+        the index are added to `failed_ids` when given.
+        """
+        start = time.perf_counter()
+        embedded = failed = upsert_failed = 0
+        buffer, pending = [], []
         
-        chunks = []
-        for match in results.get('matches', []):
-            if match.get('score', 0) > 0.1:
-                chunks.append(match["metadata"]["text"])
+        def flush(vectors):
+            nonlocal upsert_failed
+            while len(pending) >= UPSERT_MAX_PENDING:
+                upsert_failed += wait_upsert(pending.pop(0))
+            pending.append((upserter.submit(self.vector_store.upsert, vectors), vectors))
         
-        if not chunks:
-            return f"""I couldn't find specific information about "{query}" in our blog database."""
+        def wait_upsert(entry):
+            future, vectors = entry
+            try:
+                future.result()
+                return 0
+            except Exception as e:
+                logger.error({"event": "upsert_batch_failed", "size": len(vectors), "error": str(e)})
+                if failed_ids is not None:
+                    failed_ids.update(vector["id"] for vector in vectors)
+                return len(vectors)
+        
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="upsert") as upserter:
+            for batch, values in self.embedder.embed_batches(chunks):
+                if values is None:
+                    failed += len(batch)
+                    if failed_ids is not None:
+                        failed_ids.update(record["id"] for record in batch)
+                    continue
+                embedded += len(batch)
+                buffer.extend(
+                    {"id": record["id"], "values": vector, "metadata": record["metadata"]}
+                    for record, vector in zip(batch, values)
+                )
+                while len(buffer) >= UPSERT_BATCH_SIZE:
+                    flush(buffer[:UPSERT_BATCH_SIZE])
+                    buffer = buffer[UPSERT_BATCH_SIZE:]
+                logger.debug({"event": "index_progress", "chunks": embedded})
+            if buffer:
+                flush(buffer)
+            for entry in pending:
+                upsert_failed += wait_upsert(entry)
+        
+        elapsed = time.perf_counter() - start
+        chunks_count = embedded - upsert_failed
+        indexed_chunks.inc(chunks_count)
+        return {
+            "chunks_count": chunks_count,
+            "failed_chunks": failed + upsert_failed,
+            "seconds": round(elapsed, 2),
+            "chunks_per_second": round(chunks_count / elapsed, 1) if elapsed else 0.0,
+        }
+    
+    def retrieve(self, query: str, top_k: int = 3) -> list[dict]:
+        """Matches for the query above the relevance cutoff, best first."""
+        query_embedding = self.embed_text(query)
+        matches = self.vector_store.query(query_embedding, top_k)
+        logger.info({"event": "query_matches", "matches": len(matches)})
+        return [match for match in matches if match.get('score', 0) > MIN_MATCH_SCORE]
+
+    def build_prompt(self, query: str, matches: list[dict]) -> str:
+        """System prompt plus the retrieved blog content and the user's question."""
         with open("system_prompt.txt", "r", encoding="utf-8") as f:
             system_prompt = f.read()
-        context = "\n\n".join(chunks)
+        context = "\n\n".join(match["metadata"]["text"] for match in matches)
         user_prompt = f"""BLOG CONTENT:
 {context}
 
@@ -264,114 +429,136 @@ USER QUESTION: {query}
 Provide a comprehensive analysis based solely on the blog content above. 
 If information is limited, clearly indicate what additional details would be helpful."""
 
-        full_prompt = f"{system_prompt}\n\n{user_prompt}"
+        return f"{system_prompt}\n\n{user_prompt}"
+
+    def process_query(self, query: str, top_k: int = 3):
+        """Process a RAG query with friendly system prompt."""
+        if not self.services_initialized:
+            raise RuntimeError("Services not initialized")
         
-        response = self.gemini_client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=full_prompt,
-            config={"temperature": 0.2, "max_output_tokens": 2048}
-        )
+        logger.info({"event": "query", "query_chars": len(query), "top_k": top_k})
+        
+        if not self.is_index_populated():
+            return EMPTY_INDEX_ANSWER
+        
+        matches = self.retrieve(query, top_k)
+        if not matches:
+            return NO_MATCHES_ANSWER.format(query=query)
+        full_prompt = self.build_prompt(query, matches)
+        
+        with timed_call("generate", GENERATION_MODEL):
+            response = self.gemini_client.models.generate_content(
+                model=GENERATION_MODEL,
+                contents=full_prompt,
+                config=GENERATION_CONFIG
+            )
         
         if (response and response.candidates and 
             response.candidates[0].content and
             response.candidates[0].content.parts):
             return response.candidates[0].content.parts[0].text
         else:
-            return "I'm having trouble generating a response right now. Please try again!!!"
+            llm_call_errors.labels("generate", GENERATION_MODEL).inc()
+            return GENERATION_FAILED_ANSWER
+
+    def stream_query(self, query: str, top_k: int = 3):
+        """Yield (event, data) pairs for a RAG query: sources, then tokens, then done.
+
+        Retrieval runs before generation starts, so the sources event goes
+        out after one embedding call and one vector search. The fallback
+        answers of process_query are sent as a single token event.
+        """
+        if not self.services_initialized:
+            raise RuntimeError("Services not initialized")
+
+        logger.info({"event": "query_stream", "query_chars": len(query), "top_k": top_k})
+        start = time.perf_counter()
+
+        populated = self.is_index_populated()
+        matches = self.retrieve(query, top_k) if populated else []
+        yield "sources", {
+            "sources": [
+                {
+                    "blog_id": match["metadata"].get("blog_id"),
+                    "blog_title": match["metadata"].get("blog_title"),
+                    "chunk_index": match["metadata"].get("chunk_index"),
+                    "score": round(match["score"], 4),
+                }
+                for match in matches
+            ],
+            "retrieval_time": round(time.perf_counter() - start, 3),
+        }
+
+        if not matches:
+            answer = NO_MATCHES_ANSWER.format(query=query) if populated else EMPTY_INDEX_ANSWER
+            yield "token", {"text": answer}
+            yield "done", {"processing_time": round(time.perf_counter() - start, 2)}
+            return
+
+        full_prompt = self.build_prompt(query, matches)
+        chunks = 0
+        try:
+            with timed_call("generate_stream", GENERATION_MODEL):
+                stream = self.gemini_client.models.generate_content_stream(
+                    model=GENERATION_MODEL,
+                    contents=full_prompt,
+                    config=GENERATION_CONFIG
+                )
+                for chunk in stream:
+                    if not chunk.text:
+                        continue
+                    if not chunks:
+                        llm_first_token_seconds.labels(GENERATION_MODEL).observe(time.perf_counter() - start)
+                    chunks += 1
+                    yield "token", {"text": chunk.text}
+        except Exception as e:
+            # Headers are already sent, so the failure has to travel in-band.
+            logger.error({"event": "query_stream_failed", "chunks": chunks, "error": str(e)})
+            yield "error", {"detail": f"Generation failed: {str(e)}"}
+            return
+
+        if not chunks:
+            llm_call_errors.labels("generate_stream", GENERATION_MODEL).inc()
+            yield "token", {"text": GENERATION_FAILED_ANSWER}
+        yield "done", {"processing_time": round(time.perf_counter() - start, 2)}
         
     def update_blog_in_index(self, blog_id: str, chunk_size: int = 1000):
-        """Update a specific blog in the Pinecone index."""
+        """Sync one blog into the vector store, re-embedding only changed chunks."""
         if not self.services_initialized:
             raise RuntimeError("Services not initialized")
         
-        print(f"🔄 Updating blog {blog_id} in index...")
+        logger.info({"event": "blog_reindex_start", "blog_id": blog_id})
 
-        blog = self.fetch_single_blog(blog_id)
-        if not blog or not blog["content"]:
-            print(f"⚠️ Blog {blog_id} not found or has no content")
+        blogs = self.fetch_blogs_by_id([blog_id])
+        if not blogs or not is_indexable(blogs[0]):
+            logger.warning({"event": "blog_reindex_skipped", "blog_id": blog_id, "reason": "missing_or_empty"})
+            if blogs:
+                # Soft-deleted or emptied: drop whatever was indexed for it.
+                self.sync_blogs(blogs, chunk_size)
             return {"updated": False, "reason": "Blog not found or empty"}
 
-        self.delete_blog_from_index(blog_id)
-        
-        result = self.index_single_blog(blog, chunk_size)
-        print(f"✅ Updated blog {blog_id}: {result['chunks_count']} chunks")
+        result = self.sync_blogs(blogs, chunk_size)
+        logger.info({"event": "blog_reindex_done", "blog_id": blog_id, **result})
         
         return result
 
     def delete_blog_from_index(self, blog_id: str):
-        """Delete all chunks for a specific blog from Pinecone."""
+        """Delete all chunks for a specific blog from the vector store."""
         if not self.services_initialized:
             raise RuntimeError("Services not initialized")
         
         try:
-            index = self.pinecone_client.Index(self.index_name)
-
-            index.delete(filter={"blog_id": {"$eq": str(blog_id)}})
-            print(f"🗑️ Deleted all chunks for blog {blog_id}")
+            vector_ids = list(self.index_state.chunk_hashes(str(blog_id)))
+            if vector_ids:
+                self.delete_vectors(vector_ids)
+            else:
+                # Not in the state file (indexed before it existed): fall back to the metadata filter.
+                self.vector_store.delete(blog_id=str(blog_id))
+            self.index_state.forget_blog(str(blog_id))
+            logger.info({"event": "blog_vectors_deleted", "blog_id": blog_id})
             
         except Exception as e:
-            print(f"⚠️ Error deleting blog {blog_id} chunks: {e}")
-
-    def fetch_single_blog(self, blog_id: int):
-        """Fetch a single blog by ID."""
-        if not self.db_engine:
-            raise RuntimeError("Database not connected")
-        
-        with self.db_engine.connect() as conn:
-            result = conn.execute(
-                text("SELECT id, title, content FROM blogapp_schema.blog WHERE id = :blog_id"),
-                {"blog_id": blog_id}
-            )
-            row = result.fetchone()
-            
-            if row and row[2] and len(row[2].strip()) > 50:
-                return {"id": row[0], "title": row[1], "content": row[2]}
-            return None
-
-    def index_single_blog(self, blog: dict, chunk_size: int = 1000):
-        """Index a single blog into Pinecone."""
-        if not blog["content"]:
-            return {"chunks_count": 0}
-
-        full_content = f"Title: {blog['title']}\n\nContent: {blog['content']}"
-        chunks = self.chunk_text(full_content, chunk_size)
-        
-        vectors = []
-        for i, chunk in enumerate(chunks):
-            try:
-                embedding = self.embed_text(chunk)
-                vectors.append({
-                    "id": f"blog_{blog['id']}_chunk_{i}",
-                    "values": embedding,
-                    "metadata": {
-                        "text": chunk,
-                        "blog_id": str(blog['id']),
-                        "blog_title": blog['title'],
-                        "chunk_index": i,
-                        "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                })
-            except Exception as e:
-                print(f"⚠️ Failed to embed chunk {i} from blog {blog['id']}: {e}")
-                continue
-        
-        # Upsert to Pinecone
-        if vectors:
-            index = self.pinecone_client.Index(self.index_name)
-            
-            # Batch upsert
-            batch_size = 50
-            for i in range(0, len(vectors), batch_size):
-                batch = vectors[i:i + batch_size]
-                try:
-                    index.upsert(vectors=batch)
-                except Exception as e:
-                    print(f"⚠️ Failed to upsert batch: {e}")
-            
-            # Wait for indexing
-            time.sleep(2)
-        
-        return {"chunks_count": len(vectors)}
+            logger.error({"event": "blog_vectors_delete_failed", "blog_id": blog_id, "error": str(e)})
 
     def handle_blog_deletion(self, blog_id: int):
         """Handle blog deletion by removing from index."""
@@ -379,8 +566,24 @@ If information is limited, clearly indicate what additional details would be hel
         return {"deleted": True, "blog_id": blog_id}
 
     
+    def record_upload(self, stored):
+        """Register a stored upload in the shared upload_object table."""
+        if not self.db_engine:
+            return
+        try:
+            with self.db_engine.begin() as conn:
+                record_upload(conn, stored)
+        except Exception as e:
+            logger.warning({"event": "record_upload_failed", "file": stored.filename, "error": str(e)})
+
     def cleanup(self):
         """Cleanup resources."""
         if self.db_engine:
             self.db_engine.dispose()
-        print("✅ Services cleaned up")
+        if self.embedder:
+            self.embedder.shutdown()
+        if self.index_state:
+            self.index_state.close()
+        if self.vector_store:
+            self.vector_store.flush()
+        logger.info({"event": "services_cleanup"})
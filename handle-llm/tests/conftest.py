@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# handle-llm is a flat set of modules run from its own directory, not a package.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from embedding import EMBEDDING_DIMENSION, BatchEmbedder, FakeEmbeddingBackend
+from index_state import IndexState
+from services import ServiceManager
+from vector_store import LocalVectorStore
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    # The blog tables belong to the backend; create them as its test suite does.
+    from app.database.db_connect import Base, engine
+    import app.models.user, app.models.blog  # noqa: F401
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def service_manager(tmp_path, db_engine):
+    """A ServiceManager on the test database with a local store, fresh sync state and fake embeddings."""
+    sm = ServiceManager()
+    sm.db_engine = db_engine
+    sm.vector_store = LocalVectorStore(tmp_path / "vectors", dimension=EMBEDDING_DIMENSION)
+    sm.index_state = IndexState(tmp_path / "index_state.sqlite3", index_name=sm.vector_store.name)
+    sm.embedder = BatchEmbedder(FakeEmbeddingBackend(), batch_size=16, concurrency=2)
+    sm.services_initialized = True
+    yield sm
+    sm.embedder.shutdown()
+    sm.index_state.close()
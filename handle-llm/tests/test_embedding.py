@@ -0,0 +1,99 @@
+import threading
+import time
+
+import services
+from embedding import BatchEmbedder, FakeEmbeddingBackend
+from metrics import llm_retries
+from services import ServiceManager
+
+
+class PoisonBackend(FakeEmbeddingBackend):
+    """Fails every call that includes a text containing "poison"; counts calls in flight."""
+
+    def __init__(self, **kwargs):
+        super().__init__(dimension=8, **kwargs)
+        self.lock = threading.Lock()
+        self.in_flight = self.max_in_flight = 0
+
+    def embed(self, texts):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if any("poison" in text for text in texts):
+                raise RuntimeError("poisoned batch")
+            return super().embed(texts)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class StubStore:
+    backend = "stub"
+
+    def __init__(self, fail_batches: int = 0):
+        self.fail_batches = fail_batches
+        self.batches = []
+        self.vectors = {}
+
+    def upsert(self, vectors):
+        self.batches.append(len(vectors))
+        if self.fail_batches:
+            self.fail_batches -= 1
+            raise RuntimeError("upsert rejected")
+        self.vectors.update((v["id"], v["values"]) for v in vectors)
+
+
+def chunk(i: int, text: str = "") -> dict:
+    return {"id": f"c{i}", "text": text or f"chunk {i}", "metadata": {"text": text or f"chunk {i}"}}
+
+
+def test_embed_batches_retries_transient_failures():
+    backend = FakeEmbeddingBackend(dimension=8, fail_every=2)
+    embedder = BatchEmbedder(backend, batch_size=5, concurrency=1, max_retries=2, backoff=0)
+    retries = llm_retries.labels("embed", "fake")._value.get()
+
+    results = list(embedder.embed_batches(chunk(i) for i in range(20)))
+    assert all(vectors is not None for _, vectors in results)
+    assert sorted(item["id"] for batch, _ in results for item in batch) == sorted(f"c{i}" for i in range(20))
+    # Calls 2, 4 and 6 failed; each of those batches succeeded on its retry.
+    assert backend.calls == 7
+    assert llm_retries.labels("embed", "fake")._value.get() == retries + 3
+    expected = FakeEmbeddingBackend(dimension=8)
+    for batch, vectors in results:
+        assert vectors == expected.embed([item["text"] for item in batch])
+    embedder.shutdown()
+
+
+def test_embed_batches_reports_failed_batches_and_bounds_concurrency():
+    backend = PoisonBackend(latency=0.02)
+    embedder = BatchEmbedder(backend, batch_size=4, concurrency=2, max_retries=1, backoff=0)
+    items = [chunk(i, "poison" if i == 9 else "") for i in range(24)]
+
+    results = list(embedder.embed_batches(iter(items)))
+    failed = [batch for batch, vectors in results if vectors is None]
+    assert [[item["id"] for item in batch] for batch in failed] == [["c8", "c9", "c10", "c11"]]
+    assert sum(len(batch) for batch, vectors in results if vectors is not None) == 20
+    assert backend.max_in_flight <= 2
+    embedder.shutdown()
+
+
+def test_index_chunks_pipelines_upserts_and_reports_failures(monkeypatch):
+    monkeypatch.setattr(services, "UPSERT_BATCH_SIZE", 6)
+    monkeypatch.setattr(services, "UPSERT_MAX_PENDING", 2)
+    sm = ServiceManager()
+    sm.embedder = BatchEmbedder(PoisonBackend(), batch_size=4, concurrency=2, max_retries=0, backoff=0)
+    sm.vector_store = StubStore(fail_batches=1)
+
+    failed_ids = set()
+    items = [chunk(i, "poison" if i == 1 else "") for i in range(30)]
+    result = sm.index_chunks(items, failed_ids)
+
+    # c0-c3 never embedded; the first upsert batch (6 vectors) was rejected.
+    assert {"c0", "c1", "c2", "c3"} <= failed_ids
+    assert len(failed_ids) == 4 + 6
+    assert result["failed_chunks"] == 10
+    assert result["chunks_count"] == 20 == len(sm.vector_store.vectors)
+    assert not failed_ids & sm.vector_store.vectors.keys()
+    assert all(size <= 6 for size in sm.vector_store.batches)
+    sm.embedder.shutdown()
@@ -0,0 +1,43 @@
+from embedding import BatchEmbedder, FakeEmbeddingBackend
+from embedding_cache import EmbeddingCache, cache_key
+
+
+def test_cached_embeddings_match_the_backend(tmp_path):
+    backend = FakeEmbeddingBackend(dimension=8)
+    embedder = BatchEmbedder(backend, batch_size=4, concurrency=1,
+                             cache=EmbeddingCache(tmp_path, dimension=8, capacity=16))
+    texts = [f"text {i}" for i in range(6)]
+    first = embedder.embed_batch(texts)
+    assert backend.calls == 1
+
+    assert embedder.embed_batch(texts[::-1]) == first[::-1]
+    assert embedder.embed_one("text 2") == first[2]
+    assert backend.calls == 1
+    assert embedder.cache.stats()["hits"] == 7
+    embedder.shutdown()
+
+    # A new process reads the flushed cache.
+    reopened = EmbeddingCache(tmp_path, dimension=8, capacity=16)
+    keys = [cache_key(backend.model, text) for text in texts]
+    assert reopened.get_many(keys) == dict(zip(keys, first))
+
+
+def test_reused_row_is_not_served_under_a_stale_index(tmp_path):
+    backend = FakeEmbeddingBackend(dimension=8)
+    cache = EmbeddingCache(tmp_path, dimension=8, capacity=2)
+    old = [cache_key(backend.model, text) for text in ("a", "b")]
+    cache.put_many(old, backend.embed(["a", "b"]))
+    cache.flush()
+
+    # Evicts "a" and writes "c" into its row, then the process dies before flush().
+    new = cache_key(backend.model, "c")
+    cache.put_many([new], backend.embed(["c"]))
+
+    reopened = EmbeddingCache(tmp_path, dimension=8, capacity=2)
+    found = reopened.get_many(old + [new])
+    assert list(found) == [old[1]]
+    assert found[old[1]] == backend.embed(["b"])[0]
+
+    # The stale row is reclaimed without evicting the live one.
+    reopened.put_many([new], backend.embed(["c"]))
+    assert set(reopened.get_many(old + [new])) == {old[1], new}
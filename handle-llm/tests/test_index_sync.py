@@ -0,0 +1,42 @@
+import uuid
+
+from sqlalchemy import text
+
+from services import NIL_UUID
+
+
+def insert_blogs(conn, count: int) -> list[str]:
+    user_id = uuid.uuid4()
+    conn.execute(
+        text("INSERT INTO blogapp_schema.users (id, username, email, password_hash) VALUES (:id, :name, :email, 'x')"),
+        {"id": user_id, "name": f"indexer_{user_id.hex[:8]}", "email": f"{user_id.hex[:8]}@example.com"},
+    )
+    rows = conn.execute(
+        text("INSERT INTO blogapp_schema.blog (user_id, title, content) "
+             "SELECT :user_id, 'Shared timestamp ' || n, repeat('same transaction, same updated_at. ', 4) || n "
+             "FROM generate_series(1, :count) AS n RETURNING id"),
+        {"user_id": user_id, "count": count},
+    )
+    return [str(row[0]) for row in rows]
+
+
+def test_index_sync_moves_past_more_than_limit_rows_with_one_timestamp(service_manager, db_engine):
+    state = service_manager.index_state
+    with db_engine.connect() as conn:
+        started = conn.execute(text("SELECT now()")).scalar_one()
+    # Skip whatever other runs left in the database.
+    state.set_high_water_mark(started.isoformat(), NIL_UUID)
+
+    # One transaction, so every row gets the same now() for updated_at, as a POST /blogs/bulk does.
+    with db_engine.begin() as conn:
+        blog_ids = insert_blogs(conn, 120)
+
+    for _ in range(3):
+        service_manager.index_blogs(limit=50)
+    assert all(state.blog_hash(blog_id) for blog_id in blog_ids)
+    assert state.high_water_mark()[1] == max(blog_ids)
+
+    # Caught up: the overlap window is re-read but nothing is re-embedded.
+    result = service_manager.index_blogs(limit=50)
+    assert result["changed_blogs"] == 0
+    assert result["chunks_count"] == 0
@@ -0,0 +1,43 @@
+import threading
+import time
+
+import numpy as np
+
+from vector_store import LocalVectorStore
+
+
+def records(start: int, count: int, dimension: int = 16):
+    rng = np.random.default_rng(start)
+    return [
+        {"id": f"v{i}", "values": rng.standard_normal(dimension).tolist(), "metadata": {"blog_id": str(i // 10), "text": ""}}
+        for i in range(start, start + count)
+    ]
+
+
+def test_ivf_builds_in_the_background_without_blocking_queries(tmp_path, monkeypatch):
+    release = threading.Event()
+    build = LocalVectorStore._build_ivf
+
+    def held_build(self):
+        release.wait(10)
+        build(self)
+
+    monkeypatch.setattr(LocalVectorStore, "_build_ivf", held_build)
+    store = LocalVectorStore(tmp_path, dimension=16, ivf_min_vectors=200, nprobe=64)
+    first = records(0, 300)
+    store.upsert(first)  # crosses ivf_min_vectors: a build starts and is held
+
+    # Queries and writes go on, served exactly, while the build is pending.
+    start = time.perf_counter()
+    assert store.query(first[5]["values"], 3)[0]["id"] == "v5"
+    late = records(300, 20)
+    store.upsert(late)
+    assert time.perf_counter() - start < 5
+    assert store._centroids is None
+
+    release.set()
+    assert store.wait_for_index(10)
+    # Rows written during the build were assigned to lists too; with every
+    # list probed, IVF finds each row as its own nearest neighbour.
+    for record in first[:3] + late:
+        assert store.query(record["values"], 1)[0]["id"] == record["id"]
@@ -0,0 +1,339 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from config import logger
+from metrics import timed_vector_store, vector_store_upsert_batch_size
+
+# "pinecone" (managed, network hop per call) or "local" (in-process, on disk).
+VECTOR_STORE = os.getenv("VECTOR_STORE", "pinecone")
+LOCAL_VECTOR_DIR = Path(os.getenv("LOCAL_VECTOR_DIR", Path(__file__).resolve().parent / "vector_store"))
+# Below this many vectors the local store searches exhaustively; above it,
+# queries go through an IVF index and only scan the nearest LOCAL_IVF_NPROBE lists.
+LOCAL_IVF_MIN_VECTORS = int(os.getenv("LOCAL_IVF_MIN_VECTORS", "20000"))
+LOCAL_IVF_NPROBE = int(os.getenv("LOCAL_IVF_NPROBE", "8"))
+KMEANS_ITERATIONS = 10
+ASSIGN_BLOCK = 65536
+INITIAL_CAPACITY = 1024
+
+
+def as_match(vector_id: str, score: float, metadata: dict) -> dict:
+    return {"id": vector_id, "score": score, "metadata": metadata}
+
+
+class PineconeVectorStore:
+    """Pinecone index behind the VectorStore calls ServiceManager makes."""
+
+    backend = "pinecone"
+
+    def __init__(self, index, name: str):
+        self.index = index
+        self.name = name
+
+    def upsert(self, vectors: list[dict]):
+        vector_store_upsert_batch_size.labels(self.backend).observe(len(vectors))
+        with timed_vector_store(self.backend, "upsert"):
+            self.index.upsert(vectors=vectors)
+
+    def query(self, vector: list[float], top_k: int, blog_id: Optional[str] = None) -> list[dict]:
+        query_filter = {"blog_id": {"$eq": str(blog_id)}} if blog_id else None
+        with timed_vector_store(self.backend, "query"):
+            results = self.index.query(vector=vector, top_k=top_k, include_metadata=True, filter=query_filter)
+        return [as_match(m["id"], m["score"], m.get("metadata") or {}) for m in results.get("matches", [])]
+
+    def delete(self, ids: Optional[list[str]] = None, blog_id: Optional[str] = None, delete_all: bool = False):
+        with timed_vector_store(self.backend, "delete"):
+            if delete_all:
+                self.index.delete(delete_all=True)
+            elif blog_id is not None:
+                self.index.delete(filter={"blog_id": {"$eq": str(blog_id)}})
+            elif ids:
+                self.index.delete(ids=ids)
+
+    def count(self) -> int:
+        return self.index.describe_index_stats().get("total_vector_count", 0)
+
+    def wait_for_consistency(self, seconds: float):
+        # Writes become visible to queries and stats after a short delay.
+        time.sleep(seconds)
+
+    def flush(self):
+        pass
+
+
+def connect_pinecone(index_name: str, dimension: int) -> tuple[PineconeVectorStore, bool]:
+    """Open (creating if needed) the Pinecone index; returns the store and whether it was created."""
+    from pinecone import Pinecone, ServerlessSpec
+
+    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+    existing_indexes = [index.name for index in pc.list_indexes()]
+
+    index_created = False
+    if index_name not in existing_indexes:
+        logger.info({"event": "pinecone_index_creating", "index": index_name})
+        pc.create_index(
+            name=index_name,
+            dimension=dimension,
+            metric="cosine",
+            spec=ServerlessSpec(cloud="aws", region="us-east-1")
+        )
+        logger.info({"event": "pinecone_index_created", "index": index_name})
+        index_created = True
+        time.sleep(10)
+    return PineconeVectorStore(pc.Index(index_name), index_name), index_created
+
+
+class LocalVectorStore:
+    """In-process cosine search over a memory-mapped float32 matrix.
+
+    Rows live in `vectors.f32` (unit-normalized, grown by doubling); ids,
+    blog ids and metadata live in `rows.sqlite3`. Deleted rows are reused.
+    Small stores are searched exactly. Once LOCAL_IVF_MIN_VECTORS are live,
+    a spherical k-means IVF index is built in memory and queries score only
+    the rows in the `nprobe` closest lists; it is rebuilt when the store
+    doubles. Builds run on a background thread started from the write path
+    (or when a query finds one due) and are swapped in when done; until
+    then queries use the previous index, or exact search. Queries filtered
+    by blog_id always search that blog's rows exactly.
+    """
+
+    backend = "local"
+
+    def __init__(self, directory: Path = LOCAL_VECTOR_DIR, dimension: int = 768,
+                 ivf_min_vectors: int = LOCAL_IVF_MIN_VECTORS, nprobe: int = LOCAL_IVF_NPROBE):
+        self.directory = directory
+        self.name = f"local:{directory.resolve()}"
+        self.dimension = dimension
+        self.ivf_min_vectors = ivf_min_vectors
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        self._build_done = threading.Condition(self._lock)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        self._db = sqlite3.connect(str(directory / "rows.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS rows (row INTEGER PRIMARY KEY, vector_id TEXT UNIQUE NOT NULL,"
+            " blog_id TEXT, metadata TEXT NOT NULL)"
+        )
+        self._row_of: dict[str, int] = {}
+        self._blog_of: dict[int, str] = {}
+        self._blog_rows: dict[str, set[int]] = {}
+        for row, vector_id, blog_id in self._db.execute("SELECT row, vector_id, blog_id FROM rows"):
+            self._row_of[vector_id] = row
+            self._blog_of[row] = blog_id
+            self._blog_rows.setdefault(blog_id, set()).add(row)
+
+        self._path = directory / "vectors.f32"
+        rows_on_disk = self._path.stat().st_size // (4 * dimension) if self._path.exists() else 0
+        self._high = max(self._row_of.values(), default=-1) + 1
+        self._open(max(INITIAL_CAPACITY, rows_on_disk, self._high))
+        self._live = np.zeros(self._capacity, dtype=bool)
+        self._live[list(self._row_of.values())] = True
+        self._free = sorted(set(range(self._high)) - set(self._row_of.values()), reverse=True)
+
+        self._centroids: Optional[np.ndarray] = None
+        self._assign: Optional[np.ndarray] = None
+        self._built_for = 0
+        self._building = False
+        # Rows written while a build runs; re-assigned against its centroids at swap time.
+        self._changed_rows: Optional[set[int]] = None
+        with self._lock:
+            self._schedule_ivf_build()
+
+    def _open(self, capacity: int):
+        if not self._path.exists():
+            self._path.touch()
+        with open(self._path, "r+b") as f:
+            f.truncate(capacity * self.dimension * 4)
+        self._capacity = capacity
+        self._vectors = np.memmap(self._path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+
+    def _grow(self, needed: int):
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        self._vectors.flush()
+        del self._vectors
+        self._open(capacity)
+        self._live = np.concatenate([self._live, np.zeros(capacity - len(self._live), dtype=bool)])
+        if self._assign is not None:
+            self._assign = np.concatenate([self._assign, np.full(capacity - len(self._assign), -1, np.int32)])
+
+    def _next_row(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if self._high >= self._capacity:
+            self._grow(self._high + 1)
+        self._high += 1
+        return self._high - 1
+
+    def upsert(self, vectors: list[dict]):
+        vector_store_upsert_batch_size.labels(self.backend).observe(len(vectors))
+        with timed_vector_store(self.backend, "upsert"), self._lock:
+            records = []
+            for item in vectors:
+                row = self._row_of.get(item["id"])
+                if row is None:
+                    row = self._next_row()
+                    self._row_of[item["id"]] = row
+                blog_id = item["metadata"].get("blog_id")
+                self._blog_of[row] = blog_id
+                self._blog_rows.setdefault(blog_id, set()).add(row)
+                values = np.asarray(item["values"], dtype=np.float32)
+                self._vectors[row] = values / (np.linalg.norm(values) or 1.0)
+                self._live[row] = True
+                if self._centroids is not None:
+                    self._assign[row] = int(np.argmax(self._centroids @ self._vectors[row]))
+                if self._changed_rows is not None:
+                    self._changed_rows.add(row)
+                records.append((row, item["id"], blog_id, json.dumps(item["metadata"])))
+            with self._db:
+                self._db.executemany("INSERT OR REPLACE INTO rows (row, vector_id, blog_id, metadata) VALUES (?, ?, ?, ?)", records)
+            self._schedule_ivf_build()
+
+    def delete(self, ids: Optional[list[str]] = None, blog_id: Optional[str] = None, delete_all: bool = False):
+        with timed_vector_store(self.backend, "delete"), self._lock:
+            if delete_all:
+                ids = list(self._row_of)
+            elif blog_id is not None:
+                ids = [vector_id for vector_id, row in self._row_of.items() if self._blog_of.get(row) == str(blog_id)]
+            rows = [self._row_of.pop(vector_id) for vector_id in ids or [] if vector_id in self._row_of]
+            for row in rows:
+                self._live[row] = False
+                self._free.append(row)
+                blog_rows = self._blog_rows.get(self._blog_of.pop(row, None))
+                if blog_rows is not None:
+                    blog_rows.discard(row)
+            with self._db:
+                self._db.executemany("DELETE FROM rows WHERE row = ?", [(row,) for row in rows])
+
+    def count(self) -> int:
+        return len(self._row_of)
+
+    def _ivf_due(self) -> bool:
+        live = self.count()
+        return live > 0 and live >= self.ivf_min_vectors and (self._centroids is None or live > 2 * self._built_for)
+
+    def _schedule_ivf_build(self):
+        """Start a background (re)build if one is due and none is running. Caller holds the lock."""
+        if self._building or not self._ivf_due():
+            return
+        self._building = True
+        self._changed_rows = set()
+        threading.Thread(target=self._build_ivf, name="ivf-build", daemon=True).start()
+
+    def _build_ivf(self):
+        try:
+            with self._lock:
+                rows = np.flatnonzero(self._live[:self._high])
+                vectors = self._vectors
+                nlist = int(min(4096, len(rows), max(16, np.sqrt(len(rows)))))
+                rng = np.random.default_rng(0)
+                sample = vectors[rng.choice(rows, size=min(len(rows), nlist * 64), replace=False)]
+
+            # k-means and the bulk assignment run unlocked. A row rewritten
+            # meanwhile is in _changed_rows and re-assigned below; `vectors`
+            # stays valid if the store grows, since growing only extends the file.
+            centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+            for _ in range(KMEANS_ITERATIONS):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                for k in range(nlist):
+                    members = sample[labels == k]
+                    # Reseed empty lists from a random sample point.
+                    centroid = members.sum(axis=0) if len(members) else sample[rng.integers(len(sample))]
+                    centroids[k] = centroid / (np.linalg.norm(centroid) or 1.0)
+            assign = np.full(len(vectors), -1, dtype=np.int32)
+            for start in range(0, len(rows), ASSIGN_BLOCK):
+                block = rows[start:start + ASSIGN_BLOCK]
+                assign[block] = np.argmax(vectors[block] @ centroids.T, axis=1)
+
+            with self._lock:
+                if len(assign) < self._capacity:
+                    assign = np.concatenate([assign, np.full(self._capacity - len(assign), -1, np.int32)])
+                changed = np.fromiter(self._changed_rows, dtype=np.int64)
+                if len(changed):
+                    assign[changed] = np.argmax(self._vectors[changed] @ centroids.T, axis=1)
+                self._centroids, self._assign, self._built_for = centroids, assign, len(rows)
+            logger.info({"event": "ivf_built", "vectors": len(rows), "lists": nlist, "rewritten_during_build": len(changed)})
+        except Exception as e:
+            logger.exception({"event": "ivf_build_failed", "error": str(e)})
+        finally:
+            with self._lock:
+                self._building = False
+                self._changed_rows = None
+                self._build_done.notify_all()
+
+    def wait_for_index(self, timeout: Optional[float] = None) -> bool:
+        """Block until no IVF build is pending; True if an index is in place. For benchmarks and tests."""
+        with self._lock:
+            self._schedule_ivf_build()
+            self._build_done.wait_for(lambda: not self._building, timeout)
+            return self._centroids is not None
+
+    def _candidates(self, q: np.ndarray, blog_id: Optional[str], exact: bool) -> Optional[np.ndarray]:
+        """Rows to score, or None to score the whole matrix."""
+        if blog_id is not None:
+            return np.fromiter(self._blog_rows.get(str(blog_id), ()), dtype=np.int64)
+        if exact or self.count() < self.ivf_min_vectors:
+            return None
+        # Never build inline: serve from the current index (or exactly) until a build lands.
+        self._schedule_ivf_build()
+        if self._centroids is None:
+            return None
+        nprobe = min(self.nprobe, len(self._centroids))
+        probes = np.argpartition(self._centroids @ q, -nprobe)[-nprobe:]
+        return np.flatnonzero(np.isin(self._assign[:self._high], probes) & self._live[:self._high])
+
+    def query(self, vector: list[float], top_k: int, blog_id: Optional[str] = None, exact: bool = False) -> list[dict]:
+        """Top `top_k` rows by cosine similarity; `exact=True` bypasses the IVF index."""
+        q = np.asarray(vector, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+        with timed_vector_store(self.backend, "query"), self._lock:
+            rows = self._candidates(q, blog_id, exact)
+            if rows is None:
+                # Exhaustive: one pass over the contiguous matrix, no gather copy.
+                live = self._live[:self._high]
+                rows = np.flatnonzero(live)
+                scores = (self._vectors[:self._high] @ q)[live]
+            else:
+                scores = self._vectors[rows] @ q
+            if not len(rows):
+                return []
+            k = min(top_k, len(rows))
+            top = np.argpartition(scores, -k)[-k:]
+            top = top[np.argsort(-scores[top])]
+            hits = [(int(rows[i]), float(scores[i])) for i in top]
+            placeholders = ",".join("?" * len(hits))
+            found = {
+                row: (vector_id, json.loads(metadata))
+                for row, vector_id, metadata in self._db.execute(
+                    f"SELECT row, vector_id, metadata FROM rows WHERE row IN ({placeholders})", [row for row, _ in hits]
+                )
+            }
+        return [as_match(found[row][0], score, found[row][1]) for row, score in hits if row in found]
+
+    def wait_for_consistency(self, seconds: float):
+        # Writes are visible immediately.
+        pass
+
+    def flush(self):
+        with self._lock:
+            self._vectors.flush()
+
+
+def make_vector_store(index_name: str, dimension: int):
+    """The configured store (VECTOR_STORE) and whether it starts out empty/new."""
+    if VECTOR_STORE == "local":
+        store = LocalVectorStore(dimension=dimension)
+        logger.info({"event": "connected", "service": "vector_store", "backend": "local", "vectors": store.count()})
+        return store, False
+    store, created = connect_pinecone(index_name, dimension)
+    logger.info({"event": "connected", "service": "pinecone", "index": index_name})
+    return store, created
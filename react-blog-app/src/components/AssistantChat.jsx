@@ -3,6 +3,29 @@ import { Bot, Send, X, Loader2 } from "lucide-react";
 
 const LLM_API_BASE = "http://127.0.0.1:8005";
 
+// Calls onEvent(event, data) for each server-sent event in a fetch response body.
+async function readEvents(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const frames = buffer.split("\n\n");
+    buffer = frames.pop();
+    for (const frame of frames) {
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+}
+
 export default function AssistantChat() {
   const [isOpen, setIsOpen] = useState(false);
   const [messages, setMessages] = useState([
@@ -22,11 +45,11 @@ export default function AssistantChat() {
     setInput("");
 
     try {
-      const response = await fetch(`${LLM_API_BASE}/query`, {
+      const response = await fetch(`${LLM_API_BASE}/query/stream`, {
         method: "POST",
         headers: { 
           "Content-Type": "application/json",
-          "Accept": "application/json"
+          "Accept": "text/event-stream"
         },
         body: JSON.stringify({ 
           query: currentInput,
@@ -45,16 +68,27 @@ export default function AssistantChat() {
         throw new Error(errorMessage);
       }
 
-      const data = await response.json();
+      // The answer bubble replaces the loading indicator on the first token
+      // and grows as the rest arrive.
+      let started = false;
+      const updateAnswer = (update) =>
+        setMessages(prev => [...prev.slice(0, -1), update(prev[prev.length - 1])]);
 
-      setMessages(prev => [
-        ...prev,
-        { 
-          role: "assistant", 
-          content: data.answer,
-          processingTime: data.processing_time
+      await readEvents(response, (event, data) => {
+        if (event === "token") {
+          if (!started) {
+            started = true;
+            setLoading(false);
+            setMessages(prev => [...prev, { role: "assistant", content: data.text }]);
+          } else {
+            updateAnswer(msg => ({ ...msg, content: msg.content + data.text }));
+          }
+        } else if (event === "done" && started) {
+          updateAnswer(msg => ({ ...msg, processingTime: data.processing_time }));
+        } else if (event === "error") {
+          throw new Error(data.detail);
         }
-      ]);
+      });
 
     } catch (error) {
       console.error("RAG Query Error:", error);
@@ -131,7 +131,13 @@ export default function BlogDetails() {
       <div className="mb-6">
         {blog.main_image_url && blog.main_image_url !== "string" && (
           <img
-            src={getFullUrl(blog.main_image_url)}
+            src={getFullUrl(blog.image_variants?.card?.url || blog.main_image_url)}
+            srcSet={Object.values(blog.image_variants || {})
+              // Small originals aren't upscaled, so several variants can share a width.
+              .filter((v, i, all) => all.findIndex((o) => o.width === v.width) === i)
+              .map((v) => `${getFullUrl(v.url)} ${v.width}w`)
+              .join(", ") || undefined}
+            sizes="(min-width: 768px) 384px, 100vw"
             alt={blog.title}
             className="float-left w-full md:w-1/3 md:max-w-sm max-h-96 object-cover rounded shadow mr-0 md:mr-6 mb-4"
           />
@@ -57,7 +57,7 @@ export default function Home({ searchQuery }) {
                 <h2 className="text-lg font-semibold">{blog.title}</h2>
               </Link>
               <p className="text-sm text-gray-600">
-                {blog.summary || blog.content?.slice(0, 100) + "..."}
+                {blog.excerpt || blog.summary || blog.content?.slice(0, 100) + "..."}
               </p>
             </div>
           );
@@ -68,7 +68,7 @@ export default function Home({ searchQuery }) {
               <h2 className="text-lg font-semibold">{blog.title}</h2>
             </Link>
             <p className="text-sm text-gray-600">
-              {blog.summary || blog.content?.slice(0, 100) + "..."}
+              {blog.excerpt || blog.summary || blog.content?.slice(0, 100) + "..."}
             </p>
           </div>
         );